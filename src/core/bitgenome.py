@@ -0,0 +1,143 @@
+"""
+Genomas empaquetados en palabras de 64 bits para paneles grandes de genes.
+
+El gen g de un individuo vive en el bit (g % 64) de la palabra g // 64 de su
+fila (orden little-endian, bit menos significativo primero). Una población de
+N individuos y G genes ocupa N × ceil(G / 64) palabras uint64: 8× menos que
+una matriz uint8.
+
+Todas las operaciones trabajan sobre palabras completas:
+    - popcount por palabra (np.bitwise_count o una tabla de 256 entradas)
+    - cruce de dos puntos con máscaras de rango
+    - mutación por XOR con una máscara dispersa de bits a invertir
+    - puntaje de resistencia Σ_g bit_g · w_g con tablas por byte: cada byte de
+      la fila indexa la suma precalculada de los pesos de sus 8 genes
+
+En el GA, con más de 64 genes, el cruce, la mutación de bits y el puntaje se
+hacen sobre las palabras de la generación; la transferencia horizontal y las
+claves de genotipo de CompressedPopulation las usan con cualquier panel. Los
+individuos de DEAP siguen guardando su lista de bits para la selección y los
+reportes.
+"""
+import numpy as np
+
+WORD_BITS = 64
+_WORD = np.dtype("<u8")
+_BYTE_POPCOUNT = np.array([bin(v).count("1") for v in range(256)], dtype=np.uint8)
+# Bit b (little-endian) de cada valor de byte, 256 × 8
+_BYTE_BITS = np.unpackbits(
+    np.arange(256, dtype=np.uint8)[:, None], axis=1, bitorder="little"
+).astype(np.int64)
+
+def n_words(n_genes):
+    return max(1, -(-n_genes // WORD_BITS))
+
+def pack(genomes):
+    """Matriz individuos × genes (0/1) → matriz individuos × palabras uint64."""
+    genomes = np.asarray(genomes, dtype=np.uint8)
+    n, n_genes = genomes.shape
+    width = n_words(n_genes) * WORD_BITS
+    padded = np.zeros((n, width), dtype=np.uint8)
+    padded[:, :n_genes] = genomes
+    packed = np.packbits(padded, axis=1, bitorder="little")
+    return np.ascontiguousarray(packed).view(_WORD)
+
+def unpack(words, n_genes):
+    """Inversa de pack: matriz individuos × genes uint8."""
+    words = np.ascontiguousarray(words, dtype=_WORD)
+    bits = np.unpackbits(words.view(np.uint8), axis=1, bitorder="little")
+    return bits[:, :n_genes]
+
+def popcount(words):
+    """Cantidad de bits encendidos de cada palabra."""
+    words = np.ascontiguousarray(words, dtype=_WORD)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).astype(np.int64)
+    as_bytes = words.view(np.uint8).reshape(words.shape + (8,))
+    return _BYTE_POPCOUNT[as_bytes].sum(axis=-1, dtype=np.int64)
+
+def gene_counts(words):
+    """Genes portados por cada individuo (popcount de la fila)."""
+    return popcount(words).sum(axis=1)
+
+def allele_counts(words, n_genes):
+    """
+    Portadores de cada gen sin desempaquetar la población: un histograma de
+    los 256 valores de cada byte de la fila (una pasada sobre N × bytes) y
+    luego, por byte, histograma @ tabla de bits.
+    """
+    as_bytes = np.ascontiguousarray(words, dtype=_WORD).view(np.uint8)
+    n_bytes = as_bytes.shape[1]
+    offsets = np.arange(n_bytes, dtype=np.int64) * 256
+    hist = np.bincount((as_bytes + offsets).ravel(), minlength=n_bytes * 256)
+    counts = hist.reshape(n_bytes, 256) @ _BYTE_BITS
+    return counts.reshape(-1)[:n_genes]
+
+def range_masks(start, stop, n_genes):
+    """
+    Máscaras (filas × palabras) con los bits [start, stop) encendidos, una por
+    par de puntos de corte. Vectorizado sobre filas y palabras.
+    """
+    start = np.asarray(start, dtype=np.int64)[:, None]
+    stop = np.asarray(stop, dtype=np.int64)[:, None]
+    word_lo = np.arange(n_words(n_genes), dtype=np.int64)[None, :] * WORD_BITS
+    lo = np.clip(start - word_lo, 0, WORD_BITS)
+    hi = np.clip(stop - word_lo, 0, WORD_BITS)
+    return _low_bits(hi) & ~_low_bits(lo)
+
+def _low_bits(k):
+    """Palabra con los k bits bajos encendidos (k en 0..64)."""
+    k = np.asarray(k, dtype=np.uint64)
+    full = k >= WORD_BITS
+    shifted = np.left_shift(np.uint64(1), np.where(full, 0, k).astype(np.uint64)) - np.uint64(1)
+    return np.where(full, ~np.uint64(0), shifted).astype(_WORD)
+
+def cx_two_point(a, b, n_genes, rng):
+    """
+    Cruce de dos puntos entre las filas de a y b (mismas formas), como
+    tools.cxTwoPoint: se intercambia el segmento [p1, p2) de cada par.
+    Devuelve los dos hijos; a y b no se modifican.
+    """
+    n = len(a)
+    if n_genes < 2:
+        return a.copy(), b.copy()
+    p1 = rng.integers(1, n_genes + 1, n)
+    p2 = rng.integers(1, n_genes, n)
+    p2 = np.where(p2 >= p1, p2 + 1, p2)
+    lo, hi = np.minimum(p1, p2), np.maximum(p1, p2)
+    mask = range_masks(lo, hi, n_genes)
+    swap = (a ^ b) & mask
+    return a ^ swap, b ^ swap
+
+def mutate(words, rate, n_genes, rng):
+    """
+    Invierte cada bit con probabilidad rate. Se sortea cuántos bits cambian en
+    total y sus posiciones, así el costo es proporcional a palabras + mutaciones.
+    Modifica words en el lugar y devuelve la cantidad de bits invertidos.
+    """
+    n = len(words)
+    total = rng.binomial(n * n_genes, rate) if n and n_genes else 0
+    if total == 0:
+        return 0
+    flat = rng.choice(n * n_genes, size=total, replace=False)
+    rows, genes = np.divmod(flat, n_genes)
+    bits = np.left_shift(np.uint64(1), (genes % WORD_BITS).astype(np.uint64))
+    np.bitwise_xor.at(words, (rows, genes // WORD_BITS), bits)
+    return int(total)
+
+def byte_tables(weights):
+    """
+    Tablas (bytes × 256) con la suma de los pesos de los genes encendidos en
+    cada valor posible de cada byte de la fila empaquetada.
+    """
+    weights = np.asarray(weights, dtype=float)
+    n_bytes = n_words(len(weights)) * 8
+    padded = np.zeros(n_bytes * 8)
+    padded[: len(weights)] = weights
+    return padded.reshape(n_bytes, 8) @ _BYTE_BITS.T.astype(float)
+
+def score(words, tables):
+    """Σ_g bit_g · w_g por individuo usando las tablas de byte_tables()."""
+    as_bytes = np.ascontiguousarray(words, dtype=_WORD).view(np.uint8)
+    cols = np.arange(as_bytes.shape[1])
+    return tables[cols[None, :], as_bytes].sum(axis=1)
@@ -0,0 +1,82 @@
+"""
+Supervivencia a varios antibióticos simultáneos (terapia combinada).
+
+Todas las funciones trabajan sobre matrices fármacos × individuos, de modo que
+la población completa se evalúa en una pasada sin importar cuántos fármacos
+estén activos. La curva de cada fármaco es la sigmoide del GA:
+
+    s_d(c) = 1 / (1 + exp(k_d · (c - c50_d))),  c50_d = (lo + hi) / 2,  k_d = 10 / (hi - lo)
+
+Modelos de interacción:
+    - "bliss": independencia de Bliss, la supervivencia combinada es el
+      producto de las supervivencias individuales.
+    - "loewe": aditividad de Loewe, las concentraciones se suman como
+      fracciones de la concentración equipotente de cada fármaco; la
+      supervivencia combinada S cumple Σ_d c_d / C_d(S) = 1.
+"""
+import numpy as np
+
+LOEWE_ITERATIONS = 48
+
+def sigmoid_params(lo, hi):
+    """(c50, k) de cada fármaco a partir de sus rangos de concentración."""
+    lo = np.asarray(lo, dtype=float)
+    hi = np.asarray(hi, dtype=float)
+    return (lo + hi) / 2.0, 10.0 / np.maximum(hi - lo, 1e-9)
+
+def survival_matrix(conc, c50, k):
+    """Supervivencia por fármaco (filas) e individuo (columnas)."""
+    z = np.clip(k[:, None] * (conc - c50[:, None]), -500.0, 500.0)
+    return 1.0 / (1.0 + np.exp(z))
+
+def bliss(conc, c50, k):
+    """Independencia de Bliss: producto de las supervivencias por columna."""
+    return survival_matrix(conc, c50, k).prod(axis=0)
+
+def loewe(conc, c50, k):
+    """
+    Aditividad de Loewe con bisección vectorizada sobre L = ln(1/S - 1).
+
+    La concentración de un fármaco solo que da supervivencia S es
+    C_d(S) = c50_d + L / k_d, así que se busca L con Σ_d c_d / (c50_d + L/k_d) = 1.
+    El lado izquierdo decrece con L en el dominio donde todos los C_d son
+    positivos; con un solo fármaco se recupera exactamente su sigmoide.
+    Las columnas sin exposición usan Bliss (supervivencia basal de cada curva).
+    """
+    conc = np.maximum(np.asarray(conc, dtype=float), 0.0)
+    h = c50 * k  # pendiente en unidades de c50
+    u = conc / np.maximum(c50, 1e-12)[:, None]  # dosis en unidades de c50
+    total_u = u.sum(axis=0)
+
+    # Dominio: L > -h_d para cada fármaco presente en la columna
+    h_min = np.where(u > 0, h[:, None], np.inf).min(axis=0)
+    lo = np.where(np.isfinite(h_min), -h_min * (1.0 - 1e-9), 0.0)
+    hi = np.maximum(total_u, 1.0) * h.max() + 1.0
+    for _ in range(LOEWE_ITERATIONS):
+        mid = (lo + hi) / 2.0
+        f = (u / (1.0 + mid[None, :] / h[:, None])).sum(axis=0) - 1.0
+        above = f > 0
+        lo = np.where(above, mid, lo)
+        hi = np.where(above, hi, mid)
+    survival = 1.0 / (1.0 + np.exp(np.clip((lo + hi) / 2.0, -500.0, 500.0)))
+
+    unexposed = total_u <= 0
+    if unexposed.any():
+        survival[unexposed] = bliss(conc[:, unexposed], c50, k)
+    return survival
+
+INTERACTION_MODELS = {"bliss": bliss, "loewe": loewe}
+
+def combined_survival(model, conc, lo, hi):
+    """
+    Supervivencia combinada por individuo.
+    :param model: "bliss" o "loewe"
+    :param conc: concentración efectiva, matriz fármacos × individuos
+    :param lo, hi: rangos de concentración de cada fármaco
+    """
+    try:
+        fn = INTERACTION_MODELS[model]
+    except KeyError:
+        raise ValueError(f"Modelo de interacción desconocido: {model}") from None
+    c50, k = sigmoid_params(lo, hi)
+    return fn(np.atleast_2d(conc), c50, k)
@@ -3,15 +3,74 @@ import random
 import copy
 import time
 import numpy as np
+import psutil
 from src.data.database import get_session
 from src.data.models import SimulacionAtributos
+from src.core.pharmacokinetics import active_events, concentration_curve
+from src.core.drug_interactions import INTERACTION_MODELS, combined_survival
+from src.core import bitgenome
+from src.core.fitness_models import DEFAULT_FITNESS_MODEL, get_fitness_model
+from src.core.lineage import LineageRecorder
+from src.core.population import TRAITS, CompressedPopulation
 from deap import base, creator, tools
 
+def logistic_advance(N0, a, b, steps):
+    """
+    Población tras `steps` generaciones del mapa N' = a·N - b·N² (crecimiento
+    logístico, muerte y presión constantes) con la forma cerrada de la
+    logística continua equivalente: misma tasa por generación (ρ = ln a) y
+    mismo equilibrio (N* = (a - 1) / b).
+        N(t) = N* / (1 + (N*/N0 - 1)·e^(-ρt))
+    Sin término logístico (b = 0, p. ej. sin crecimiento por temperatura) no
+    hay equilibrio finito y la población es geométrica: N(t) = N0·a^t.
+    """
+    steps = np.asarray(steps, dtype=float)
+    if a <= 0:
+        return np.zeros_like(steps)
+    if b == 0:
+        return N0 * a**steps
+    rho = np.log(a)
+    if abs(rho) < 1e-12:
+        return N0 / (1.0 + b * N0 * steps)
+    n_eq = (a - 1.0) / b
+    return n_eq / (1.0 + (n_eq / N0 - 1.0) * np.exp(-rho * steps))
+
+def periodic_logistic_advance(N0, a, b, cycles):
+    """
+    Población en cada generación de `cycles` ciclos completos cuando a y b
+    cambian con la fase de un ciclo de dosis (a[p], b[p], una entrada por
+    generación del ciclo). Cada generación aplica la misma forma cerrada que
+    logistic_advance, que en u = 1/N es afín: u' = (u + b) / a. La composición
+    de un ciclo también es afín (u' = α·u + β), así que el inicio de cada ciclo
+    sale en forma cerrada y las fases se obtienen con las composiciones
+    parciales. Devuelve un arreglo cycles × fases.
+    """
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    if (a <= 0).any():
+        return np.zeros((cycles, len(a)))
+    # Composiciones parciales dentro del ciclo: u_p = alpha[p]·u + beta[p]
+    alpha = np.cumprod(1.0 / a)
+    beta = np.zeros(len(a))
+    acc = 0.0
+    for p in range(len(a)):
+        acc = (acc + b[p]) / a[p]
+        beta[p] = acc
+    A, B = alpha[-1], beta[-1]
+    n = np.arange(cycles, dtype=float)
+    with np.errstate(over="ignore", divide="ignore", invalid="ignore"):
+        An = A**n
+        sums = n if abs(A - 1.0) < 1e-12 else (1.0 - An) / (1.0 - A)
+        u0 = An / N0 + B * sums  # u al inicio de cada ciclo
+        u = alpha[None, :] * u0[:, None] + beta[None, :]
+        return np.where(np.isfinite(u), 1.0 / u, 0.0)
+
 class BacteriaIndividual(list):
-    """Individuo: genes (bits) + atributos biológicos."""
+    """Individuo: genes (bits) + atributos biológicos + posición espacial (x, y)."""
 
     def __init__(
-        self, genes_bits, recubrimiento, reproduccion, letalidad, permeabilidad, enzimas
+        self, genes_bits, recubrimiento, reproduccion, letalidad, permeabilidad, enzimas,
+        pos=None,
     ):
         super().__init__(genes_bits)
         self.recubrimiento = recubrimiento
@@ -19,6 +78,8 @@ class BacteriaIndividual(list):
         self.letalidad = letalidad
         self.permeabilidad = permeabilidad
         self.enzimas = enzimas
+        self.pos = None if pos is None else np.asarray(pos, dtype=np.float32)
+        self.lineage_index = -1  # Ranura en la población anterior (genealogía)
 
 # ——— DEAP setup ———
 creator.create("FitnessMax", base.Fitness, weights=(1.0,))
@@ -43,6 +104,26 @@ class GeneticAlgorithm:
         r_growth: float = 0.2,
         K_capacity: float = 1e6,
         pressure_factor: float = 0.5,
+        seed=None,
+        spatial_radius: float = 50.0,
+        spatial_jitter: float = 1.5,
+        hours_per_generation=None,
+        combination_therapy: bool = False,
+        interaction_model: str = "bliss",
+        drug_specificity=None,
+        hgt_rate: float = 0.0,
+        hgt_genes=None,
+        hgt_radius: float = 5.0,
+        lineage_tracking: bool = False,
+        lineage_capacity: int = 256,
+        epistasis=None,
+        fitness_model: str = DEFAULT_FITNESS_MODEL,
+        fast_forward: bool = False,
+        ff_window: int = 10,
+        ff_fitness_tol: float = 1e-4,
+        ff_population_tol: float = 1e-3,
+        ff_conc_tol: float = 1e-2,
+        ff_max_period: int = 48,
     ):
         logging.info(f"Initializing Genetic Algorithm with simulation_id={simulation_id}")
         logging.debug(f"GA params: mutation_rate={mutation_rate}, generations={generations}, pop_size={pop_size}, death_rate={death_rate}")
@@ -56,7 +137,46 @@ class GeneticAlgorithm:
         :param pop_size: tamaño de la población
         :param death_rate: tasa de muerte natural
         :param environmental_factors: dict con factores ambientales como temperatura y pH
+        :param seed: semilla para reproducir la corrida (None = aleatoria). Con
+            semilla no se aplica el recorte de población por tiempo de cómputo,
+            que dependería de la máquina y rompería la reproducibilidad
+        :param spatial_radius: radio del disco donde viven los individuos
+        :param spatial_jitter: desviación del desplazamiento de cada descendiente
+            respecto de la posición heredada de su progenitor
+        :param hours_per_generation: horas reales por generación, para convertir
+            la vida media y el intervalo de dosis de cada antibiótico. None (por
+            defecto) desactiva la farmacocinética: cada evento fija una
+            concentración constante hasta el siguiente
+        :param combination_therapy: si es True, cada antibiótico del cronograma
+            sigue activo con su propia curva en vez de reemplazar al anterior
+        :param interaction_model: "bliss" o "loewe", cómo se combinan los fármacos
+        :param drug_specificity: dict {(gen_id, antibiotico_id): peso} que
+            multiplica el peso de cada gen frente a cada fármaco (faltantes = 1.0)
+        :param hgt_rate: probabilidad por generación de que un descendiente reciba
+            plásmidos por conjugación (0 = sin transferencia horizontal)
+        :param hgt_genes: ids de los genes transferibles (None = todos)
+        :param hgt_radius: lado de la celda de vecindad donde se buscan donantes
+        :param lineage_tracking: si es True, registra progenitores y cambios de
+            genes por generación en un LineageRecorder (self.lineage)
+        :param lineage_capacity: generaciones que conserva el buffer de genealogía
+        :param epistasis: dict {(gen_a_id, gen_b_id): peso} de interacciones entre
+            pares de genes que se suman a la resistencia de quien porta ambos
+        :param fitness_model: nombre del modelo de fitness registrado en
+            src.core.fitness_models (por defecto "clasico")
+        :param fast_forward: si es True, en estado estacionario se salta
+            analíticamente hasta el próximo evento del cronograma
+        :param ff_window: generaciones observadas para declarar estado estacionario
+        :param ff_fitness_tol: pendiente máxima del fitness medio en la ventana
+        :param ff_population_tol: cambio relativo máximo de la población por generación
+        :param ff_conc_tol: diferencia máxima de concentración, relativa al pico
+            de cada curva, para considerar que las condiciones se repiten
+        :param ff_max_period: ciclo de dosis más largo (en generaciones) que se
+            reconoce como condición estacionaria periódica
         """
+        if interaction_model not in INTERACTION_MODELS:
+            raise ValueError(f"Modelo de interacción desconocido: {interaction_model}")
+        self.fitness_model = fitness_model
+        self._fitness_fn = get_fitness_model(fitness_model)
         self.genes = genes
         self.schedule = sorted(antibiotic_schedule or [], key=lambda e: e[0])
         self.mutation_rate = mutation_rate
@@ -80,8 +200,67 @@ class GeneticAlgorithm:
         self.r_growth = r_growth
         self.K_capacity = K_capacity
         self.pressure_factor = pressure_factor
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.spatial_radius = spatial_radius
+        self.spatial_jitter = spatial_jitter
+        self.hours_per_generation = hours_per_generation
+        # Concentración por generación (farmacocinética), se calcula en initialize
+        self.conc_curve = None
+        self._survival_key = None
+        self._survival = 1.0
+
+        # Terapia combinada: fármacos distintos del cronograma y sus curvas (initialize)
+        self.combination_therapy = combination_therapy
+        self.interaction_model = interaction_model
+        self.drug_specificity = dict(drug_specificity or {})
+        self.drugs = []
+        self.drug_curves = None
+        self.current_concs = np.zeros(0)
+
+        # Transferencia horizontal (conjugación de plásmidos)
+        self.hgt_rate = hgt_rate
+        self.hgt_genes = None if hgt_genes is None else sorted(hgt_genes)
+        self.hgt_radius = hgt_radius
+        self._hgt_columns = np.array(
+            [i for i, g in enumerate(genes) if hgt_genes is None or g["id"] in hgt_genes],
+            dtype=np.intp,
+        )
+        hgt_bits = np.zeros((1, len(genes)), dtype=np.uint8)
+        hgt_bits[0, self._hgt_columns] = 1
+        self._hgt_mask = bitgenome.pack(hgt_bits)[0]
+
+        # Avance rápido en estado estacionario (intervalos [inicio, fin) de pasos)
+        self.fast_forward = fast_forward
+        self.ff_window = max(2, ff_window)
+        self.ff_fitness_tol = ff_fitness_tol
+        self.ff_population_tol = ff_population_tol
+        self.ff_conc_tol = ff_conc_tol
+        self.ff_max_period = max(1, ff_max_period)
+        self._ff_signal = None
+        self._ff_events = None
+        self.fast_forward_intervals = []
+        self.fast_forward_mask = np.zeros(0, dtype=bool)
+
+        # Genealogía opcional (no altera la dinámica ni consume aleatoriedad)
+        self.lineage_tracking = lineage_tracking
+        self.lineage = (
+            LineageRecorder(len(genes), capacity=lineage_capacity) if lineage_tracking else None
+        )
 
-        self.total_weight = sum(g["peso_resistencia"] for g in genes) or 1e-8
+        self._gene_weights = np.array([g["peso_resistencia"] for g in genes], dtype=float)
+        # Epistasis: forma cuadrática x^T·E·x con E dispersa (una entrada por par)
+        self.epistasis = dict(epistasis or {})
+        self._epistasis_matrix = self._build_epistasis()
+        # Normalización: la resistencia máxima incluye las sinergias posibles
+        synergy = 0.0
+        if self._epistasis_matrix is not None:
+            synergy = float(self._epistasis_matrix.data.clip(min=0).sum())
+        self.total_weight = (sum(g["peso_resistencia"] for g in genes) + synergy) or 1e-8
+        # Paneles grandes: puntaje sobre genomas empaquetados con tablas por byte
+        self._gene_tables = (
+            bitgenome.byte_tables(self._gene_weights) if len(genes) > bitgenome.WORD_BITS else None
+        )
 
         self.extinction_reached = False
         self.resistance_critical = False
@@ -97,9 +276,21 @@ class GeneticAlgorithm:
         self.toolbox.register("mutate", self._mutate_individual)
         self.toolbox.register("select", tools.selTournament, tournsize=3)
 
-        self.pop = None
+        # Paneles chicos: self.pop (individuos de DEAP) más su matriz de genomas.
+        # Paneles grandes: la población vive en arreglos por fila (genomas
+        # empaquetados, atributos, posiciones, fitness y ranura de genealogía);
+        # pop es una vista de individuos que se arma solo al pedirla.
+        self._pop = None
+        self._genomes = None  # Matriz de genomas de self.pop (fila i = individuo i)
+        self._words = None
+        self._traits = None
+        self._positions = None
+        self._fitness = None
+        self._slots = None
         self.times = None
         self.current_step = 0
+        self.current_ab = None
+        self.current_conc = 0.0
 
         self.best_hist = []
         self.avg_hist = []
@@ -131,6 +322,34 @@ class GeneticAlgorithm:
         self.diversity_threshold = 0.3
 
         self.fitness_hist = []
+        self.hgt_hist = []  # Receptores que adquirieron algún gen por generación
+
+        # Telemetría de costo computacional por generación (se preasigna en initialize)
+        self._process = None
+        self.cpu_time_hist = np.zeros(0)
+        self.ram_mb_hist = np.zeros(0)
+        self.wall_time_hist = np.zeros(0)
+
+    def _build_epistasis(self):
+        """Matriz CSR gen × gen con los pesos de epistasis, o None si no hay términos."""
+        index = {g["id"]: i for i, g in enumerate(self.genes)}
+        terms = [
+            (index[a], index[b], float(w))
+            for (a, b), w in self.epistasis.items()
+            if a in index and b in index and a != b and w
+        ]
+        if not terms:
+            return None
+        from scipy import sparse  # solo se carga si el modelo usa epistasis
+
+        rows, cols, vals = zip(*terms)
+        n = len(self.genes)
+        return sparse.csr_matrix((vals, (rows, cols)), shape=(n, n))
+
+    def _epistasis_term(self, genomes):
+        """x^T·E·x de cada fila de genomes; costo proporcional a filas × no nulos de E."""
+        xe = self._epistasis_matrix.T.dot(genomes.T).T
+        return (np.asarray(xe) * genomes).sum(axis=1)
 
     def init_individual(self):
         genes_bits = [random.randint(0, 1) for _ in self.genes]
@@ -139,11 +358,213 @@ class GeneticAlgorithm:
         letalidad = random.uniform(0.5, 1.0)
         permeabilidad = random.uniform(0.5, 1.0)
         enzimas = random.uniform(0.5, 1.0)
-        return creator.Individual(genes_bits, recubrimiento, reproduccion, letalidad, permeabilidad, enzimas)
+        pos = self._random_positions(1)[0]
+        return creator.Individual(
+            genes_bits, recubrimiento, reproduccion, letalidad, permeabilidad, enzimas, pos=pos
+        )
+
+    def _random_positions(self, n):
+        """n posiciones float32 con ángulo y radio uniformes dentro del disco."""
+        angs = self.rng.uniform(0, 2 * np.pi, n)
+        radios = self.rng.uniform(0, self.spatial_radius, n)
+        return np.column_stack((radios * np.cos(angs), radios * np.sin(angs))).astype(np.float32)
+
+    def _jitter_positions(self, individuals):
+        """
+        Desplaza a cada descendiente alrededor de la posición heredada (copiada
+        del progenitor al clonar) y lo mantiene dentro del disco. Vectorizado.
+        """
+        if not individuals:
+            return
+        for ind, p in zip(individuals, self._jitter(self._position_matrix(individuals))):
+            ind.pos = p
+
+    def _position_matrix(self, individuals):
+        """Posiciones N×2 float32 de individuals; las que falten se sortean en el disco."""
+        pos = np.empty((len(individuals), 2), dtype=np.float32)
+        missing = []
+        for i, ind in enumerate(individuals):
+            if ind.pos is None:
+                missing.append(i)
+            else:
+                pos[i] = ind.pos
+        if missing:
+            pos[missing] = self._random_positions(len(missing))
+        return pos
+
+    def _jitter(self, pos):
+        """Desplazamiento gaussiano de cada fila de pos (en el lugar), recortado al disco."""
+        pos += self.rng.normal(0.0, self.spatial_jitter, pos.shape).astype(np.float32)
+        r = np.hypot(pos[:, 0], pos[:, 1])
+        outside = r > self.spatial_radius
+        pos[outside] *= (self.spatial_radius / r[outside])[:, None]
+        return pos
+
+    def _local_donors(self, positions, recipients):
+        """
+        Un donante al azar entre los otros miembros de la celda de vecindad
+        (lado hgt_radius) de cada receptor, o -1 si el receptor está solo. Las
+        celdas se agrupan con un ordenamiento por índice de celda, sin comparar
+        pares de individuos.
+        """
+        cells = np.floor((positions + self.spatial_radius) / self.hgt_radius).astype(np.int64)
+        n_cols = int(cells[:, 1].max()) + 1
+        cell_id = cells[:, 0] * n_cols + cells[:, 1]
+
+        order = np.argsort(cell_id, kind="stable")
+        sorted_ids = cell_id[order]
+        uniq, start, counts = np.unique(sorted_ids, return_index=True, return_counts=True)
+        slot = np.searchsorted(uniq, cell_id[recipients])
+
+        # Se sortea entre los count - 1 vecinos y se salta la posición del propio receptor
+        own = np.empty(len(order), dtype=np.int64)
+        own[order] = np.arange(len(order))
+        own = own[recipients]
+        pick = start[slot] + (self.rng.random(len(recipients)) * (counts[slot] - 1)).astype(np.int64)
+        pick += pick >= own
+        donors = order[np.minimum(pick, len(order) - 1)]
+        donors[counts[slot] < 2] = -1
+        return donors
+
+    def _horizontal_transfer(self, individuals, genomes=None):
+        """
+        Fase de conjugación: cada individuo es receptor con probabilidad hgt_rate
+        y adquiere los genes transferibles que porte su donante (OR de bits).
+        Donantes de la vecindad espacial si hay posiciones; si no, de toda la
+        población. Todo en bloque sobre genomas empaquetados (bitgenome): la
+        copia es un OR de palabras con la máscara de genes transferibles.
+        Si se pasa la matriz de genomas de individuals, se actualiza junto con
+        los receptores. Devuelve cuántos receptores ganaron al menos un gen.
+        """
+        n = len(individuals)
+        if self.hgt_rate <= 0 or n < 2 or len(self._hgt_columns) == 0:
+            return 0
+        positions = None
+        if all(ind.pos is not None for ind in individuals):
+            positions = np.array([ind.pos for ind in individuals], dtype=np.float32)
+        if genomes is None:
+            genomes = self._genome_matrix(individuals)
+        words = bitgenome.pack(genomes)
+        gained = self._conjugation(words, positions)
+
+        bits = bitgenome.unpack(words[gained], len(self.genes))
+        genomes[gained] = bits
+        for i, row in zip(gained, bits):
+            ind = individuals[i]
+            for col in self._hgt_columns:
+                ind[col] = int(row[col])
+            del ind.fitness.values
+        return len(gained)
+
+    def _conjugation(self, words, positions=None):
+        """
+        Conjugación sobre genomas empaquetados (individuos × palabras), en el
+        lugar: los receptores copian con un OR los genes transferibles del
+        donante. Sin posiciones los donantes se sortean en toda la población.
+        Devuelve las filas de los receptores que ganaron algún gen.
+        """
+        n = len(words)
+        none = np.zeros(0, dtype=np.intp)
+        if self.hgt_rate <= 0 or n < 2 or len(self._hgt_columns) == 0:
+            return none
+        recipients = np.nonzero(self.rng.random(n) < self.hgt_rate)[0]
+        if len(recipients) == 0:
+            return none
+
+        if positions is not None:
+            donors = self._local_donors(positions, recipients)
+        else:
+            donors = self.rng.integers(0, n - 1, len(recipients))
+            donors += donors >= recipients  # cualquiera menos el propio receptor
+        valid = donors >= 0
+        recipients, donors = recipients[valid], donors[valid]
+        if len(recipients) == 0:
+            return none
+
+        before = words[recipients]
+        after = before | (words[donors] & self._hgt_mask)
+        changed = np.nonzero((after != before).any(axis=1))[0]
+        words[recipients[changed]] = after[changed]
+        return recipients[changed]
+
+    @property
+    def _packed(self):
+        """Paneles grandes (más de 64 genes): la población se guarda empaquetada."""
+        return self._gene_tables is not None
+
+    @property
+    def pop(self):
+        """
+        Población actual como individuos de DEAP. En paneles grandes es una
+        vista armada desde los arreglos empaquetados la primera vez que se pide
+        en cada generación (reportes, persistencia); modificarla no cambia el
+        estado del GA, para eso se reasigna self.pop.
+        """
+        if self._pop is None and self._words is not None:
+            self._pop = self._materialize()
+        return self._pop
+
+    @pop.setter
+    def pop(self, individuals):
+        self._pop = individuals
+        if self._packed and individuals is not None:
+            n = len(individuals)
+            self._words = bitgenome.pack(self._genome_matrix(individuals))
+            self._traits = self._trait_matrix(individuals)
+            self._positions = self._position_matrix(individuals)
+            self._fitness = np.array(
+                [ind.fitness.values[0] if ind.fitness.valid else 0.0 for ind in individuals], dtype=float
+            )
+            self._slots = np.array([ind.lineage_index for ind in individuals], dtype=np.int32).reshape(n)
+
+    def _materialize(self):
+        """Individuos de DEAP desde los arreglos de un panel grande (solo en los bordes)."""
+        genomes = bitgenome.unpack(self._words, len(self.genes)).tolist()
+        pop = []
+        for bits, traits, pos, fit, slot in zip(
+            genomes, self._traits.tolist(), self._positions, self._fitness.tolist(), self._slots.tolist()
+        ):
+            ind = creator.Individual(bits, *traits, pos=pos.copy())
+            ind.fitness.values = (fit,)
+            ind.lineage_index = slot
+            pop.append(ind)
+        return pop
+
+    @property
+    def positions(self):
+        """Posiciones (x, y) de la población actual como arreglo float32 N×2."""
+        if self._packed and self._positions is not None:
+            return self._positions
+        if not self.pop:
+            return np.zeros((0, 2), dtype=np.float32)
+        return np.array(
+            [ind.pos if ind.pos is not None else (0.0, 0.0) for ind in self.pop],
+            dtype=np.float32,
+        )
+
+    def trait(self, name):
+        """Valores del atributo biológico name en la población actual (arreglo N)."""
+        if self._packed and self._traits is not None:
+            return self._traits[:, TRAITS.index(name)]
+        return np.array([getattr(ind, name) for ind in self.pop or []], dtype=float)
+
+    def _population_genomes(self):
+        """Matriz individuos × genes uint8 de la población actual."""
+        if self._packed:
+            return bitgenome.unpack(self._words, len(self.genes))
+        return self._genomes
+
+    def _population_traits(self):
+        """Matriz individuos × TRAITS de la población actual."""
+        if self._packed:
+            return self._traits
+        return self._trait_matrix(self.pop)
 
     def _mutate_individual(self, individual):
         tools.mutFlipBit(individual, indpb=self.mutation_rate)
+        return self._mutate_phenotype(individual)
 
+    def _mutate_phenotype(self, individual):
         bio_attrs = [
             individual.recubrimiento,
             individual.reproduccion,
@@ -167,6 +588,15 @@ class GeneticAlgorithm:
 
         return (individual,)
 
+    def _mutate_traits(self, traits):
+        """
+        Mutación gaussiana de los atributos biológicos de una matriz
+        individuos × TRAITS, como _mutate_phenotype pero en bloque.
+        """
+        hit = self.rng.random(traits.shape) < self.phenotype_mutation_prob
+        noise = self.rng.normal(0.0, self.phenotype_mutation_sigma, traits.shape)
+        return np.clip(traits + np.where(hit, noise, 0.0), 0.0, 1.0)
+
     def _update_antibiotic(self, t: float):
         self.current_ab = None
         self.current_conc = 0.0
@@ -212,40 +642,172 @@ class GeneticAlgorithm:
         survival = 1.0 / (1.0 + np.exp(k * (concentration - c50)))
         return survival
 
-    def evaluate(self, individual):
-        # logging.debug(f"Evaluating individual: {individual}")
-        raw_resistance = sum(
-            g["peso_resistencia"] * bit for g, bit in zip(self.genes, individual)
+    def _current_survival(self):
+        """
+        Supervivencia al antibiótico vigente. Es la misma para toda la población
+        en un paso, así que se calcula una vez por (rango, concentración).
+        """
+        lo, hi = (
+            self.current_ab["concentracion_minima"],
+            self.current_ab["concentracion_maxima"],
         )
+        key = (lo, hi, self.current_conc)
+        if key != self._survival_key:
+            self._survival = self._sigmoid_survival(self.current_conc, lo, hi)
+            self._survival_key = key
+        return self._survival
 
-        adaptive_cost = (individual.recubrimiento + individual.enzimas) / 2.0
+    def evaluate(self, individual):
+        return (float(self.evaluate_population([individual])[0]),)
 
-        N = (raw_resistance / self.total_weight) * (1 - adaptive_cost)
+    def evaluate_population(self, individuals, genomes=None, traits=None):
+        """
+        Fitness de varios individuos en una sola pasada vectorizada. genomes y
+        traits son las matrices de individuals si el llamador ya las tiene; si
+        no, se arman aquí. El cálculo lo hace _evaluate_compressed.
+        """
+        if len(individuals) == 0:
+            return np.zeros(0)
+        if genomes is None:
+            genomes = self._genome_matrix(individuals)
+        if traits is None and self._fitness_fn.requires.intersection(TRAITS):
+            traits = self._trait_matrix(individuals)
+        return self._evaluate_compressed(CompressedPopulation.from_genomes(genomes), traits)
+
+    def _evaluate_compressed(self, compressed, traits=None):
+        """
+        Fitness de una población ya comprimida (step la comprime una vez por
+        generación y reutiliza la compresión para la diversidad); traits es la
+        matriz individuos × TRAITS si el modelo usa atributos.
+
+        Con un antibiótico la supervivencia es la misma para todos. En terapia
+        combinada se arma la matriz fármacos × genotipos de concentraciones
+        efectivas (reducidas por la resistencia de cada genoma a cada fármaco)
+        y se combina con el modelo de interacción configurado.
+
+        Lo que depende solo del genoma (incluida la epistasis, x·w + x^T·E·x)
+        se calcula una vez por genotipo único y se expande a los individuos.
+        Solo se arman las entradas que declara el modelo de fitness elegido
+        (src.core.fitness_models).
+        """
+        if len(compressed) == 0:
+            return np.zeros(0)
+        genomes = compressed.genomes.astype(float)
+        requires = self._fitness_fn.requires
+
+        inputs = {}
+        if "resistance" in requires:
+            if self._gene_tables is not None:
+                resistance = bitgenome.score(compressed.words, self._gene_tables) / self.total_weight
+            else:
+                resistance = (genomes @ self._gene_weights) / self.total_weight
+            if self._epistasis_matrix is not None:
+                resistance = resistance + self._epistasis_term(genomes) / self.total_weight
+            inputs["resistance"] = compressed.expand(resistance)
+        if "survival" in requires:
+            inputs["survival"] = 1.0
+            if self.combination_therapy and self.drugs:
+                active = self.current_concs > 0
+                if active.any():
+                    inputs["survival"] = compressed.expand(self._combination_survival(genomes, active))
+            elif self.current_ab:
+                inputs["survival"] = self._current_survival()
+        if "genomes" in requires:
+            inputs["genomes"] = compressed.individual_genomes()
+        if "death_rate" in requires:
+            inputs["death_rate"] = self.death_rate * self.death_modifier()
+        for col, name in enumerate(TRAITS):
+            if name in requires:
+                inputs[name] = traits[:, col]
+
+        return np.asarray(self._fitness_fn(inputs), dtype=float)
+
+    def _combination_survival(self, genomes, active):
+        """Supervivencia combinada por individuo a los fármacos activos."""
+        weights = self._drug_weights[:, active]
+        totals = weights.sum(axis=0)
+        resistance = np.divide(
+            genomes @ weights, totals, out=np.zeros((len(genomes), weights.shape[1])), where=totals > 0
+        )
+        conc = self.current_concs[active][:, None] * (1.0 - np.clip(resistance.T, 0.0, 1.0))
+        return combined_survival(
+            self.interaction_model, conc, self._drug_lo[active], self._drug_hi[active]
+        )
 
-        if self.current_ab:
-            lo, hi = (
-                self.current_ab["concentracion_minima"],
-                self.current_ab["concentracion_maxima"],
+    def _drug_key(self, ab):
+        return ab.get("id", ab.get("nombre"))
+
+    def _prepare_combination(self):
+        """Curva de concentración, rango y pesos gen × fármaco de cada antibiótico."""
+        self.drugs = []
+        for _, ab, _ in self.schedule:
+            if all(self._drug_key(ab) != self._drug_key(d) for d in self.drugs):
+                self.drugs.append(ab)
+        self.drug_curves = np.array([
+            concentration_curve(
+                [e for e in self.schedule if self._drug_key(e[1]) == self._drug_key(ab)],
+                self.times,
+                self.hours_per_generation,
             )
-            surv = self._sigmoid_survival(self.current_conc, lo, hi)
-            N *= surv
-
-        death_rate_adj = self.death_rate * self.death_modifier()
-        N *= 1 - death_rate_adj
-
-        return (max(0.0, N),)
+            for ab in self.drugs
+        ]).reshape(len(self.drugs), len(self.times))
+        self._drug_lo = np.array([ab["concentracion_minima"] for ab in self.drugs], dtype=float)
+        self._drug_hi = np.array([ab["concentracion_maxima"] for ab in self.drugs], dtype=float)
+        spec = np.array([
+            [self.drug_specificity.get((g["id"], ab.get("id")), 1.0) for ab in self.drugs]
+            for g in self.genes
+        ], dtype=float).reshape(len(self.genes), len(self.drugs))
+        self._drug_weights = self._gene_weights[:, None] * spec
+        self.current_concs = np.zeros(len(self.drugs))
+
+    def _update_combination(self):
+        """
+        Concentraciones de todos los fármacos en el paso actual. current_ab y
+        current_conc quedan en el fármaco con mayor exposición relativa a su
+        rango, para reportes y alertas que esperan un solo antibiótico.
+        """
+        self.current_concs = self.drug_curves[:, self.current_step]
+        active = np.nonzero(self.current_concs > 0)[0]
+        if len(active) == 0:
+            self.current_ab = None
+            self.current_conc = 0.0
+            return
+        exposure = self.current_concs[active] / np.maximum(self._drug_hi[active], 1e-12)
+        lead = active[int(np.argmax(exposure))]
+        self.current_ab = self.drugs[lead]
+        self.current_conc = float(self.current_concs[lead])
+
+    @property
+    def active_drugs(self):
+        """[(antibiótico, concentración)] de los fármacos activos en el paso actual."""
+        if self.combination_therapy and self.drugs:
+            return [(ab, float(c)) for ab, c in zip(self.drugs, self.current_concs) if c > 0]
+        return [(self.current_ab, self.current_conc)] if self.current_ab else []
 
     def initialize(self, selected_gene_ids: list):
         logging.info(f"Initializing population for genes: {selected_gene_ids}")
+        if self.seed is not None:
+            random.seed(self.seed)
+            np.random.seed(self.seed)
+            self.rng = np.random.default_rng(self.seed)
         pop = self.toolbox.population(n=self.pop_size)
         forced = {i for i, g in enumerate(self.genes) if g["id"] in selected_gene_ids}
         for ind in pop:
             for idx in forced:
                 ind[idx] = 1
         self.pop = pop
+        if not self._packed:
+            self._genomes = self._genome_matrix(pop)
+        if self.lineage is not None:
+            self.lineage.start(self._population_genomes())
+            self._number_lineage_slots()
 
         self.times = np.linspace(0, self.generations, self.generations)
         self.current_step = 0
+        # Curva de concentración de todo el régimen: cada paso solo la indexa
+        self.conc_curve = concentration_curve(self.schedule, self.times, self.hours_per_generation)
+        if self.combination_therapy:
+            self._prepare_combination()
 
         self.best_hist.clear()
         self.avg_hist.clear()
@@ -263,19 +825,231 @@ class GeneticAlgorithm:
         self.degradation_hist.clear()
         self.degradation_hist.append(0.0)  
 
-    def step(self) -> bool:
-        if self.current_step >= len(self.times):
+        self.hgt_hist.clear()
+
+        self._process = psutil.Process()
+        self.cpu_time_hist = np.zeros(len(self.times))
+        self.ram_mb_hist = np.zeros(len(self.times))
+        self.wall_time_hist = np.zeros(len(self.times))
+        self.fast_forward_mask = np.zeros(len(self.times), dtype=bool)
+        self.fast_forward_intervals = []
+        if self.fast_forward:
+            self._prepare_fast_forward()
+
+    def _genome_matrix(self, individuals):
+        n = len(individuals)
+        return np.array([list(ind) for ind in individuals], dtype=np.uint8).reshape(n, len(self.genes))
+
+    def _trait_matrix(self, individuals):
+        """Atributos biológicos (columnas en el orden de TRAITS), una fila por individuo."""
+        return np.array(
+            [[getattr(ind, name) for name in TRAITS] for ind in individuals], dtype=float
+        ).reshape(len(individuals), len(TRAITS))
+
+    def _number_lineage_slots(self):
+        """Cada individuo recuerda su ranura; las crías la heredan al clonarse."""
+        if self._packed:
+            self._slots = np.arange(len(self._words), dtype=np.int32)
+            return
+        for i, ind in enumerate(self.pop):
+            ind.lineage_index = i
+
+    def _record_lineage(self):
+        if self._packed:
+            parents = self._slots
+        else:
+            parents = np.array([ind.lineage_index for ind in self.pop], dtype=np.int32)
+        self.lineage.record(self.current_step + 1, parents, self._population_genomes())
+        self._number_lineage_slots()
+
+    def _kill_rate(self):
+        if not self.current_ab:
+            return 0.0
+        lo, hi = (
+            self.current_ab["concentracion_minima"],
+            self.current_ab["concentracion_maxima"],
+        )
+        return 0.0 if hi <= lo else max(0.0, min(1.0, (self.current_conc - lo) / (hi - lo)))
+
+    def _prepare_fast_forward(self):
+        """
+        Condiciones por paso para detectar tramos estacionarios: evento vigente
+        y concentración de cada fármaco relativa al pico de su curva.
+        """
+        if self.combination_therapy and self.drug_curves is not None:
+            curves = self.drug_curves
+        else:
+            curves = self.conc_curve[None, :]
+        peak = np.abs(curves).max(axis=1, keepdims=True)
+        self._ff_signal = curves / np.maximum(peak, 1e-12)
+        self._ff_events = (
+            active_events(self.schedule, self.times)
+            if self.schedule else np.full(len(self.times), -1)
+        )
+
+    def _cycle_breaks(self, period, first):
+        """
+        Por paso j >= first: si las condiciones se apartan de las del ciclo de
+        referencia (los `period` pasos previos a current_step, en la misma
+        fase): otro evento del cronograma o concentración fuera de ff_conc_tol.
+        Comparar siempre contra el mismo ciclo evita que una deriva lenta (los
+        tiempos de las generaciones no caen en múltiplos exactos del intervalo
+        de dosis) se acumule a lo largo del salto.
+        """
+        i = self.current_step
+        ref = i - period + (np.arange(first, len(self.times)) - i) % period
+        diff = np.abs(self._ff_signal[:, first:] - self._ff_signal[:, ref])
+        return (diff > self.ff_conc_tol).any(axis=0) | (self._ff_events[first:] != self._ff_events[ref])
+
+    def _condition_period(self):
+        """
+        Ciclo más corto (en generaciones) con que se repiten las condiciones en
+        los últimos ff_window pasos y el actual: 1 si son constantes, el
+        intervalo de dosis si la concentración oscila con la farmacocinética.
+        Devuelve 0 si no se repiten.
+        """
+        i = self.current_step
+        first = i - self.ff_window
+        for period in range(1, self.ff_max_period + 1):
+            if first < 0 or i - period < 0:
+                return 0
+            if not self._cycle_breaks(period, first)[: self.ff_window + 1].any():
+                return period
+        return 0
+
+    def _steady_state(self, period=1):
+        """
+        Estado estacionario: diversidad bajo evo_rescue_threshold, fitness medio
+        por ciclo sin pendiente y población sin cambio relativo de un ciclo al
+        siguiente en las últimas ff_window generaciones. Con condiciones
+        constantes el ciclo es de una generación.
+        """
+        w = self.ff_window
+        if len(self.fitness_hist) < w + period - 1 or len(self.population_hist) < w + period:
             return False
+        if self.div_hist[-1] >= self.evo_rescue_threshold:
+            return False
+        fitness = np.asarray(self.fitness_hist[-(w + period - 1):], dtype=float)
+        cycle_mean = np.convolve(fitness, np.ones(period) / period, mode="valid")
+        slope = np.polyfit(range(w), cycle_mean, 1)[0]
+        if abs(slope) > self.ff_fitness_tol:
+            return False
+        pops = np.asarray(self.population_hist[-(w + period):], dtype=float)
+        change = np.abs(pops[period:] - pops[:-period]) / np.maximum(pops[:-period], 1e-12) / period
+        return bool(change.max() <= self.ff_population_tol)
+
+    def _fast_forward_target(self):
+        """
+        (fin, ciclo): paso (exclusivo) hasta el que se puede avanzar
+        analíticamente en ciclos completos, y el largo del ciclo. El tramo
+        termina en el próximo cambio de las condiciones (evento del cronograma o
+        concentración que deja de repetirse) o en el final. Devuelve
+        (current_step, 1) si no hay estado estacionario o si las condiciones
+        actuales no rigieron durante toda la ventana observada o si esa ventana
+        incluye generaciones avanzadas.
+        """
+        i = self.current_step
+        if not self.div_hist or self.div_hist[-1] >= self.evo_rescue_threshold:
+            return i, 1
+        period = self._condition_period()
+        # La ventana observada tiene que haberse simulado, no avanzado
+        if not period or self.fast_forward_mask[i - self.ff_window - period:i].any():
+            return i, 1
+        if not self._steady_state(period):
+            return i, 1
+        later = np.nonzero(self._cycle_breaks(period, i + 1))[0]
+        stop = i + 1 + int(later[0]) if len(later) else len(self.times)
+        return i + (stop - i) // period * period, period
+
+    def _advance_to(self, end, period=1):
+        """
+        Avanza analíticamente de current_step a end (exclusivo, ciclos
+        completos) sin evaluar la población: frecuencias alélicas y mutación
+        quedan congeladas, los historiales repiten el último ciclo observado y
+        population_total sigue la forma cerrada logística con la presión de
+        cada fase (periodic_logistic_advance). Los historiales reciben una
+        entrada por generación saltada y el intervalo queda en
+        fast_forward_intervals / fast_forward_mask.
+        """
+        start_time = time.perf_counter()
+        cpu_start = time.process_time()
+        start = self.current_step
+        k = end - start
+        cycles = k // period
+
+        def repeat(hist):
+            return list(hist[-period:]) * cycles
+
+        # Fármaco presente y presión selectiva en cada fase del ciclo
+        present = (self._ff_signal[:, start:start + period] > 0).any(axis=0)
+        if self.combination_therapy and self.drugs:
+            pressure_on = present
+        else:
+            pressure_on = np.full(period, bool(self.current_ab))
+
+        avg = np.asarray(self.avg_hist[-period:], dtype=float)
+        r = self.r_growth * self.reproduction_rate * self.growth_modifier()
+        death_rate = self.death_rate * self.death_modifier()
+        pressure = np.where(pressure_on, (1 - avg) * self.pressure_factor, 0.0)
+        a = (1 + r - death_rate) * (1 - pressure)
+        b = r * (1 - pressure) / self.K_capacity
+        pops = np.maximum(
+            periodic_logistic_advance(self.population_total, a, b, cycles).ravel(), 1.0
+        )
+        prev = np.concatenate(([self.population_total], pops[:-1]))
+
+        for name in ("best_hist", "avg_hist", "kill_hist", "mut_hist", "div_hist"):
+            getattr(self, name).extend(repeat(getattr(self, name)))
+        self.fitness_hist.extend(repeat(self.avg_hist))
+        self.hgt_hist.extend([0] * k)
+        self.population_hist.extend(pops.tolist())
+        self.expansion_index_hist.extend((pops / prev).tolist())
+        degrading = np.tile(pressure_on & present, cycles)
+        self.degradation_hist.extend(np.where(degrading, 1 - pops / prev, 0.0).tolist())
+        self.population_total = float(pops[-1])
+
+        if pops.min() <= self.extinction_threshold and not self.extinction_reached:
+            logging.warning(f"Extinction threshold reached during fast-forward to step {end}.")
+            self.extinction_reached = True
+
+        self.fast_forward_mask[start:end] = True
+        self.fast_forward_intervals.append((start, end))
+        # Condiciones de la última generación avanzada
+        self.current_step = end - 1
+        self._update_conditions()
+        self.current_step = end
+
+        # El costo del salto se reparte entre las generaciones avanzadas
+        self.cpu_time_hist[start:end] = (time.process_time() - cpu_start) / k
+        self.wall_time_hist[start:end] = (time.perf_counter() - start_time) / k
+        self.ram_mb_hist[start:end] = self._process.memory_info().rss / (1024**2)
+        logging.info(
+            f"Fast-forward: steady state from step {start} to {end} "
+            f"({k} generations, cycle of {period})"
+        )
+
+    def _assign_fitness(self, individuals, genomes=None, traits=None):
+        for ind, fit in zip(individuals, self.evaluate_population(individuals, genomes, traits)):
+            ind.fitness.values = (float(fit),)
 
+    def _update_conditions(self):
+        """Antibiótico y concentraciones vigentes en current_step."""
         t = self.times[self.current_step]
         self.current_time = t
 
         self._update_antibiotic(t)
+        if self.combination_therapy and self.drug_curves is not None:
+            self._update_combination()
+        elif self.conc_curve is not None:
+            self.current_conc = float(self.conc_curve[self.current_step])
 
-        start_time = time.perf_counter()  # Inicio de medición
-
-        offspring = self.toolbox.select(self.pop, len(self.pop))
-        offspring = list(map(self.toolbox.clone, offspring))
+    def _individual_generation(self):
+        """
+        Generación de paneles chicos con los operadores de DEAP sobre
+        individuos. Devuelve (fitness de las crías antes del rescate, diversidad).
+        """
+        parents = self.toolbox.select(self.pop, len(self.pop))
+        offspring = list(map(self.toolbox.clone, parents))
 
         for c1, c2 in zip(offspring[::2], offspring[1::2]):
             self.toolbox.mate(c1, c2)
@@ -285,14 +1059,122 @@ class GeneticAlgorithm:
             self.toolbox.mutate(m)
             del m.fitness.values
 
-        invalid = [ind for ind in offspring if not ind.fitness.valid]
-        fits = map(self.toolbox.evaluate, invalid)
-        for ind, fit in zip(invalid, fits):
-            ind.fitness.values = fit
+        # Genomas y atributos de la nueva generación: se arman una sola vez y
+        # los reutilizan la transferencia, la evaluación, la diversidad y la genealogía
+        genomes = self._genome_matrix(offspring)
+        traits = self._trait_matrix(offspring)
+
+        # Cada descendiente hereda la posición de su progenitor con un pequeño desplazamiento
+        self._jitter_positions(offspring)
+
+        # Transferencia horizontal entre vecinos antes de evaluar
+        self.hgt_hist.append(self._horizontal_transfer(offspring, genomes))
+
+        # Todos los descendientes mutaron, así que todos se evalúan. La población
+        # se comprime una sola vez: la misma compresión da la diversidad
+        compressed = CompressedPopulation.from_genomes(genomes)
+        fitness = self._evaluate_compressed(compressed, traits)
+        for ind, fit in zip(offspring, fitness):
+            ind.fitness.values = (float(fit),)
 
         self.pop[:] = offspring
 
-        vals = [ind.fitness.values[0] for ind in self.pop]
+        # Diversidad: frecuencias alélicas ponderadas por multiplicidad de genotipo
+        H = compressed.diversity()
+
+        if H < self.evo_rescue_threshold:  
+            rescued = []
+            for i, ind in enumerate(self.pop):
+                if random.random() < self.evo_rescue_prob:  
+                    idx = random.randint(0, len(ind) - 1)
+                    ind[idx] = 1 - ind[idx]
+                    genomes[i, idx] = ind[idx]
+                    rescued.append(i)
+            if rescued:
+                self._assign_fitness(
+                    [self.pop[i] for i in rescued], genomes[rescued], traits[rescued]
+                )
+        self._genomes = genomes
+        return fitness, H
+
+    def _packed_generation(self):
+        """
+        Generación de paneles grandes (más de 64 genes) sobre los arreglos de
+        la población, sin individuos de DEAP: torneo de 3 por índice de fila,
+        cruce de dos puntos y mutación sobre las palabras empaquetadas
+        (bitgenome), atributos y posiciones en bloque. Solo se desempaquetan
+        los genotipos únicos al evaluar. Devuelve (fitness de las crías antes
+        del rescate, diversidad).
+        """
+        n_genes = len(self.genes)
+        n = len(self._words)
+
+        # Como tools.selTournament(tournsize=3): el mejor de 3 aspirantes al azar
+        aspirants = self.rng.integers(0, n, (n, 3))
+        parents = aspirants[np.arange(n), np.argmax(self._fitness[aspirants], axis=1)]
+
+        words = self._words[parents]
+        pairs = n // 2 * 2
+        words[0:pairs:2], words[1:pairs:2] = bitgenome.cx_two_point(
+            words[0:pairs:2], words[1:pairs:2], n_genes, self.rng
+        )
+        bitgenome.mutate(words, self.mutation_rate, n_genes, self.rng)
+        traits = self._mutate_traits(self._traits[parents])
+        positions = self._jitter(self._positions[parents])
+
+        self.hgt_hist.append(len(self._conjugation(words, positions)))
+
+        compressed = CompressedPopulation.from_words(words, n_genes)
+        fitness = self._evaluate_compressed(compressed, traits)
+        H = compressed.diversity()
+
+        final = fitness
+        if H < self.evo_rescue_threshold:
+            rescued = np.nonzero(self.rng.random(n) < self.evo_rescue_prob)[0]
+            if len(rescued):
+                genes = self.rng.integers(0, n_genes, len(rescued))
+                bit = np.left_shift(np.uint64(1), (genes % bitgenome.WORD_BITS).astype(np.uint64))
+                words[rescued, genes // bitgenome.WORD_BITS] ^= bit
+                final = fitness.copy()
+                final[rescued] = self._evaluate_compressed(
+                    CompressedPopulation.from_words(words[rescued], n_genes), traits[rescued]
+                )
+
+        self._words, self._traits, self._positions = words, traits, positions
+        self._fitness, self._slots = final, self._slots[parents]
+        self._pop = None
+        return fitness, H
+
+    def _take_rows(self, rows):
+        """Deja en los arreglos de un panel grande solo las filas rows."""
+        self._words = self._words[rows]
+        self._traits = self._traits[rows]
+        self._positions = self._positions[rows]
+        self._fitness = self._fitness[rows]
+        self._slots = self._slots[rows]
+        self._pop = None
+
+    def step(self) -> bool:
+        if self.current_step >= len(self.times):
+            return False
+
+        self._update_conditions()
+
+        if self.fast_forward:
+            end, period = self._fast_forward_target()
+            if end - self.current_step >= 2:
+                self._advance_to(end, period)
+                return True
+
+        start_time = time.perf_counter()  # Inicio de medición
+        cpu_start = time.process_time()
+
+        if self._packed:
+            fitness, H = self._packed_generation()
+        else:
+            fitness, H = self._individual_generation()
+
+        vals = fitness.tolist()
         best = max(vals)
         avg = sum(vals) / len(vals)
 
@@ -311,39 +1193,10 @@ class GeneticAlgorithm:
                 logging.warning(f"¡Convergencia lenta! Aumentando mutación a {new_mutation_rate}")
                 self.mutation_rate = new_mutation_rate
 
-        if self.current_ab:
-            lo, hi = (
-                self.current_ab["concentracion_minima"],
-                self.current_ab["concentracion_maxima"],
-            )
-            kill = (
-                0.0
-                if hi <= lo
-                else max(0.0, min(1.0, (self.current_conc - lo) / (hi - lo)))
-            )
-        else:
-            kill = 0.0
+        kill = self._kill_rate()
 
         mut = self.mutation_rate
 
-        N = len(self.pop)
-        H = 0.0
-        for j in range(len(self.genes)):
-            p_j = sum(ind[j] for ind in self.pop) / N
-            if 0 < p_j < 1:
-                H += -p_j * np.log2(p_j) - (1 - p_j) * np.log2(1 - p_j)
-
-        if H < self.evo_rescue_threshold:  
-            for ind in self.pop:
-                if random.random() < self.evo_rescue_prob:  
-                    idx = random.randint(0, len(ind) - 1)
-                    ind[idx] = 1 - ind[idx]
-                    del ind.fitness.values
-            invalid = [ind for ind in self.pop if not ind.fitness.valid]
-            fits = map(self.toolbox.evaluate, invalid)
-            for ind, fit in zip(invalid, fits):
-                ind.fitness.values = fit
-
         self.best_hist.append(best)
         self.avg_hist.append(avg)
         self.kill_hist.append(kill)
@@ -401,13 +1254,23 @@ class GeneticAlgorithm:
 
         generation_time = time.perf_counter() - start_time
         
-        # 1. Adaptación de tamaño de población
-        if generation_time > self.target_time_per_generation:
+        # 1. Adaptación de tamaño de población (solo sin semilla: depende del tiempo real)
+        if self.seed is None and generation_time > self.target_time_per_generation:
             reduction_factor = max(0.7, self.target_time_per_generation / generation_time)
-            new_pop_size = max(self.min_pop_size, int(len(self.pop) * reduction_factor))
-            if new_pop_size < len(self.pop):
-                logging.info(f"Adaptación: reduciendo población de {len(self.pop)} a {new_pop_size} por eficiencia")
-                self.pop = tools.selBest(self.pop, new_pop_size)
+            size = len(self._words) if self._packed else len(self.pop)
+            new_pop_size = max(self.min_pop_size, int(size * reduction_factor))
+            if new_pop_size < size:
+                logging.info(f"Adaptación: reduciendo población de {size} a {new_pop_size} por eficiencia")
+                if self._packed:
+                    keep = np.argsort(-self._fitness, kind="stable")[:new_pop_size]
+                    self._take_rows(keep)
+                else:
+                    # Como tools.selBest, pero conservando la fila de cada genoma
+                    keep = sorted(
+                        range(len(self.pop)), key=lambda i: self.pop[i].fitness, reverse=True
+                    )[:new_pop_size]
+                    self.pop = [self.pop[i] for i in keep]
+                    self._genomes = self._genomes[keep]
         
         # 2. Adaptación de tasa de mutación
         if H < self.diversity_threshold:
@@ -419,6 +1282,14 @@ class GeneticAlgorithm:
         elif self.mutation_rate > self.base_mutation_rate:
             self.mutation_rate = max(self.base_mutation_rate, self.mutation_rate * 0.9)
 
+        if self.lineage is not None:
+            self._record_lineage()
+
+        # Telemetría de la generación: CPU y tiempo real consumidos, RSS al terminar
+        self.cpu_time_hist[self.current_step] = time.process_time() - cpu_start
+        self.wall_time_hist[self.current_step] = time.perf_counter() - start_time
+        self.ram_mb_hist[self.current_step] = self._process.memory_info().rss / (1024**2)
+
         logging.debug(
             f"Step {self.current_step}: best_fit={best:.4f}, avg_fit={avg:.4f}, pop_size={self.population_total:.2f}, kill_rate={kill:.4f}, diversity={H:.4f}"
         )
@@ -426,8 +1297,164 @@ class GeneticAlgorithm:
         self.current_step += 1
         return True
 
+    def scenario_params(self, selected_gene_ids):
+        """
+        Todas las entradas que determinan el resultado de la corrida, en tipos
+        JSON. Es la base de la clave de la caché de resultados.
+        """
+        return {
+            "genes": [
+                {"id": g["id"], "peso_resistencia": float(g["peso_resistencia"])}
+                for g in self.genes
+            ],
+            "selected_gene_ids": sorted(selected_gene_ids),
+            "schedule": [
+                [float(t), ab, float(conc)] for t, ab, conc in self.schedule
+            ],
+            "mutation_rate": self.base_mutation_rate,
+            "generations": self.generations,
+            "pop_size": self.max_pop_size,
+            "death_rate": self.death_rate,
+            "environmental_factors": self.environmental_factors,
+            "reproduction_rate": self.reproduction_rate,
+            "phenotype_mutation_prob": self.phenotype_mutation_prob,
+            "phenotype_mutation_sigma": self.phenotype_mutation_sigma,
+            "evo_rescue_threshold": self.evo_rescue_threshold,
+            "evo_rescue_prob": self.evo_rescue_prob,
+            "r_growth": self.r_growth,
+            "K_capacity": self.K_capacity,
+            "pressure_factor": self.pressure_factor,
+            "spatial_radius": self.spatial_radius,
+            "spatial_jitter": self.spatial_jitter,
+            "hours_per_generation": self.hours_per_generation,
+            "combination_therapy": self.combination_therapy,
+            "interaction_model": self.interaction_model,
+            "hgt_rate": self.hgt_rate,
+            "hgt_genes": self.hgt_genes,
+            "hgt_radius": self.hgt_radius,
+            "drug_specificity": sorted(
+                [g, a, float(w)] for (g, a), w in self.drug_specificity.items()
+            ),
+            "epistasis": sorted([a, b, float(w)] for (a, b), w in self.epistasis.items()),
+            "fitness_model": self.fitness_model,
+            "fast_forward": self.fast_forward,
+            "ff_window": self.ff_window,
+            "ff_fitness_tol": self.ff_fitness_tol,
+            "ff_population_tol": self.ff_population_tol,
+            "ff_conc_tol": self.ff_conc_tol,
+            "ff_max_period": self.ff_max_period,
+            # La genealogía no altera la dinámica, pero su estado viaja con el resultado
+            "lineage_capacity": self.lineage.capacity if self.lineage is not None else None,
+            "seed": self.seed,
+        }
+
+    _LIST_HISTORIES = (
+        "best_hist",
+        "avg_hist",
+        "kill_hist",
+        "mut_hist",
+        "div_hist",
+        "population_hist",
+        "expansion_index_hist",
+        "degradation_hist",
+        "fitness_hist",
+        "hgt_hist",
+    )
+    _ARRAY_HISTORIES = ("cpu_time_hist", "ram_mb_hist", "wall_time_hist")
+
+    def export_results(self):
+        """
+        Resultado de una corrida terminada como (arrays, resumen): historiales y
+        población final en arrays NumPy, y el estado escalar en un dict JSON.
+        """
+        arrays = {name: np.asarray(getattr(self, name), dtype=float) for name in self._LIST_HISTORIES}
+        for name in self._ARRAY_HISTORIES:
+            arrays[name] = np.asarray(getattr(self, name), dtype=float)
+        if self._packed:
+            arrays["pop_genomes"] = self._population_genomes()
+            arrays["pop_traits"] = self._traits
+        else:
+            arrays["pop_genomes"] = self._genome_matrix(self.pop)
+            arrays["pop_traits"] = self._trait_matrix(self.pop)
+        arrays["pop_positions"] = self.positions
+        arrays["fast_forward_mask"] = np.asarray(self.fast_forward_mask, dtype=np.uint8)
+        if self.lineage is not None:
+            for name, values in self.lineage.export_arrays().items():
+                arrays[f"lineage_{name}"] = values
+        if self._packed:
+            arrays["pop_fitness"] = self._fitness
+        else:
+            arrays["pop_fitness"] = np.array(
+                [ind.fitness.values[0] if ind.fitness.valid else 0.0 for ind in self.pop], dtype=float
+            )
+        summary = {
+            "current_step": self.current_step,
+            "current_time": float(getattr(self, "current_time", 0.0)),
+            "current_ab": getattr(self, "current_ab", None),
+            "current_conc": float(getattr(self, "current_conc", 0.0)),
+            "current_concs": np.asarray(self.current_concs, dtype=float).tolist(),
+            "mutation_rate": self.mutation_rate,
+            "population_total": self.population_total,
+            "extinction_reached": self.extinction_reached,
+            "resistance_critical": self.resistance_critical,
+            "fast_forward_intervals": [list(iv) for iv in self.fast_forward_intervals],
+            "average_attributes": self.get_average_attributes(),
+        }
+        return arrays, summary
+
+    def restore_results(self, arrays, summary):
+        """Deja el GA en el estado final guardado por export_results()."""
+        for name in self._LIST_HISTORIES:
+            setattr(self, name, arrays[name].tolist())
+        for name in self._ARRAY_HISTORIES:
+            setattr(self, name, np.array(arrays[name], dtype=float))
+        self.fast_forward_mask = arrays["fast_forward_mask"].astype(bool)
+        self.fast_forward_intervals = [tuple(iv) for iv in summary["fast_forward_intervals"]]
+
+        genomes = np.asarray(arrays["pop_genomes"], dtype=np.uint8).reshape(-1, len(self.genes))
+        if self._packed:
+            n = len(genomes)
+            self._words = bitgenome.pack(genomes)
+            self._traits = np.asarray(arrays["pop_traits"], dtype=float).reshape(n, len(TRAITS))
+            self._positions = np.asarray(arrays["pop_positions"], dtype=np.float32).reshape(n, 2)
+            self._fitness = np.asarray(arrays["pop_fitness"], dtype=float)
+            self._slots = np.arange(n, dtype=np.int32)
+            self._pop = None
+        else:
+            pop = []
+            for bits, traits, pos, fit in zip(
+                arrays["pop_genomes"], arrays["pop_traits"], arrays["pop_positions"], arrays["pop_fitness"]
+            ):
+                ind = creator.Individual(bits.tolist(), *traits.tolist(), pos=pos)
+                ind.fitness.values = (float(fit),)
+                pop.append(ind)
+            self.pop = pop
+            self._genomes = genomes
+
+        if self.lineage is not None:
+            self.lineage.restore_arrays({
+                name[len("lineage_"):]: values
+                for name, values in arrays.items() if name.startswith("lineage_")
+            })
+
+        self.times = np.linspace(0, self.generations, self.generations)
+        self.conc_curve = concentration_curve(self.schedule, self.times, self.hours_per_generation)
+        if self.combination_therapy:
+            self._prepare_combination()
+            self.current_concs = np.array(summary["current_concs"], dtype=float)
+        self.current_step = summary["current_step"]
+        self.current_time = summary["current_time"]
+        self.current_ab = summary["current_ab"]
+        self.current_conc = summary["current_conc"]
+        self.mutation_rate = summary["mutation_rate"]
+        self.population_total = summary["population_total"]
+        self.extinction_reached = summary["extinction_reached"]
+        self.resistance_critical = summary["resistance_critical"]
+
     def get_average_attributes(self):
         """Calcula el promedio de los atributos biológicos de la población actual."""
+        if self._packed and self._traits is not None and len(self._traits):
+            return {name: float(value) for name, value in zip(TRAITS, self._traits.mean(axis=0))}
         if not self.pop:
             return {
                 "recubrimiento": 0,
@@ -446,18 +1473,25 @@ class GeneticAlgorithm:
         }
         return avg_attributes
 
-    def save_final_gene_attributes(self, selected_gene_ids):
+    def save_final_gene_attributes(self, selected_gene_ids, session=None):
         logging.info(f"Saving final gene attributes for simulation_id={self.current_simulation_id}")
-        """Guarda solo los genes activos (seleccionados por el usuario) al final de la simulación."""
-        session = get_session()
+        """
+        Guarda solo los genes activos (seleccionados por el usuario) al final de la simulación.
+        Si se recibe una sesión, no hace commit (lo hace el llamador).
+        """
+        own_session = session is None
+        if own_session:
+            session = get_session()
         antibiotico_id = self.current_ab["id"] if self.current_ab else None
         generacion_final = self.current_step - 1  # Última generación
         
+        genomes = self._population_genomes()
+        traits = self._population_traits()
         for idx, gen in enumerate(self.genes):
             if gen["id"] in selected_gene_ids:
-                valores = [ind[idx] for ind in self.pop]
-                promedio = float(np.mean(valores)) if valores else 0.0
-                std = float(np.std(valores)) if valores else 0.0
+                valores = genomes[:, idx]
+                promedio = float(np.mean(valores)) if len(valores) else 0.0
+                std = float(np.std(valores)) if len(valores) else 0.0
                 sim_attr = SimulacionAtributos(
                     simulacion_id=self.current_simulation_id,
                     generacion=generacion_final,
@@ -477,9 +1511,9 @@ class GeneticAlgorithm:
         ]
         
         for atributo in atributos:
-            valores = [getattr(ind, atributo) for ind in self.pop]
-            promedio = float(np.mean(valores)) if valores else 0.0
-            std = float(np.std(valores)) if valores else 0.0
+            valores = traits[:, TRAITS.index(atributo)]
+            promedio = float(np.mean(valores)) if len(valores) else 0.0
+            std = float(np.std(valores)) if len(valores) else 0.0
             sim_attr = SimulacionAtributos(
                 simulacion_id=self.current_simulation_id,
                 generacion=generacion_final,
@@ -489,5 +1523,6 @@ class GeneticAlgorithm:
                 desviacion_std=std,
             )
             session.add(sim_attr)
-        session.commit()
-        session.close()
\ No newline at end of file
+        if own_session:
+            session.commit()
+            session.close()
\ No newline at end of file
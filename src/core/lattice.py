@@ -0,0 +1,400 @@
+"""
+Simulación espacial de la colonia sobre una grilla 2-D.
+
+Cada celda guarda conteos locales por clase de genotipo (niveles de
+resistencia 0..1) y la media local de los atributos biológicos. En cada paso,
+todo sobre la grilla completa y con operaciones vectorizadas:
+
+    1) Difusión del antibiótico desde el medio (celdas vacías, a la concentración
+       del tratamiento) hacia el interior de la colonia, con consumo proporcional
+       a la biomasa y a sus enzimas (penetración en biofilm).
+    2) Crecimiento logístico local y muerte natural por clase.
+    3) Muerte por antibiótico según la concentración efectiva en la celda.
+    4) Mutación entre clases de resistencia adyacentes.
+    5) Migración por difusión (laplaciano de 5 puntos con scipy.ndimage); los
+       atributos viajan con la biomasa.
+
+Con bordes reflejantes la migración y la mutación conservan la biomasa total.
+Expone los mismos historiales que GeneticAlgorithm (avg_hist, div_hist,
+population_hist, telemetría...) para reutilizar reportes y métricas, y
+map_layers() para que MapWindow dibuje la grilla directamente.
+"""
+import logging
+import time
+
+import numpy as np
+import psutil
+from scipy import ndimage
+
+from src.core.pharmacokinetics import concentration_curve
+from src.core.population import TRAITS
+
+_STENCIL = np.array([1.0, -2.0, 1.0], dtype=np.float32)
+
+def laplacian(field, mode="reflect", cval=0.0):
+    """Laplaciano de 5 puntos sobre los dos últimos ejes de field."""
+    out = ndimage.correlate1d(field, _STENCIL, axis=-1, mode=mode, cval=cval)
+    out += ndimage.correlate1d(field, _STENCIL, axis=-2, mode=mode, cval=cval)
+    return out
+
+class LatticeSimulation:
+    def __init__(
+        self,
+        genes,
+        antibiotic_schedule=None,
+        mutation_rate: float = 0.05,
+        generations: int = 50,
+        grid_size: int = 128,
+        n_classes: int = 8,
+        death_rate: float = 0.05,
+        environmental_factors=None,
+        simulation_id=None,
+        reproduction_rate: float = 1.0,
+        r_growth: float = 0.2,
+        K_cell: float = 100.0,
+        pressure_factor: float = 0.5,
+        migration_rate: float = 0.1,
+        antibiotic_diffusion: float = 0.2,
+        antibiotic_uptake: float = 0.01,
+        antibiotic_substeps: int = 4,
+        resistance_cost: float = 0.3,
+        inoculum_radius: float = 0.1,
+        seed=None,
+        spatial_radius: float = 50.0,
+        hours_per_generation=None,
+    ):
+        """
+        :param genes: lista de dicts con "id" y "peso_resistencia"
+        :param antibiotic_schedule: lista de tuplas (t_event, antibiotic_obj, concentration)
+        :param mutation_rate: fracción de cada clase que pasa a cada clase vecina por paso
+        :param grid_size: celdas por lado de la grilla
+        :param n_classes: clases de genotipo (niveles de resistencia equiespaciados en [0, 1])
+        :param K_cell: capacidad de carga de cada celda
+        :param migration_rate: coeficiente de difusión de la biomasa (≤ 0.25 por estabilidad)
+        :param antibiotic_diffusion: coeficiente de difusión del antibiótico (≤ 0.25)
+        :param antibiotic_uptake: consumo de antibiótico por unidad de densidad y enzimas
+        :param antibiotic_substeps: iteraciones de difusión del antibiótico por paso
+        :param resistance_cost: reducción relativa del crecimiento de la clase más resistente
+        :param inoculum_radius: radio del inóculo inicial como fracción del lado de la grilla
+        :param spatial_radius: semilado del área que representa la grilla en el mapa
+        :param hours_per_generation: horas reales por generación para la
+            farmacocinética (None = concentraciones escalonadas, sin decaimiento)
+        """
+        if migration_rate > 0.25 or antibiotic_diffusion > 0.25:
+            raise ValueError("Los coeficientes de difusión deben ser ≤ 0.25 (esquema explícito)")
+        self.genes = genes
+        self.schedule = sorted(antibiotic_schedule or [], key=lambda e: e[0])
+        self.mutation_rate = mutation_rate
+        self.generations = generations
+        self.grid_size = grid_size
+        self.n_classes = n_classes
+        self.death_rate = death_rate
+        self.environmental_factors = environmental_factors or {
+            "temperature": 37.0,
+            "pH": 7.4,
+        }
+        self.current_simulation_id = simulation_id
+        self.reproduction_rate = reproduction_rate
+        self.r_growth = r_growth
+        self.K_cell = K_cell
+        self.pressure_factor = pressure_factor
+        self.migration_rate = migration_rate
+        self.antibiotic_diffusion = antibiotic_diffusion
+        self.antibiotic_uptake = antibiotic_uptake
+        self.antibiotic_substeps = antibiotic_substeps
+        self.resistance_cost = resistance_cost
+        self.inoculum_radius = inoculum_radius
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.spatial_radius = spatial_radius
+        self.hours_per_generation = hours_per_generation
+        self.conc_curve = None
+
+        self.total_weight = sum(g["peso_resistencia"] for g in genes) or 1e-8
+        self.resistance_levels = np.linspace(0.0, 1.0, n_classes, dtype=np.float32)
+
+        self.extinction_threshold = 100
+        self.resistance_threshold = 0.8
+        self.extinction_reached = False
+        self.resistance_critical = False
+        # Por debajo de esta densidad (individuos) la celda se considera vacía
+        self.empty_threshold = 1e-3
+
+        self.counts = None  # (clases, alto, ancho)
+        self.traits = None  # (atributos, alto, ancho), medias locales
+        self.antibiotic = None  # (alto, ancho), concentración local
+        self.times = None
+        self.current_step = 0
+        self.current_ab = None
+        self.current_conc = 0.0
+        self.population_total = None
+
+        self.best_hist = []
+        self.avg_hist = []
+        self.kill_hist = []
+        self.mut_hist = []
+        self.div_hist = []
+        self.population_hist = []
+        self.expansion_index_hist = []
+        self.degradation_hist = []
+
+        self._process = None
+        self._initial_area = 1
+        self.cpu_time_hist = np.zeros(0)
+        self.ram_mb_hist = np.zeros(0)
+        self.wall_time_hist = np.zeros(0)
+
+    @property
+    def extent(self):
+        """Límites (x_min, x_max, y_min, y_max) que ocupa la grilla en el mapa."""
+        r = self.spatial_radius
+        return (-r, r, -r, r)
+
+    def initialize(self, selected_gene_ids: list):
+        """Siembra un inóculo circular en el centro con la resistencia de los genes elegidos."""
+        logging.info(f"Initializing lattice {self.grid_size}x{self.grid_size} for genes: {selected_gene_ids}")
+        if self.seed is not None:
+            self.rng = np.random.default_rng(self.seed)
+        n = self.grid_size
+        shape = (n, n)
+
+        resistance = sum(
+            g["peso_resistencia"] for g in self.genes if g["id"] in selected_gene_ids
+        ) / self.total_weight
+        start_class = int(np.clip(round(resistance * (self.n_classes - 1)), 0, self.n_classes - 1))
+
+        yy, xx = np.indices(shape)
+        centro = (n - 1) / 2.0
+        inoculum = np.hypot(xx - centro, yy - centro) <= max(1.0, self.inoculum_radius * n)
+
+        self.counts = np.zeros((self.n_classes, n, n), dtype=np.float32)
+        self.counts[start_class][inoculum] = 0.5 * self.K_cell
+        self._initial_area = int(inoculum.sum())
+
+        # Atributos iniciales heterogéneos (como el GA, uniformes en [0.5, 1]) y suavizados
+        traits = self.rng.uniform(0.5, 1.0, (len(TRAITS), n, n)).astype(np.float32)
+        self.traits = ndimage.uniform_filter(traits, size=(1, 5, 5), mode="reflect")
+        self.antibiotic = np.zeros(shape, dtype=np.float32)
+
+        self.times = np.linspace(0, self.generations, self.generations)
+        self.conc_curve = concentration_curve(self.schedule, self.times, self.hours_per_generation)
+        self.current_step = 0
+        for hist in (
+            self.best_hist, self.avg_hist, self.kill_hist, self.mut_hist, self.div_hist,
+            self.population_hist, self.expansion_index_hist, self.degradation_hist,
+        ):
+            hist.clear()
+
+        self.population_total = float(self.counts.sum(dtype=np.float64))
+        self.population_hist.append(self.population_total)
+        self.expansion_index_hist.append(1.0)
+        self.degradation_hist.append(0.0)
+
+        self._process = psutil.Process()
+        self.cpu_time_hist = np.zeros(len(self.times))
+        self.ram_mb_hist = np.zeros(len(self.times))
+        self.wall_time_hist = np.zeros(len(self.times))
+
+    def _update_antibiotic(self, t: float):
+        self.current_ab = None
+        self.current_conc = 0.0
+        for t_evt, ab, conc in self.schedule:
+            if t >= t_evt:
+                self.current_ab = ab
+                self.current_conc = conc
+            else:
+                break
+
+    def growth_modifier(self):
+        temp = self.environmental_factors.get("temperature", 37.0)
+        if 35 <= temp <= 39:
+            return 1.0
+        return max(0.0, 1 - abs(temp - 37) * 0.1)
+
+    def death_modifier(self):
+        pH = self.environmental_factors.get("pH", 7.4)
+        return 1.0 if 6.5 <= pH <= 7.5 else 1.2
+
+    def _diffuse_antibiotic(self, density):
+        """
+        Difusión explícita con las celdas vacías (medio) y el borde de la grilla
+        fijos a la concentración del tratamiento, y consumo local por la biomasa
+        (más enzimas, más degradación).
+        """
+        medium = density * self.K_cell <= self.empty_threshold
+        uptake = self.antibiotic_uptake * density * self.traits[TRAITS.index("enzimas")]
+        self.antibiotic[medium] = self.current_conc
+        for _ in range(self.antibiotic_substeps):
+            self.antibiotic += self.antibiotic_diffusion * laplacian(
+                self.antibiotic, mode="constant", cval=self.current_conc
+            )
+            self.antibiotic -= uptake * self.antibiotic
+            np.clip(self.antibiotic, 0.0, None, out=self.antibiotic)
+            self.antibiotic[medium] = self.current_conc
+
+    def _survival(self):
+        """
+        Supervivencia por clase y celda (sigmoide del GA). La cubierta reduce y la
+        permeabilidad aumenta la concentración que llega a cada bacteria.
+        """
+        lo = self.current_ab["concentracion_minima"]
+        hi = self.current_ab["concentracion_maxima"]
+        rec = self.traits[TRAITS.index("recubrimiento")]
+        per = self.traits[TRAITS.index("permeabilidad")]
+        effective = self.antibiotic * per * (1.0 - 0.5 * rec)
+        exposure = effective[None] * (1.0 - self.resistance_levels)[:, None, None]
+        if hi - lo <= 0:
+            return (exposure < lo).astype(np.float32)
+        k = 10.0 / (hi - lo)
+        z = np.clip(k * (exposure - (lo + hi) / 2.0), -50.0, 50.0)
+        return 1.0 / (1.0 + np.exp(z))
+
+    def _mutate(self):
+        """Flujo simétrico entre clases adyacentes; conserva el total por celda."""
+        mu = self.mutation_rate
+        if mu <= 0 or self.n_classes < 2:
+            return
+        up = mu * self.counts[:-1]
+        down = mu * self.counts[1:]
+        self.counts[:-1] += down - up
+        self.counts[1:] += up - down
+
+    def _migrate(self):
+        """Difusión de la biomasa; los atributos viajan con ella (medias ponderadas)."""
+        total_before = self.counts.sum(axis=0)
+        trait_mass = self.traits * total_before
+        self.counts += self.migration_rate * laplacian(self.counts)
+        trait_mass += self.migration_rate * laplacian(trait_mass)
+
+        total_after = self.counts.sum(axis=0)
+        occupied = total_after > self.empty_threshold
+        self.traits[:, occupied] = np.clip(trait_mass[:, occupied] / total_after[occupied], 0.0, 1.0)
+
+    def step(self) -> bool:
+        if self.current_step >= len(self.times):
+            return False
+
+        t = self.times[self.current_step]
+        self.current_time = t
+        self._update_antibiotic(t)
+        self.current_conc = float(self.conc_curve[self.current_step])
+
+        start_time = time.perf_counter()
+        cpu_start = time.process_time()
+
+        prev_population = self.population_total
+        total = self.counts.sum(axis=0)
+        density = total / self.K_cell
+
+        # 1) Penetración del antibiótico
+        self._diffuse_antibiotic(density)
+
+        # 2) Crecimiento logístico local y muerte natural
+        r = self.r_growth * self.reproduction_rate * self.growth_modifier()
+        rep = self.traits[TRAITS.index("reproduccion")]
+        class_rate = (1.0 - self.resistance_cost * self.resistance_levels)[:, None, None]
+        growth = r * class_rate * (rep * np.maximum(0.0, 1.0 - density))[None]
+        death = self.death_rate * self.death_modifier()
+        self.counts *= 1.0 + growth - death
+
+        # 3) Muerte por antibiótico
+        if self.current_ab and self.current_conc > 0.0:
+            self.counts *= 1.0 - self.pressure_factor * (1.0 - self._survival())
+
+        # 4) Mutación y 5) migración
+        self._mutate()
+        self._migrate()
+        np.maximum(self.counts, 0.0, out=self.counts)
+        self.counts[:, self.counts.sum(axis=0) < self.empty_threshold] = 0.0
+
+        self._record(prev_population)
+
+        self.cpu_time_hist[self.current_step] = time.process_time() - cpu_start
+        self.wall_time_hist[self.current_step] = time.perf_counter() - start_time
+        self.ram_mb_hist[self.current_step] = self._process.memory_info().rss / (1024**2)
+
+        self.current_step += 1
+        return True
+
+    def _record(self, prev_population):
+        """Historiales equivalentes a los del GA a partir de los conteos por clase."""
+        class_totals = self.counts.sum(axis=(1, 2), dtype=np.float64)
+        total = float(class_totals.sum())
+        self.population_total = total
+
+        if total > 0:
+            freqs = class_totals / total
+            avg = float(freqs @ self.resistance_levels)
+            present = np.nonzero(class_totals >= 1.0)[0]
+            best = float(self.resistance_levels[present[-1]]) if len(present) else avg
+            nz = freqs[freqs > 0]
+            diversity = float(-(nz * np.log2(nz)).sum())
+        else:
+            avg = best = diversity = 0.0
+
+        if self.current_ab:
+            lo = self.current_ab["concentracion_minima"]
+            hi = self.current_ab["concentracion_maxima"]
+            kill = 0.0 if hi <= lo else max(0.0, min(1.0, (self.current_conc - lo) / (hi - lo)))
+        else:
+            kill = 0.0
+
+        self.best_hist.append(best)
+        self.avg_hist.append(avg)
+        self.kill_hist.append(kill)
+        self.mut_hist.append(self.mutation_rate)
+        self.div_hist.append(diversity)
+        self.population_hist.append(total)
+
+        # Índice de expansión: radio colonizado relativo al del inóculo
+        area = int((self.counts.sum(axis=0) > self.empty_threshold).sum())
+        self.expansion_index_hist.append(float(np.sqrt(area / max(1, self._initial_area))))
+
+        if self.current_ab and self.current_conc > 0.0 and prev_population > 0:
+            self.degradation_hist.append(1 - total / prev_population)
+        else:
+            self.degradation_hist.append(0.0)
+
+        if total <= self.extinction_threshold and not self.extinction_reached:
+            logging.warning(f"Extinction threshold reached at step {self.current_step}.")
+            self.extinction_reached = True
+        if avg >= self.resistance_threshold and not self.resistance_critical:
+            logging.warning(f"Critical resistance threshold reached at step {self.current_step}.")
+            self.resistance_critical = True
+
+        logging.debug(
+            f"Lattice step {self.current_step}: population={total:.2f}, avg_resistance={avg:.4f}, "
+            f"diversity={diversity:.4f}, colonized_cells={area}"
+        )
+
+    def get_average_attributes(self):
+        """Media de los atributos ponderada por la biomasa de cada celda."""
+        total = self.counts.sum(axis=0)
+        mass = float(total.sum(dtype=np.float64))
+        if mass <= 0:
+            return {name: 0 for name in TRAITS}
+        return {
+            name: float((self.traits[i] * total).sum(dtype=np.float64) / mass)
+            for i, name in enumerate(TRAITS)
+        }
+
+    def map_layers(self):
+        """
+        Capas (alto, ancho) para el mapa: densidad relativa a la capacidad,
+        concentración de antibiótico, resistencia media y la media de cada
+        atributo. Las celdas vacías quedan en NaN salvo densidad y antibiótico.
+        """
+        total = self.counts.sum(axis=0)
+        occupied = total > self.empty_threshold
+        layers = {
+            "densidad": total / self.K_cell,
+            "antibiotico": self.antibiotic,
+        }
+        resistance = np.full(total.shape, np.nan, dtype=np.float32)
+        resistance[occupied] = (
+            np.tensordot(self.resistance_levels, self.counts, axes=1)[occupied] / total[occupied]
+        )
+        layers["resistencia"] = resistance
+        for i, name in enumerate(TRAITS):
+            layers[name] = np.where(occupied, self.traits[i], np.nan).astype(np.float32)
+        return layers
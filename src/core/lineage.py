@@ -0,0 +1,217 @@
+"""
+Registro compacto de genealogía de la población del GA.
+
+Por generación se guardan solo dos arreglos:
+    - parents: int32, índice del progenitor principal de cada individuo en la
+      población de la generación anterior (la cría hereda la ranura del
+      progenitor que aporta su posición y su fenotipo).
+    - events: int32 N×2, (individuo, ±(gen + 1)) por cada bit que difiere del
+      progenitor: + si lo adquirió, - si lo perdió. Incluye mutación,
+      recombinación, transferencia horizontal y rescate evolutivo.
+
+Las generaciones viven en un buffer circular de `capacity` entradas, así que la
+memoria queda acotada sin importar la duración de la corrida. Cada
+`prune_interval` generaciones se poda el buffer hacia atrás desde la población
+actual: en cada generación solo quedan los ancestros de algún individuo vivo
+(las ramas extintas se descartan y los índices se compactan). Como los linajes
+coalescen, tras la poda cada generación antigua ocupa unos pocos elementos.
+
+Las primeras apariciones y las fijaciones de cada gen se llevan aparte en
+arreglos por gen, de modo que sobreviven a la rotación del buffer.
+"""
+import numpy as np
+
+class LineageRecorder:
+    """Buffer circular de (parents, events) por generación con poda de ramas extintas."""
+
+    def __init__(self, n_genes, capacity=256, prune_interval=16):
+        if capacity < 1:
+            raise ValueError("capacity debe ser al menos 1")
+        self.n_genes = n_genes
+        self.capacity = capacity
+        self.prune_interval = max(1, prune_interval)
+        self._generations = np.full(capacity, -1, dtype=np.int64)
+        self._parents = [None] * capacity
+        self._events = [None] * capacity
+        self._count = 0  # generaciones registradas (también fuera del buffer)
+        self._last_genomes = None
+        self.first_seen = np.full(n_genes, -1, dtype=np.int64)
+        self.fixed_since = np.full(n_genes, -1, dtype=np.int64)
+
+    def start(self, genomes, generation=0):
+        """Población fundadora: sin progenitores, solo marca los genes presentes."""
+        genomes = np.asarray(genomes, dtype=np.uint8)
+        self._generations[:] = -1
+        self._parents = [None] * self.capacity
+        self._events = [None] * self.capacity
+        self._count = 0
+        self.first_seen[:] = -1
+        self.fixed_since[:] = -1
+        self._track_genes(genomes, generation)
+        self._last_genomes = genomes.copy()
+
+    def record(self, generation, parents, genomes):
+        """
+        Registra una generación.
+        :param parents: índice del progenitor de cada individuo en la generación anterior
+        :param genomes: matriz individuos × genes de la población nueva
+        """
+        if self._last_genomes is None:
+            raise RuntimeError("LineageRecorder.start() debe llamarse antes de record()")
+        parents = np.asarray(parents, dtype=np.int32)
+        genomes = np.asarray(genomes, dtype=np.uint8)
+
+        diff = genomes.astype(np.int8) - self._last_genomes[parents].astype(np.int8)
+        child, gene = np.nonzero(diff)
+        signed = np.where(diff[child, gene] > 0, gene + 1, -(gene + 1))
+        events = np.column_stack((child, signed)).astype(np.int32)
+
+        slot = self._count % self.capacity
+        self._generations[slot] = generation
+        self._parents[slot] = parents
+        self._events[slot] = events
+        self._count += 1
+
+        self._track_genes(genomes, generation)
+        self._last_genomes = genomes.copy()
+        if self._count % self.prune_interval == 0:
+            self.prune()
+
+    def _track_genes(self, genomes, generation):
+        if len(genomes) == 0:
+            return
+        freq = genomes.mean(axis=0)
+        new = (freq > 0) & (self.first_seen < 0)
+        self.first_seen[new] = generation
+        fixed = freq >= 1.0
+        self.fixed_since[fixed & (self.fixed_since < 0)] = generation
+        self.fixed_since[~fixed] = -1
+
+    def _slots_newest_first(self):
+        n = min(self._count, self.capacity)
+        newest = (self._count - 1) % self.capacity
+        return [(newest - k) % self.capacity for k in range(n)]
+
+    def prune(self):
+        """
+        Descarta las ramas sin descendientes vivos y compacta los índices.
+        La generación más reciente conserva los índices de la población actual.
+        """
+        alive = None
+        for slot in self._slots_newest_first():
+            parents = self._parents[slot]
+            events = self._events[slot]
+            if alive is not None:
+                parents = parents[alive]
+                keep = np.isin(events[:, 0], alive)
+                events = events[keep]
+                events[:, 0] = np.searchsorted(alive, events[:, 0])
+                self._events[slot] = events
+            alive = np.unique(parents)
+            self._parents[slot] = np.searchsorted(alive, parents).astype(np.int32)
+
+    def _walk_back(self):
+        """
+        Recorre el buffer desde la generación más reciente y devuelve, por cada
+        una, (generación, ancestro de cada individuo actual en ella, eventos).
+        """
+        anc = None
+        for slot in self._slots_newest_first():
+            parents = self._parents[slot]
+            if anc is None:
+                anc = np.arange(len(parents), dtype=np.int32)
+            yield self._generations[slot], anc, self._events[slot]
+            anc = parents[anc]
+
+    def export_arrays(self):
+        """Estado completo como dict de arreglos planos (para la caché de resultados)."""
+        slots = self._slots_newest_first()[::-1]  # de la más antigua a la más reciente
+        parents = [self._parents[s] for s in slots]
+        events = [self._events[s] for s in slots]
+        return {
+            "generations": self._generations[slots],
+            "parent_sizes": np.array([len(p) for p in parents], dtype=np.int64),
+            "parents": np.concatenate(parents) if parents else np.zeros(0, dtype=np.int32),
+            "event_sizes": np.array([len(e) for e in events], dtype=np.int64),
+            "events": (
+                np.concatenate(events) if events else np.zeros((0, 2), dtype=np.int32)
+            ),
+            "count": np.array([self._count], dtype=np.int64),
+            "last_genomes": self._last_genomes,
+            "first_seen": self.first_seen,
+            "fixed_since": self.fixed_since,
+        }
+
+    def restore_arrays(self, arrays):
+        """Inversa de export_arrays(); conserva las últimas `capacity` generaciones."""
+        keep = min(len(arrays["generations"]), self.capacity)
+        parents = np.split(arrays["parents"], np.cumsum(arrays["parent_sizes"])[:-1])
+        events = np.split(arrays["events"].reshape(-1, 2), np.cumsum(arrays["event_sizes"])[:-1])
+        self._count = int(arrays["count"][0])
+        self._generations[:] = -1
+        self._parents = [None] * self.capacity
+        self._events = [None] * self.capacity
+        generations = arrays["generations"][len(arrays["generations"]) - keep:]
+        for k, (generation, par, ev) in enumerate(
+            zip(generations, parents[-keep:] if keep else [], events[-keep:] if keep else [])
+        ):
+            slot = (self._count - keep + k) % self.capacity
+            self._generations[slot] = generation
+            self._parents[slot] = par.astype(np.int32)
+            self._events[slot] = ev.astype(np.int32)
+        self._last_genomes = np.asarray(arrays["last_genomes"], dtype=np.uint8)
+        self.first_seen = np.asarray(arrays["first_seen"], dtype=np.int64).copy()
+        self.fixed_since = np.asarray(arrays["fixed_since"], dtype=np.int64).copy()
+
+    @property
+    def generations_stored(self):
+        return min(self._count, self.capacity)
+
+    @property
+    def nbytes(self):
+        """Memoria ocupada por los arreglos del buffer."""
+        used = [a for a in self._parents + self._events if a is not None]
+        return sum(a.nbytes for a in used)
+
+    def tmrca(self):
+        """
+        Generaciones hasta el ancestro común más reciente de la población
+        actual, o None si no coalesce dentro del buffer.
+        """
+        if self._count == 0:
+            return None
+        current = self._generations[(self._count - 1) % self.capacity]
+        for generation, anc, _ in self._walk_back():
+            if len(anc) and (anc == anc[0]).all():
+                return int(current - generation)
+        # Los progenitores de la generación más antigua del buffer
+        slot = self._slots_newest_first()[-1]
+        if len(anc) and len(np.unique(self._parents[slot][anc])) == 1:
+            return int(current - self._generations[slot] + 1)
+        return None
+
+    def first_appearance(self, gene_index):
+        """Primera generación en que algún individuo portó el gen (-1 = nunca)."""
+        return int(self.first_seen[gene_index])
+
+    def fixation_generation(self, gene_index):
+        """Generación desde la que todo individuo porta el gen (-1 = no fijado)."""
+        return int(self.fixed_since[gene_index])
+
+    def allele_origins(self, gene_index):
+        """
+        Adquisiciones del gen sobre los linajes de la población actual que
+        siguen en el buffer: lista de (generación, descendientes vivos),
+        de la más antigua a la más reciente.
+        """
+        code = gene_index + 1
+        origins = []
+        for generation, anc, events in self._walk_back():
+            gained = events[events[:, 1] == code, 0]
+            if len(gained) == 0:
+                continue
+            counts = np.bincount(anc, minlength=int(max(anc.max(), gained.max())) + 1)
+            for child in gained:
+                if counts[child]:
+                    origins.append((int(generation), int(counts[child])))
+        return sorted(origins)
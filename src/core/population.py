@@ -0,0 +1,127 @@
+"""
+Representación comprimida de la población por genotipos únicos.
+
+Bajo selección fuerte la población colapsa en pocos genomas distintos, pero
+cada individuo del GA repite su lista de bits. CompressedPopulation guarda:
+    - genomes: matriz uint8 de genotipos únicos (U × genes)
+    - words: los mismos genotipos empaquetados (U × palabras uint64, bitgenome)
+    - counts: multiplicidad de cada genotipo
+    - inverse: genotipo de cada individuo (N,)
+    - traits: atributos biológicos por individuo (N × 5, float64) u None
+    - positions: posición (x, y) por individuo (N × 2, float32) u None
+
+Todo cálculo que depende solo del genoma (resistencia, supervivencia a los
+fármacos) se hace una vez por genotipo único y se expande con inverse; las
+frecuencias alélicas son sumas ponderadas por counts. El costo de esas partes
+escala con la diversidad genética y no con el tamaño de la población.
+"""
+import numpy as np
+
+from src.core import bitgenome
+
+TRAITS = ("recubrimiento", "reproduccion", "letalidad", "permeabilidad", "enzimas")
+
+def _row_keys(words):
+    """
+    Una clave escalar por genoma empaquetado para agrupar con un np.unique 1-D
+    (mucho más rápido que np.unique(axis=0)): la palabra misma si el genoma
+    cabe en 64 bits, si no los bytes de la fila.
+    """
+    if words.shape[1] == 1:
+        return words[:, 0]
+    row = np.ascontiguousarray(words)
+    return row.view(np.dtype((np.void, row.shape[1] * row.itemsize))).ravel()
+
+class CompressedPopulation:
+    """Genotipos únicos con multiplicidad más arreglos de atributos por individuo."""
+
+    def __init__(self, genomes, counts, inverse, traits, positions=None, words=None):
+        self.genomes = genomes
+        self.words = bitgenome.pack(genomes) if words is None else words
+        self.counts = counts
+        self.inverse = inverse
+        self.traits = traits
+        self.positions = positions
+
+    @classmethod
+    def from_genomes(cls, genomes, traits=None, positions=None):
+        """Comprime una matriz individuos × genes (cualquier dtype 0/1)."""
+        genomes = np.asarray(genomes, dtype=np.uint8)
+        return cls.from_words(bitgenome.pack(genomes), genomes.shape[1], traits, positions)
+
+    @classmethod
+    def from_words(cls, words, n_genes, traits=None, positions=None):
+        """
+        Comprime genomas ya empaquetados (individuos × palabras uint64): solo
+        se desempaquetan las filas de los genotipos únicos.
+        """
+        n = len(words)
+        if n == 0:
+            first = np.zeros(0, dtype=np.intp)
+            counts = np.zeros(0, dtype=np.int64)
+            inverse = np.zeros(0, dtype=np.intp)
+        else:
+            _, first, inverse, counts = np.unique(
+                _row_keys(words), return_index=True, return_inverse=True, return_counts=True
+            )
+            inverse = inverse.reshape(n)
+        if traits is not None:
+            traits = np.asarray(traits, dtype=float)
+        unique = words[first]
+        return cls(
+            np.ascontiguousarray(bitgenome.unpack(unique, n_genes)), counts, inverse, traits, positions,
+            words=unique,
+        )
+
+    @classmethod
+    def from_individuals(cls, individuals, n_genes):
+        """Comprime una lista de individuos del GA (bits + atributos + pos)."""
+        n = len(individuals)
+        genomes = np.array([list(ind) for ind in individuals], dtype=np.uint8).reshape(n, n_genes)
+        traits = np.array(
+            [[getattr(ind, a) for a in TRAITS] for ind in individuals], dtype=float
+        ).reshape(n, len(TRAITS))
+        positions = None
+        if n and all(getattr(ind, "pos", None) is not None for ind in individuals):
+            positions = np.array([ind.pos for ind in individuals], dtype=np.float32)
+        return cls.from_genomes(genomes, traits, positions)
+
+    def __len__(self):
+        return len(self.inverse)
+
+    @property
+    def n_unique(self):
+        return len(self.counts)
+
+    def trait(self, name):
+        """Columna de un atributo biológico para todos los individuos."""
+        return self.traits[:, TRAITS.index(name)]
+
+    def expand(self, per_genome):
+        """Lleva un valor (o fila) por genotipo único a uno por individuo."""
+        return np.asarray(per_genome)[self.inverse]
+
+    def individual_genomes(self):
+        """Matriz individuos × genes reconstruida."""
+        return self.genomes[self.inverse]
+
+    def allele_frequencies(self):
+        """Frecuencia de cada gen: suma de portadores ponderada por multiplicidad."""
+        if len(self) == 0:
+            return np.zeros(self.genomes.shape[1])
+        return (self.counts @ self.genomes) / len(self)
+
+    def diversity(self):
+        """Suma de la entropía binaria (bits) de cada gen polimórfico."""
+        p = self.allele_frequencies()
+        p = p[(p > 0) & (p < 1)]
+        return float(np.sum(-p * np.log2(p) - (1 - p) * np.log2(1 - p)))
+
+    def genotype_frequencies(self):
+        """Frecuencia de cada genotipo único."""
+        return self.counts / max(len(self), 1)
+
+    @property
+    def nbytes(self):
+        arrays = (self.genomes, self.words, self.counts, self.inverse, self.traits, self.positions)
+        return sum(a.nbytes for a in arrays if a is not None)
@@ -1,8 +1,11 @@
 import numpy as np
-import psutil
 import json
 from src.data.database import get_session
-from src.data.models import ReporteSimulacion, MetricaGeneracion
+from src.data.models import (
+    ReporteSimulacion,
+    MetricaGeneracionSerie,
+    INDICADORES_GENERACION,
+)
 
 def compute_convergence_slopes(avg_hist, window_size=10):
     """
@@ -20,13 +23,17 @@ def compute_convergence_slopes(avg_hist, window_size=10):
             slopes.append(abs(slope))
     return slopes
 
-def save_simulation_report(ga, saved_params):
+def save_simulation_report(ga, saved_params, session=None):
     """
     Guarda el reporte principal de la simulación, con los parámetros de entrada como JSON.
     Devuelve el ID del reporte creado.
+    Si se recibe una sesión, solo añade el reporte (sin commit) para que el
+    llamador controle la transacción.
     """
     parametros_json = json.dumps(saved_params, ensure_ascii=False)
-    session = get_session()
+    own_session = session is None
+    if own_session:
+        session = get_session()
 
     reporte_existente = (
         session.query(ReporteSimulacion)
@@ -34,51 +41,89 @@ def save_simulation_report(ga, saved_params):
         .first()
     )
     if reporte_existente:
-        session.close()
-        return reporte_existente.id
+        reporte_id = reporte_existente.id
+        if own_session:
+            session.close()
+        return reporte_id
 
+    intervalos = [list(map(int, iv)) for iv in getattr(ga, "fast_forward_intervals", [])]
     reporte = ReporteSimulacion(
         simulacion_id=ga.current_simulation_id,
         generaciones_totales=saved_params.get("generations", 0),
         parametros_input=parametros_json,
+        generaciones_avanzadas=sum(fin - inicio for inicio, fin in intervalos),
+        intervalos_avanzados=json.dumps(intervalos) if intervalos else None,
     )
     session.add(reporte)
-    session.commit()
-    reporte_id = reporte.id
-    session.close()
+    if own_session:
+        session.commit()
+        reporte_id = reporte.id
+        session.close()
+    else:
+        session.flush()
+        reporte_id = reporte.id
     return reporte_id
 
-def save_generation_metrics(ga, simulacion_id, window_size=10):
+def save_generation_metrics(ga, simulacion_id, window_size=10, session=None):
     """
     Guarda los valores de los indicadores por generación para una simulación.
-    Incluye métricas evolutivas y de costo computacional (CPU/RAM).
+    Incluye métricas evolutivas y de costo computacional (CPU/RAM/tiempo real),
+    tal como las midió el algoritmo durante cada generación.
     Registra la tasa de convergencia como el slope absoluto en ventana móvil.
+    Cada generación se guarda como una sola fila de metricas_generacion_serie.
+    Si se recibe una sesión, no hace commit (lo hace el llamador).
     """
-    process = psutil.Process()
-    session = get_session()
+    own_session = session is None
+    if own_session:
+        session = get_session()
     num_generaciones = len(ga.avg_hist)
 
     # Calcula la tasa de convergencia como pendiente en ventana móvil
     convergence_hist = compute_convergence_slopes(ga.avg_hist, window_size=window_size)
+    avance_rapido = getattr(ga, "fast_forward_mask", None)
+    if avance_rapido is None or len(avance_rapido) < num_generaciones:
+        avance_rapido = np.zeros(num_generaciones, dtype=bool)
 
+    filas = []
     for gen in range(num_generaciones):
-        valores = {
-            "avg_fitness": ga.avg_hist[gen],
-            "best_fitness": ga.best_hist[gen],
-            "diversidad_genetica": ga.div_hist[gen],
-            "tasa_mutacion": ga.mut_hist[gen],
+        filas.append({
+            "simulacion_id": simulacion_id,
+            "generacion": gen + 1,
+            "avg_fitness": float(ga.avg_hist[gen]),
+            "best_fitness": float(ga.best_hist[gen]),
+            "diversidad_genetica": float(ga.div_hist[gen]),
+            "tasa_mutacion": float(ga.mut_hist[gen]),
             # Tasa de convergencia - slope de ventana móvil:
-            "tasa_convergencia": convergence_hist[gen],
-            "cpu_time_sec": process.cpu_times().user,  # Tiempo de CPU total hasta ese punto
-            "ram_mb": process.memory_info().rss / (1024**2),  # RAM usada (MB)
-        }
-        for nombre, valor in valores.items():
-            metrica = MetricaGeneracion(
-                simulacion_id=simulacion_id,
-                generacion=gen + 1,
-                nombre_indicador=nombre,
-                valor=float(valor),
-            )
-            session.add(metrica)
-    session.commit()
-    session.close()
\ No newline at end of file
+            "tasa_convergencia": float(convergence_hist[gen]),
+            "cpu_time_sec": float(ga.cpu_time_hist[gen]),  # CPU consumida en la generación
+            "ram_mb": float(ga.ram_mb_hist[gen]),  # RSS al terminar la generación (MB)
+            "wall_time_sec": float(ga.wall_time_hist[gen]),  # Tiempo real de la generación
+            "avance_rapido": int(bool(avance_rapido[gen])),  # Generación calculada analíticamente
+        })
+    if filas:
+        session.execute(MetricaGeneracionSerie.__table__.insert(), filas)
+    if own_session:
+        session.commit()
+        session.close()
+
+def load_generation_metrics(simulacion_id, indicadores=INDICADORES_GENERACION):
+    """
+    Carga la historia completa de una simulación con una sola consulta.
+    Devuelve un arreglo estructurado de NumPy con el campo 'generacion' y un
+    campo float64 por indicador (NaN donde no hay valor), ordenado por generación.
+    """
+    columnas = [MetricaGeneracionSerie.generacion] + [
+        getattr(MetricaGeneracionSerie, nombre) for nombre in indicadores
+    ]
+    session = get_session()
+    filas = (
+        session.query(*columnas)
+        .filter(MetricaGeneracionSerie.simulacion_id == simulacion_id)
+        .order_by(MetricaGeneracionSerie.generacion)
+        .all()
+    )
+    session.close()
+
+    datos = np.array(filas, dtype=np.float64).reshape(-1, len(columnas))
+    campos = [datos[:, 0].astype(np.int32)] + [datos[:, i + 1] for i in range(len(indicadores))]
+    return np.rec.fromarrays(campos, names=["generacion", *indicadores])
@@ -0,0 +1,293 @@
+"""
+Ejecución de simulaciones sin interfaz gráfica.
+
+Uso:
+    python -m src.core.runner escenario.json [--no-persist] [--no-cache]
+
+El escenario es un JSON con las mismas entradas que la GUI, p. ej.:
+    {
+        "genes": ["blaVIM", "kpc"],
+        "schedule": [[0, "Meropenem", 8.0]],
+        "generations": 100,
+        "mutation_rate": 0.05,
+        "death_rate": 0.05,
+        "reproduction_rate": 1.0,
+        "environmental_factors": {"temperature": 37.0, "pH": 7.4},
+        "seed": 42
+    }
+Genes y antibióticos se pueden indicar por nombre o por id. Con "seed" la corrida
+es reproducible y su resultado se guarda en la caché de resultados: repetir el
+mismo escenario lo devuelve sin simular.
+
+Con "mode": "lattice" (y opcionalmente "grid_size") se simula la colonia sobre
+una grilla 2-D (src.core.lattice) en lugar del algoritmo genético.
+
+Con "combination_therapy": true los antibióticos del cronograma se suman en vez
+de reemplazarse; "interaction_model" elige "bliss" (por defecto) o "loewe".
+"hgt_rate" activa la transferencia horizontal de los genes de "hgt_genes"
+(nombres o ids; por defecto, todos). Con "epistasis": true se suman las
+interacciones entre pares de genes de la tabla epistasis_genes.
+"fitness_model" elige un modelo de src.core.fitness_models (por defecto "clasico").
+Con "fast_forward": true las etapas en estado estacionario se avanzan en forma
+analítica hasta el próximo evento del cronograma (en ciclos de dosis completos
+si el antibiótico tiene vida media e intervalo de dosis).
+La farmacocinética es opcional: con "hours_per_generation" (horas reales por
+generación) cada dosis decae con la vida media del antibiótico; sin esa clave
+las concentraciones del cronograma son escalonadas.
+"""
+import argparse
+import json
+import logging
+
+from src.core.reporting import save_simulation_report, save_generation_metrics
+from src.data.database import get_session, init_db
+from src.data.models import Simulacion
+from src.data.reference_cache import get_reference_data
+from src.data.result_cache import ResultCache, scenario_key
+
+def build_schedule(schedule, reference=None):
+    """Convierte [(t, ab_id, conc)] en el cronograma del GA [(t, ab_dict, conc)]."""
+    reference = reference or get_reference_data()
+    return [(t, reference.antibiotic(ab_id), conc) for t, ab_id, conc in schedule]
+
+def create_simulation_record(sched_objs):
+    """Crea el registro de Simulacion con el primer tratamiento y devuelve su id."""
+    if sched_objs:
+        antibiotico_id = sched_objs[0][1]["id"]
+        concentracion = sched_objs[0][2]
+    else:
+        antibiotico_id = None
+        concentracion = None
+
+    session = get_session()
+    simulacion = Simulacion(
+        antibiotico_id=antibiotico_id,
+        concentracion=concentracion if concentracion is not None else 0.0,
+        resistencia_predicha=0.0,
+    )
+    session.add(simulacion)
+    session.commit()
+    simulation_id = simulacion.id
+    session.close()
+    return simulation_id
+
+def run_simulation(
+    selected_gene_ids,
+    schedule,
+    generations=100,
+    mutation_rate=0.05,
+    death_rate=0.05,
+    reproduction_rate=1.0,
+    environmental_factors=None,
+    pop_size=200,
+    pressure_factor=0.25,
+    persist=True,
+    seed=None,
+    use_cache=True,
+    cache=None,
+    mode="ga",
+    grid_size=128,
+    combination_therapy=False,
+    interaction_model="bliss",
+    hgt_rate=0.0,
+    hgt_genes=None,
+    epistasis=False,
+    fitness_model="clasico",
+    fast_forward=False,
+    hours_per_generation=None,
+):
+    """
+    Ejecuta una simulación completa con los mismos parámetros que la GUI.
+    :param schedule: lista de tuplas (t_event, antibiotico_id, concentración)
+    :param persist: si es True, guarda simulación, atributos, reporte y métricas
+    :param seed: semilla de la corrida; solo las corridas con semilla usan la caché
+    :param use_cache: si es False, simula siempre aunque haya resultado en caché
+    :param cache: ResultCache a usar (por defecto, la del directorio de datos)
+    :param mode: "ga" (algoritmo genético) o "lattice" (grilla espacial)
+    :param grid_size: celdas por lado de la grilla en el modo "lattice"
+    :param combination_therapy: mantener activos todos los antibióticos del cronograma
+    :param interaction_model: "bliss" o "loewe" para la terapia combinada
+    :param hgt_rate: tasa de conjugación por generación (0 = sin transferencia horizontal)
+    :param hgt_genes: ids de los genes transferibles (None = todos)
+    :param epistasis: sumar las interacciones entre genes de la tabla epistasis_genes
+    :param fitness_model: nombre del modelo de fitness registrado
+    :param fast_forward: saltar analíticamente los tramos en estado estacionario
+    :param hours_per_generation: horas reales por generación para la farmacocinética
+        (None = concentraciones escalonadas)
+    :return: la instancia de GeneticAlgorithm (o LatticeSimulation) ya ejecutada
+    """
+    if mode not in ("ga", "lattice"):
+        raise ValueError(f"Modo de simulación desconocido: {mode}")
+
+    reference = get_reference_data()
+    sched_objs = build_schedule(schedule, reference)
+    environmental_factors = environmental_factors or {"temperature": 37.0, "pH": 7.4}
+    simulation_id = create_simulation_record(sched_objs) if persist else None
+
+    if mode == "lattice":
+        return _run_lattice(
+            selected_gene_ids, sched_objs, reference, simulation_id, persist,
+            generations=generations,
+            mutation_rate=mutation_rate,
+            death_rate=death_rate,
+            reproduction_rate=reproduction_rate,
+            environmental_factors=environmental_factors,
+            pressure_factor=pressure_factor,
+            seed=seed,
+            grid_size=grid_size,
+            hours_per_generation=hours_per_generation,
+        )
+
+    # DEAP y psutil se cargan al simular, no al importar el módulo (la GUI
+    # importa este módulo solo por build_schedule/create_simulation_record)
+    from src.core.genetic_algorithm import GeneticAlgorithm
+
+    ga = GeneticAlgorithm(
+        genes=reference.gene_dicts(),
+        antibiotic_schedule=sched_objs,
+        mutation_rate=mutation_rate,
+        generations=generations,
+        pop_size=pop_size,
+        death_rate=death_rate,
+        environmental_factors=environmental_factors,
+        simulation_id=simulation_id,
+        reproduction_rate=reproduction_rate,
+        pressure_factor=pressure_factor,
+        seed=seed,
+        combination_therapy=combination_therapy,
+        interaction_model=interaction_model,
+        drug_specificity=reference.drug_specificity(),
+        hgt_rate=hgt_rate,
+        hgt_genes=hgt_genes,
+        epistasis=reference.epistasis_terms() if epistasis else None,
+        fitness_model=fitness_model,
+        fast_forward=fast_forward,
+        hours_per_generation=hours_per_generation,
+    )
+    ga.initialize(selected_gene_ids)
+
+    cache_key = None
+    cached = None
+    if seed is not None and use_cache:
+        cache = cache or ResultCache()
+        cache_key = scenario_key(ga.scenario_params(selected_gene_ids))
+        cached = cache.get(cache_key)
+
+    if cached is not None:
+        ga.restore_results(*cached)
+    else:
+        while ga.step():
+            pass
+        if cache_key is not None:
+            cache.put(cache_key, *ga.export_results())
+
+    if persist:
+        saved_params = {
+            "genes": list(selected_gene_ids),
+            "mutation_rate": mutation_rate,
+            "death_rate": death_rate,
+            "generations": generations,
+            "environmental_factors": environmental_factors,
+            "reproduction_rate": reproduction_rate,
+            "seed": seed,
+            "combination_therapy": combination_therapy,
+            "interaction_model": interaction_model,
+            "hgt_rate": hgt_rate,
+            "hgt_genes": hgt_genes,
+            "epistasis": epistasis,
+            "fitness_model": fitness_model,
+            "fast_forward": fast_forward,
+            "hours_per_generation": hours_per_generation,
+        }
+        session = get_session()
+        try:
+            ga.save_final_gene_attributes(selected_gene_ids, session=session)
+            save_simulation_report(ga, saved_params, session=session)
+            save_generation_metrics(ga, simulation_id, session=session)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+    return ga
+
+def _run_lattice(selected_gene_ids, sched_objs, reference, simulation_id, persist, **params):
+    """
+    Modo "lattice": la grilla no tiene individuos ni población exportable, así
+    que no usa la caché de resultados ni guarda atributos por gen; sí guarda el
+    reporte y las métricas por generación.
+    """
+    from src.core.lattice import LatticeSimulation
+
+    sim = LatticeSimulation(
+        genes=reference.gene_dicts(),
+        antibiotic_schedule=sched_objs,
+        simulation_id=simulation_id,
+        **params,
+    )
+    sim.initialize(selected_gene_ids)
+    while sim.step():
+        pass
+
+    if persist:
+        saved_params = {"genes": list(selected_gene_ids), "mode": "lattice", **params}
+        session = get_session()
+        try:
+            save_simulation_report(sim, saved_params, session=session)
+            save_generation_metrics(sim, simulation_id, session=session)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+    return sim
+
+def _resolve_scenario(scenario, reference):
+    """Traduce nombres de genes/antibióticos del escenario a ids."""
+    gene_ids_by_name = {g["nombre"]: g["id"] for g in reference.genes}
+    gene_ids = [gene_ids_by_name.get(g, g) for g in scenario.get("genes", [])]
+    if scenario.get("hgt_genes") is not None:
+        scenario["hgt_genes"] = [gene_ids_by_name.get(g, g) for g in scenario["hgt_genes"]]
+
+    schedule = []
+    for t, ab, conc in scenario.get("schedule", []):
+        ab_id = reference.antibiotic_by_name(ab)["id"] if isinstance(ab, str) else ab
+        schedule.append((t, ab_id, conc))
+    return gene_ids, schedule
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ejecuta una simulación SRB sin interfaz gráfica.")
+    parser.add_argument("scenario", help="Archivo JSON con el escenario a simular")
+    parser.add_argument("--no-persist", action="store_true", help="No guardar resultados en la BD")
+    parser.add_argument("--no-cache", action="store_true", help="Simular aunque el resultado esté en caché")
+    args = parser.parse_args(argv)
+
+    with open(args.scenario, "r", encoding="utf-8") as f:
+        scenario = json.load(f)
+
+    init_db()
+    reference = get_reference_data()
+    gene_ids, schedule = _resolve_scenario(scenario, reference)
+    params = {
+        k: v for k, v in scenario.items() if k not in ("genes", "schedule")
+    }
+    ga = run_simulation(
+        gene_ids,
+        schedule,
+        persist=not args.no_persist,
+        use_cache=not args.no_cache,
+        **params,
+    )
+
+    logging.info(f"Headless simulation finished: simulation_id={ga.current_simulation_id}")
+    print(
+        f"Resistencia final: {ga.avg_hist[-1]:.4f}  "
+        f"Población final: {ga.population_hist[-1]:.2f}  "
+        f"Diversidad final: {ga.div_hist[-1]:.4f}"
+    )
+    return ga
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,16 @@
-import pandas as pd
-from sqlalchemy import create_engine
 from sqlalchemy.exc import SQLAlchemyError
+from src.data.database import create_sqlite_engine
 
 class CSVValidator:
     def __init__(self, csv_path):
         self.csv_path = csv_path
-        self.engine = create_engine("sqlite:///resistencia.db")
+        # Solo consulta simulaciones: perfil de lectura que no bloquea a los escritores
+        self.engine = create_sqlite_engine(profile="analytics")
 
     def compare_with_simulations(self):
         """Compara datos históricos con simulaciones almacenadas en la BD."""
+        import pandas as pd  # Solo se necesita al validar; acelera el arranque
+
         try:
             # Leer CSV histórico
             df_historico = pd.read_csv(self.csv_path)
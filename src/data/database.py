@@ -1,9 +1,36 @@
+"""
+Acceso a la base de datos SQLite del simulador.
+
+Perfiles de motor (ENGINE_PROFILES), seleccionables con la variable de entorno
+DB_PROFILE o con create_sqlite_engine(url, profile):
+
+- "interactive": la GUI. WAL, synchronous=NORMAL y busy_timeout corto para que
+  una escritura concurrente espere en lugar de fallar con "database is locked".
+- "batch": barridos y procesos de trabajo. Caché y mmap más grandes, busy_timeout
+  largo y NullPool (cada unidad de trabajo abre y cierra su conexión).
+- "analytics": consultas de solo lectura (mode=ro + query_only), que en WAL no
+  bloquean a los escritores.
+
+Patrón para procesos de trabajo: un motor y sus conexiones nunca deben cruzar
+un fork. Cada proceso hijo llama a init_worker() al arrancar, p. ej.:
+
+    with ProcessPoolExecutor(initializer=init_worker, initargs=("batch",)) as ex:
+        ...
+
+init_worker descarta (sin cerrarlas) las conexiones heredadas del padre, crea un
+motor propio con el perfil indicado y vuelve a enlazar Session, de modo que
+get_session() en el hijo usa ese motor. Con WAL, varios procesos pueden leer
+mientras uno escribe; las escrituras se serializan esperando hasta busy_timeout.
+"""
+import logging
 import os
 import re
 import sys
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, scoped_session
-from .models import Base
+from sqlalchemy.pool import NullPool
+from .models import Base, sql_recrear_vistas
 
 def get_paths():
     """
@@ -31,66 +58,257 @@ base_path, user_data_dir = get_paths()
 db_path = os.path.join(user_data_dir, "resistencia.db")
 DATABASE_URL = os.environ.get("DATABASE_URL", f"sqlite:///{db_path}")
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+DB_PROFILE = os.environ.get("DB_PROFILE", "interactive")
+
+ENGINE_PROFILES = {
+    "interactive": {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "cache_size": -16000,  # KiB (negativo = tamaño en KiB)
+            "mmap_size": 64 * 1024**2,
+            "temp_store": "MEMORY",
+            "busy_timeout": 5000,  # ms
+        },
+        "read_only": False,
+        "poolclass": None,  # Pool por defecto del dialecto
+    },
+    "batch": {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "cache_size": -64000,
+            "mmap_size": 256 * 1024**2,
+            "temp_store": "MEMORY",
+            "busy_timeout": 30000,
+        },
+        "read_only": False,
+        "poolclass": NullPool,
+    },
+    "analytics": {
+        "pragmas": {
+            "query_only": "ON",
+            "cache_size": -64000,
+            "mmap_size": 256 * 1024**2,
+            "temp_store": "MEMORY",
+            "busy_timeout": 5000,
+        },
+        "read_only": True,
+        "poolclass": None,
+    },
+}
+
+def _read_only_url(url):
+    """Convierte una URL sqlite de archivo en una URI con mode=ro."""
+    if not url.database or url.database == ":memory:":
+        return url
+    return url.set(
+        database=f"file:{url.database}",
+        query={**url.query, "mode": "ro", "uri": "true"},
+    )
+
+def create_sqlite_engine(url=None, profile=None):
+    """
+    Crea un motor aplicando el perfil indicado (ver ENGINE_PROFILES).
+    Los PRAGMA se ejecutan en cada conexión nueva; para URLs que no son SQLite
+    el perfil se ignora y se usa la configuración por defecto.
+    """
+    profile = profile or DB_PROFILE
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"Perfil de base de datos desconocido: {profile}")
+    config = ENGINE_PROFILES[profile]
+
+    url = make_url(url or DATABASE_URL)
+    if url.get_backend_name() != "sqlite":
+        return create_engine(url)
+
+    kwargs = {"connect_args": {"check_same_thread": False}}
+    if config["poolclass"] is not None:
+        kwargs["poolclass"] = config["poolclass"]
+    if config["read_only"]:
+        url = _read_only_url(url)
+
+    new_engine = create_engine(url, **kwargs)
+    pragmas = config["pragmas"]
+
+    @event.listens_for(new_engine, "connect")
+    def _apply_pragmas(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        for nombre, valor in pragmas.items():
+            cursor.execute(f"PRAGMA {nombre}={valor}")
+        cursor.close()
+
+    return new_engine
+
+engine = create_sqlite_engine(DATABASE_URL, DB_PROFILE)
 Session = scoped_session(sessionmaker(bind=engine))
 
-def init_db():
+def init_worker(profile="batch", url=None):
     """
-    Inicializa la base de datos y aplica las migraciones pendientes de forma inteligente.
+    Inicializador para procesos de trabajo (multiprocessing / ProcessPoolExecutor).
+    Reemplaza el motor heredado por uno propio del proceso y reconfigura Session.
+
+    El nuevo motor solo llega a quien lo consulte después: los módulos que hicieron
+    ``from src.data.database import engine`` conservan el heredado, por lo que el
+    código que corre en procesos de trabajo debe usar get_engine() o Session.
     """
-    migrations_folder = os.path.join(base_path, "migrations")
-    if not os.path.isdir(migrations_folder):
-        print(f"⚠️  No se encontró la carpeta de migraciones: {migrations_folder}")
-        return
+    global engine
+    # Soltar las conexiones heredadas sin cerrarlas: pertenecen al proceso padre
+    # (dispose(close=False) requiere SQLAlchemy >= 1.4.33)
+    engine.dispose(close=False)
+    engine = create_sqlite_engine(url or DATABASE_URL, profile)
+    Session.remove()
+    Session.configure(bind=engine)
+    return engine
 
-    raw_conn = engine.raw_connection()
+def get_engine():
+    """Motor vigente del proceso (el reemplazado por init_worker en los trabajadores)."""
+    return engine
+
+# Última versión de esquema que conoce este código. Debe coincidir con el número
+# de la migración más reciente en src/migrations (lo verifica un test); al ser
+# una constante, el ejecutable empaquetado la lleva precalculada.
+LATEST_SCHEMA_VERSION = 12
+
+_MIGRATION_RE = re.compile(r"(\d+)_.*\.sql$")
+# Sentencias de control de transacción propias de cada archivo de migración
+_TRANSACTION_LINE_RE = re.compile(
+    r"^\s*(BEGIN(\s+TRANSACTION)?|COMMIT(\s+TRANSACTION)?|END(\s+TRANSACTION)?)\s*;\s*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+_PRAGMA_LINE_RE = re.compile(r"^\s*PRAGMA\b[^;]*;\s*$", re.IGNORECASE)
+
+def _read_schema_version(cursor):
+    """Versión guardada en db_version (0 si la tabla o la fila no existen)."""
+    try:
+        cursor.execute("SELECT version_num FROM db_version WHERE id = 1")
+        row = cursor.fetchone()
+    except Exception:
+        return 0
+    return row[0] if row else 0
+
+def _split_pragmas(body, path):
+    """
+    Separa los PRAGMA iniciales y finales del cuerpo de una migración.
+
+    SQLite ignora algunos PRAGMA (p. ej. foreign_keys) dentro de una transacción,
+    así que los del principio se ejecutan antes de BEGIN y los del final después
+    de COMMIT. Un PRAGMA entre sentencias no tendría efecto: se rechaza.
+    """
+    lines = body.splitlines()
+
+    def is_pragma(line):
+        return bool(_PRAGMA_LINE_RE.match(line))
+
+    def is_filler(line):
+        stripped = line.strip()
+        return not stripped or stripped.startswith("--")
+
+    start = 0
+    while start < len(lines) and (is_filler(lines[start]) or is_pragma(lines[start])):
+        start += 1
+    end = len(lines)
+    while end > start and (is_filler(lines[end - 1]) or is_pragma(lines[end - 1])):
+        end -= 1
+
+    if any(is_pragma(line) for line in lines[start:end]):
+        raise ValueError(
+            f"{os.path.basename(path)}: PRAGMA statements must go before or after "
+            "the migration's statements, not between them"
+        )
+    before = "\n".join(line for line in lines[:start] if is_pragma(line))
+    after = "\n".join(line for line in lines[end:] if is_pragma(line))
+    return before, "\n".join(lines[start:end]), after
+
+def _apply_migration(raw_conn, path, version, epilogue=""):
+    """
+    Aplica un archivo de migración y actualiza db_version en una única
+    transacción: si cualquier sentencia falla, no queda nada aplicado.
+    Los PRAGMA del principio y del final del archivo quedan fuera de ella.
+    :param epilogue: SQL adicional que se ejecuta en la misma transacción
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        body = _TRANSACTION_LINE_RE.sub("", f.read())
+    before, body, after = _split_pragmas(body, path)
+    script = (
+        f"{before}\n"
+        "BEGIN;\n"
+        f"{body}\n"
+        f"{epilogue}\n"
+        f"UPDATE db_version SET version_num = {int(version)} WHERE id = 1;\n"
+        "COMMIT;\n"
+        f"{after}\n"
+    )
     cursor = raw_conn.cursor()
+    try:
+        cursor.executescript(script)
+    except Exception:
+        if raw_conn.in_transaction:
+            raw_conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+def init_db(bind=None):
+    """
+    Inicializa la base de datos y aplica las migraciones pendientes.
+
+    Camino rápido: si db_version ya es LATEST_SCHEMA_VERSION, basta una consulta
+    y no se recorre la carpeta de migraciones. Cada migración pendiente se
+    aplica de forma atómica junto con su actualización de versión.
+    :param bind: motor a migrar (por defecto, el motor global)
+    """
+    bind = bind or engine
+    raw_conn = bind.raw_connection()
+    applied = False
+    fname = None
 
     try:
-        # 1. Obtener la versión actual de la BD
-        current_version = 0
-        try:
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='db_version'")
-            if cursor.fetchone():
-                cursor.execute("SELECT version_num FROM db_version WHERE id = 1")
-                version_row = cursor.fetchone()
-                if version_row:
-                    current_version = version_row[0]
-        except Exception:
-            current_version = 0
-        
+        cursor = raw_conn.cursor()
+        current_version = _read_schema_version(cursor)
+        cursor.close()
+        if current_version >= LATEST_SCHEMA_VERSION:
+            if current_version > LATEST_SCHEMA_VERSION:
+                logging.warning(
+                    f"Database schema v{current_version} is newer than this build "
+                    f"(v{LATEST_SCHEMA_VERSION})"
+                )
+            return
+
+        migrations_folder = os.path.join(base_path, "migrations")
+        if not os.path.isdir(migrations_folder):
+            print(f"⚠️  No se encontró la carpeta de migraciones: {migrations_folder}")
+            return
+
         print(f"ℹ️ Versión actual de la BD: {current_version}")
+        pending = []
+        for fname in os.listdir(migrations_folder):
+            match = _MIGRATION_RE.match(fname)
+            if match and int(match.group(1)) > current_version:
+                pending.append((int(match.group(1)), fname))
 
-        # 2. Aplicar migraciones pendientes
-        migration_files = sorted(os.listdir(migrations_folder))
-        for fname in migration_files:
-            match = re.match(r"(\d+)_.*\.sql", fname)
-            if not match:
-                continue
-
-            file_version = int(match.group(1))
-
-            if file_version > current_version:
-                path = os.path.join(migrations_folder, fname)
-                print(f"🆙 Aplicando migración v{file_version}: {fname}...")
-                
-                with open(path, "r", encoding="utf-8") as f:
-                    script_content = f.read()
-                    cursor.executescript(script_content)
-                
-                cursor.execute("UPDATE db_version SET version_num = ? WHERE id = 1", (file_version,))
-                raw_conn.commit()
-                print(f"✅ Migración v{file_version} aplicada exitosamente.")
+        pending.sort()
+        for file_version, fname in pending:
+            print(f"🆙 Aplicando migración v{file_version}: {fname}...")
+            # Las vistas se definen en los modelos: se recrean con el esquema final,
+            # en la misma transacción que sube db_version a la última versión
+            epilogue = sql_recrear_vistas() if file_version == pending[-1][0] else ""
+            _apply_migration(
+                raw_conn, os.path.join(migrations_folder, fname), file_version, epilogue
+            )
+            applied = True
+            print(f"✅ Migración v{file_version} aplicada exitosamente.")
 
+        print("✅ Proceso de migración de base de datos completado.")
     except Exception as e:
         print(f"❌ Error crítico durante la migración en '{fname}': {e}")
-        raw_conn.rollback()
         raise
     finally:
-        cursor.close()
         raw_conn.close()
-
-    print("✅ Proceso de migración de base de datos completado.")
+        if applied:
+            # Las migraciones pueden cambiar genes/antibióticos/recomendaciones
+            from .reference_cache import invalidate_reference_data
+            invalidate_reference_data()
 
 def get_session():
     return Session()
\ No newline at end of file
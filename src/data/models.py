@@ -1,8 +1,37 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, func
-from sqlalchemy.orm import declarative_base, relationship
+import logging
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Float,
+    ForeignKey,
+    DateTime,
+    MetaData,
+    Table,
+    UniqueConstraint,
+    CheckConstraint,
+    Index,
+    event,
+    func,
+    text,
+)
+from sqlalchemy.orm import declarative_base, relationship, foreign
 
 Base = declarative_base()
 
+# Indicadores por generación, en el orden de las columnas de metricas_generacion_serie
+INDICADORES_GENERACION = (
+    "avg_fitness",
+    "best_fitness",
+    "diversidad_genetica",
+    "tasa_mutacion",
+    "tasa_convergencia",
+    "cpu_time_sec",
+    "ram_mb",
+    "wall_time_sec",
+)
+
 class Gen(Base):
     __tablename__ = "genes"
     id = Column(Integer, primary_key=True)
@@ -19,9 +48,39 @@ class Antibiotico(Base):
     concentracion_minima = Column(Float, nullable=False)
     concentracion_maxima = Column(Float, nullable=False)
     tipo = Column(String(50))
+    # Farmacocinética del régimen de dosis (NULL = concentración constante)
+    vida_media_horas = Column(Float)
+    intervalo_dosis_horas = Column(Float)
     # relación 1–1 a Recomendacion
     recomendacion = relationship("Recomendacion", back_populates="antibiotico", uselist=False)
 
+class GenAntibiotico(Base):
+    """Especificidad de un gen frente a un antibiótico (pares sin fila: 1.0)."""
+    __tablename__ = "gen_antibiotico"
+    # Igual que la migración 010: un peso por par y búsqueda por antibiótico
+    __table_args__ = (
+        UniqueConstraint("gen_id", "antibiotico_id"),
+        Index("idx_gen_antibiotico_ab", "antibiotico_id"),
+    )
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    gen_id = Column(Integer, ForeignKey("genes.id"), nullable=False)
+    antibiotico_id = Column(Integer, ForeignKey("antibioticos.id"), nullable=False)
+    peso_especificidad = Column(Float, nullable=False, default=1.0)
+
+class EpistasisGenes(Base):
+    """Interacción entre dos genes (gen_a_id < gen_b_id) que suma a la resistencia."""
+    __tablename__ = "epistasis_genes"
+    # Igual que la migración 011: cada par una sola vez y en orden canónico
+    __table_args__ = (
+        CheckConstraint("gen_a_id < gen_b_id"),
+        UniqueConstraint("gen_a_id", "gen_b_id"),
+        Index("idx_epistasis_gen_b", "gen_b_id"),
+    )
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    gen_a_id = Column(Integer, ForeignKey("genes.id"), nullable=False)
+    gen_b_id = Column(Integer, ForeignKey("genes.id"), nullable=False)
+    peso_epistasis = Column(Float, nullable=False, default=0.0)
+
 class Simulacion(Base):
     __tablename__ = "simulaciones"
     id = Column(Integer, primary_key=True)
@@ -64,15 +123,87 @@ class ReporteSimulacion(Base):
     fecha_ejecucion = Column(DateTime, server_default=func.now())
     generaciones_totales = Column(Integer, nullable=False)
     parametros_input = Column(String, nullable=False)  # JSON almacenado como texto
+    generaciones_avanzadas = Column(Integer, nullable=False, default=0)  # Avance rápido
+    intervalos_avanzados = Column(String)  # JSON [[inicio, fin), ...] de pasos avanzados
 
     simulacion = relationship("Simulacion")
 
+class MetricaGeneracionSerie(Base):
+    """Serie temporal de una simulación: una fila por generación con un indicador por columna."""
+    __tablename__ = "metricas_generacion_serie"
+    __table_args__ = {"sqlite_with_rowid": False}
+    simulacion_id = Column(Integer, ForeignKey("simulaciones.id"), primary_key=True)
+    generacion = Column(Integer, primary_key=True)
+    avg_fitness = Column(Float)
+    best_fitness = Column(Float)
+    diversidad_genetica = Column(Float)
+    tasa_mutacion = Column(Float)
+    tasa_convergencia = Column(Float)
+    cpu_time_sec = Column(Float)
+    ram_mb = Column(Float)
+    wall_time_sec = Column(Float)
+    avance_rapido = Column(Integer, nullable=False, default=0)  # 1 = generación calculada analíticamente
+
+    simulacion = relationship("Simulacion", backref="metricas_serie")
+
+# La tabla larga metricas_generacion se reemplazó por una vista de compatibilidad
+# (migración 007). Se declara en un MetaData aparte para que create_all no la cree
+# como tabla. Su única definición es la de abajo, generada desde
+# INDICADORES_GENERACION: create_all la crea tras las tablas e init_db la
+# recrea dentro de la transacción de la última migración aplicada, así que
+# agregar un indicador solo requiere su columna (migración) y su entrada en la tupla.
+_vistas = MetaData()
+
+metricas_generacion_vista = Table(
+    "metricas_generacion",
+    _vistas,
+    Column("simulacion_id", Integer, primary_key=True),
+    Column("generacion", Integer, primary_key=True),
+    Column("nombre_indicador", String, primary_key=True),
+    Column("valor", Float, nullable=False),
+)
+
+def _sql_vista_metricas_generacion():
+    selects = [
+        f"SELECT simulacion_id, generacion, '{nombre}' AS nombre_indicador, {nombre} AS valor "
+        f"FROM metricas_generacion_serie WHERE {nombre} IS NOT NULL"
+        for nombre in INDICADORES_GENERACION
+    ]
+    return "CREATE VIEW metricas_generacion AS " + " UNION ALL ".join(selects)
+
+def sql_recrear_vistas():
+    """Script idempotente que (re)crea las vistas; init_db lo añade a la última migración."""
+    return f"DROP VIEW IF EXISTS metricas_generacion;\n{_sql_vista_metricas_generacion()};"
+
+def crear_vista_metricas_generacion(connection):
+    """
+    (Re)crea la vista metricas_generacion con los indicadores actuales. Si una
+    tabla anterior a la migración 007 ocupa ese nombre, se deja intacta con un
+    aviso: solo init_db sabe migrar sus datos a metricas_generacion_serie.
+    """
+    tipo = connection.execute(
+        text("SELECT type FROM sqlite_master WHERE name = 'metricas_generacion'")
+    ).scalar()
+    if tipo == "table":
+        logging.warning(
+            "A metricas_generacion table predates the compatibility view; "
+            "run init_db to migrate it"
+        )
+        return
+    connection.execute(text("DROP VIEW IF EXISTS metricas_generacion"))
+    connection.execute(text(_sql_vista_metricas_generacion()))
+
+@event.listens_for(Base.metadata, "after_create")
+def _crear_vistas(target, connection, **kw):
+    crear_vista_metricas_generacion(connection)
+
 class MetricaGeneracion(Base):
-    __tablename__ = "metricas_generacion"
-    id = Column(Integer, primary_key=True)
-    simulacion_id = Column(Integer, ForeignKey("simulaciones.id"), nullable=False)
-    generacion = Column(Integer, nullable=False)
-    nombre_indicador = Column(String, nullable=False)
-    valor = Column(Float, nullable=False)
+    """Vista de solo lectura con el formato largo (un indicador por fila)."""
+    __table__ = metricas_generacion_vista
 
-    simulacion = relationship("Simulacion", backref="metricas_generacion")
\ No newline at end of file
+    simulacion = relationship(
+        "Simulacion",
+        primaryjoin=lambda: Simulacion.id == foreign(MetricaGeneracion.simulacion_id),
+        viewonly=True,
+        backref="metricas_generacion",
+    )
@@ -0,0 +1,137 @@
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+
+from src.data.database import get_session
+
+class WriteBehindQueue:
+    """
+    Persistencia diferida: un hilo de fondo consume una cola acotada de tareas
+    de escritura y las agrupa en transacciones grandes.
+
+    Cada tarea es un callable que recibe la sesión como argumento de palabra
+    clave ``session``, añade sus filas y no hace commit (p. ej. save_generation_metrics).
+    submit() devuelve un Future que se resuelve cuando la transacción de su lote
+    se confirma, de modo que la interfaz puede mostrar resultados de inmediato.
+    Si la cola está llena, submit() bloquea hasta que haya espacio, pero sin
+    retener el cerrojo: los demás productores y shutdown() siguen avanzando.
+    """
+
+    _STOP = object()
+
+    def __init__(self, maxsize=256, batch_size=64):
+        self.batch_size = batch_size
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._closed = False
+        self._lock = threading.Lock()
+        # Productores que pasaron la comprobación de cierre y aún están en put()
+        self._putting = 0
+        self._idle = threading.Condition(self._lock)
+        self._thread = threading.Thread(
+            target=self._run, name="srb-write-behind", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, task, *args, **kwargs) -> Future:
+        """Encola task(*args, session=..., **kwargs) y devuelve su Future."""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("La cola de persistencia ya fue cerrada")
+            self._putting += 1
+        future = Future()
+        try:
+            self._queue.put((future, task, args, kwargs))
+        finally:
+            with self._lock:
+                self._putting -= 1
+                if not self._putting:
+                    self._idle.notify_all()
+        return future
+
+    def flush(self):
+        """Bloquea hasta que todas las tareas encoladas se hayan escrito."""
+        self._queue.join()
+
+    def shutdown(self, wait=True):
+        """Deja de aceptar tareas, escribe las pendientes y detiene el hilo."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            # La marca de parada va detrás de todas las tareas ya aceptadas
+            self._idle.wait_for(lambda: not self._putting)
+        self._queue.put(self._STOP)
+        if wait:
+            self._thread.join()
+
+    def _run(self):
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is self._STOP:
+                self._queue.task_done()
+                break
+
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stop = True
+                    self._queue.task_done()
+                    break
+                batch.append(item)
+
+            try:
+                self._write_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_batch(self, batch):
+        pending = [entry for entry in batch if entry[0].set_running_or_notify_cancel()]
+        if not pending:
+            return
+
+        try:
+            session = get_session()
+        except Exception as e:
+            logging.error("Write-behind batch could not open a session", exc_info=True)
+            for future, _, _, _ in pending:
+                future.set_exception(e)
+            return
+
+        try:
+            # 1) Intento rápido: todo el lote en una sola transacción
+            try:
+                results = [
+                    task(*args, session=session, **kwargs)
+                    for _, task, args, kwargs in pending
+                ]
+                session.commit()
+            except Exception:
+                session.rollback()
+                logging.warning(
+                    "Write-behind batch failed; retrying its tasks one by one",
+                    exc_info=True,
+                )
+            else:
+                for (future, _, _, _), result in zip(pending, results):
+                    future.set_result(result)
+                return
+
+            # 2) Reintento aislado para atribuir el error a la tarea que falló
+            for future, task, args, kwargs in pending:
+                try:
+                    result = task(*args, session=session, **kwargs)
+                    session.commit()
+                except Exception as e:
+                    session.rollback()
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+        finally:
+            session.close()
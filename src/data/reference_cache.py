@@ -0,0 +1,120 @@
+import threading
+
+from src.data.database import get_session
+from src.data.models import Gen, Antibiotico, Recomendacion, GenAntibiotico, EpistasisGenes
+
+class ReferenceData:
+    """
+    Instantánea en memoria de los datos de referencia: genes, antibióticos,
+    recomendaciones, especificidad gen–antibiótico y epistasis entre genes. Se
+    carga con cinco consultas y se comparte entre los widgets y el runner sin consultar la BD
+    en cada uso.
+    """
+
+    def __init__(self, genes, antibiotics, recommendations, specificity=None, epistasis=None):
+        self.genes = genes
+        self.antibiotics = antibiotics
+        self.recommendations = recommendations
+        self.specificity = specificity or {}
+        self.epistasis = epistasis or {}
+
+    @classmethod
+    def load(cls):
+        session = get_session()
+        try:
+            genes = [
+                {
+                    "id": g.id,
+                    "nombre": g.nombre,
+                    "peso_resistencia": g.peso_resistencia,
+                    "descripcion": g.descripcion,
+                }
+                for g in session.query(Gen).order_by(Gen.id).all()
+            ]
+            antibiotics = {
+                a.id: {
+                    "id": a.id,
+                    "nombre": a.nombre,
+                    "tipo": a.tipo,
+                    "concentracion_minima": a.concentracion_minima,
+                    "concentracion_maxima": a.concentracion_maxima,
+                    "vida_media_horas": a.vida_media_horas,
+                    "intervalo_dosis_horas": a.intervalo_dosis_horas,
+                }
+                for a in session.query(Antibiotico).order_by(Antibiotico.id).all()
+            }
+            recommendations = {}
+            for r in session.query(Recomendacion).order_by(Recomendacion.id).all():
+                # Igual que query(...).first(): se conserva la primera por antibiótico
+                recommendations.setdefault(r.antibiotico_id, r.texto)
+            specificity = {
+                (s.gen_id, s.antibiotico_id): s.peso_especificidad
+                for s in session.query(GenAntibiotico).all()
+            }
+            epistasis = {
+                (e.gen_a_id, e.gen_b_id): e.peso_epistasis
+                for e in session.query(EpistasisGenes).all()
+            }
+        finally:
+            session.close()
+        return cls(genes, antibiotics, recommendations, specificity, epistasis)
+
+    def gene_dicts(self):
+        """Genes en el formato que espera GeneticAlgorithm."""
+        return [
+            {"id": g["id"], "nombre": g["nombre"], "peso_resistencia": g["peso_resistencia"]}
+            for g in self.genes
+        ]
+
+    def drug_specificity(self):
+        """Copia de {(gen_id, antibiotico_id): peso} en el formato del GA."""
+        return dict(self.specificity)
+
+    def epistasis_terms(self):
+        """Copia de {(gen_a_id, gen_b_id): peso} en el formato del GA."""
+        return dict(self.epistasis)
+
+    def antibiotic(self, ab_id):
+        """Copia del antibiótico en el formato del cronograma del GA."""
+        return dict(self.antibiotics[ab_id])
+
+    def antibiotic_by_name(self, nombre):
+        for ab in self.antibiotics.values():
+            if ab["nombre"] == nombre:
+                return dict(ab)
+        raise KeyError(nombre)
+
+    def antibiotic_options(self):
+        """Antibióticos en el formato de ResultsView (rangos de concentración)."""
+        return [
+            {
+                "id": ab["id"],
+                "nombre": ab["nombre"],
+                "conc_min": ab["concentracion_minima"],
+                "conc_max": ab["concentracion_maxima"],
+            }
+            for ab in self.antibiotics.values()
+        ]
+
+    def recommendation(self, ab_id):
+        return self.recommendations.get(ab_id, "")
+
+_reference_data = None
+_lock = threading.Lock()
+
+def get_reference_data():
+    """Devuelve la caché de datos de referencia, cargándola en el primer uso."""
+    global _reference_data
+    data = _reference_data
+    if data is None:
+        with _lock:
+            if _reference_data is None:
+                _reference_data = ReferenceData.load()
+            data = _reference_data
+    return data
+
+def invalidate_reference_data():
+    """Descarta la caché; la próxima lectura vuelve a cargar desde la BD."""
+    global _reference_data
+    with _lock:
+        _reference_data = None
@@ -0,0 +1,139 @@
+"""
+Caché de resultados de simulación direccionada por contenido.
+
+La clave es el SHA-256 del JSON canónico de todas las entradas del GA
+(GeneticAlgorithm.scenario_params) más CACHE_FORMAT_VERSION. Cada entrada es
+un archivo <clave>.npz con los historiales, la población final y un resumen
+JSON; al ser un archivo por entrada, sobrevive reinicios y se escribe de forma
+atómica (archivo temporal + os.replace).
+
+Desalojo LRU por tamaño: cada lectura actualiza el mtime del archivo y, al
+superar max_bytes, se borran primero los de mtime más antiguo.
+
+Incrementar CACHE_FORMAT_VERSION cuando cambie la dinámica del modelo, de modo
+que las entradas calculadas con el modelo anterior dejen de coincidir.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+from src.data.database import user_data_dir
+
+CACHE_FORMAT_VERSION = 8
+DEFAULT_MAX_BYTES = 256 * 1024**2
+RESULT_CACHE_DIR = os.environ.get(
+    "RESULT_CACHE_DIR", os.path.join(user_data_dir, "cache", "resultados")
+)
+
+_SUMMARY_KEY = "__summary__"
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Tipo no serializable en la clave de caché: {type(value).__name__}")
+
+def scenario_key(params):
+    """Clave estable para un dict de entradas (orden de claves irrelevante)."""
+    canonical = json.dumps(
+        {"formato": CACHE_FORMAT_VERSION, "params": params},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=_json_default,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+class ResultCache:
+    """Almacén en disco de resultados (arrays, resumen) por clave de escenario."""
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or RESULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def get(self, key):
+        """Devuelve (arrays, resumen) o None si la clave no está en la caché."""
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files if name != _SUMMARY_KEY}
+                summary = json.loads(str(data[_SUMMARY_KEY]))
+        except FileNotFoundError:
+            return None
+        except Exception:
+            logging.warning(f"Discarding unreadable result cache entry {path}", exc_info=True)
+            self._remove(path)
+            return None
+
+        try:
+            os.utime(path)  # Marca de uso para el desalojo LRU
+        except OSError:
+            pass
+        logging.info(f"Result cache hit: {key[:12]}")
+        return arrays, summary
+
+    def put(self, key, arrays, summary):
+        """Guarda una entrada de forma atómica y aplica el límite de tamaño."""
+        payload = dict(arrays)
+        payload[_SUMMARY_KEY] = np.array(json.dumps(summary, default=_json_default))
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez_compressed(f, **payload)
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            self._remove(tmp_path)
+            raise
+        self._evict()
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
+
+    def clear(self):
+        for entry in self._entries():
+            self._remove(entry.path)
+
+    def size_bytes(self):
+        return sum(entry.stat().st_size for entry in self._entries())
+
+    def _entries(self):
+        try:
+            return [e for e in os.scandir(self.directory) if e.name.endswith(".npz")]
+        except FileNotFoundError:
+            return []
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            for entry in self._entries():
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            # La entrada más reciente se conserva aunque supere el límite por sí sola
+            for _, size, path in sorted(entries)[:-1]:
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -1,4 +1,5 @@
 import sys
+import logging
 import numpy as np
 import pyqtgraph as pg
 import os
@@ -11,16 +12,15 @@ from PyQt5.QtWidgets import (
     QApplication,
 )
 from PyQt5.QtCore import QTimer, Qt
-from src.gui.widgets.map_window import MapWindow
 from src.gui.widgets.input_form import InputForm
 from src.gui.widgets.results_view import ResultsView
 from src.gui.widgets.csv_validation import CSVValidationWidget
 from src.gui.widgets.detailed_results import DetailedResults
-from src.gui.widgets.expand_window import ExpandWindow
-from src.core.genetic_algorithm import GeneticAlgorithm
 from src.core.reporting import save_simulation_report, save_generation_metrics
-from src.data.database import get_session
-from src.data.models import Gen, Antibiotico, Recomendacion, Simulacion
+from src.core.runner import build_schedule, create_simulation_record
+from src.data.persistence import WriteBehindQueue
+from src.data.reference_cache import get_reference_data
+from src.data.result_cache import ResultCache, scenario_key
 from PyQt5.QtGui import QIcon
 
 # Mapa de colores por tipo de antibiótico
@@ -58,12 +58,7 @@ class MainWindow(QMainWindow):
 
         # ---- Widgets principales ----
         self.input_tab = InputForm()
-        session = get_session()
-        abs_q = session.query(
-            Antibiotico.id, Antibiotico.nombre, Antibiotico.concentracion_minima, Antibiotico.concentracion_maxima
-        ).all()
-        session.close()
-        antibiotics = [{"id": a[0], "nombre": a[1], "conc_min": a[2], "conc_max": a[3]} for a in abs_q]
+        antibiotics = get_reference_data().antibiotic_options()
         self.map_window = None
         self.expand_window = None 
         self.results_tab = ResultsView(antibiotics)
@@ -83,6 +78,13 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(self.tabs)
         self.setStatusBar(QStatusBar())
 
+        # ---- Persistencia diferida de resultados ----
+        self.persistence = WriteBehindQueue()
+        self.result_cache = ResultCache()
+        self._cache_key = None
+        self._from_cache = False
+        self._lattice_mode = False  # True si la corrida actual es una LatticeSimulation
+
         # ---- Timer para animación ----
         self.sim_timer = QTimer(self)
         self.sim_timer.timeout.connect(self._on_sim_step)
@@ -94,6 +96,8 @@ class MainWindow(QMainWindow):
         self.saved_time_horizon = 100
         self.saved_environmental_factors = {"temperature": 37.0, "pH": 7.4}
         self.saved_repro_rate = 1.0     
+        self.saved_seed = None
+        self.saved_fitness_model = "clasico"
         self.initial_attributes = {}
 
         # Flags para mostrar alertas solo una vez
@@ -101,7 +105,8 @@ class MainWindow(QMainWindow):
         self.alert_shown_resistance = False
 
     def on_params_saved(
-        self, genes, unit, mut_rate, death_rate, time_horizon, environmental_factors, reproduction_rate
+        self, genes, unit, mut_rate, death_rate, time_horizon, environmental_factors, reproduction_rate, seed=0,
+        fitness_model="clasico",
     ):
         """Se llama cuando el usuario guarda parámetros en la pestaña 1."""
         self.saved_genes = genes
@@ -110,6 +115,8 @@ class MainWindow(QMainWindow):
         self.saved_time_horizon = time_horizon
         self.saved_environmental_factors = environmental_factors
         self.saved_repro_rate = reproduction_rate   
+        self.saved_seed = seed or None  # 0 = aleatoria
+        self.saved_fitness_model = fitness_model
         QMessageBox.information(
             self,
             "Éxito",
@@ -124,71 +131,46 @@ class MainWindow(QMainWindow):
             self.tabs.setCurrentWidget(self.input_tab)
             return
 
-        # Recuperar información de genes desde la base de datos
-        session = get_session()
-        genes_orm = session.query(Gen).all()
-        genes = [
-            {"id": g.id, "nombre": g.nombre, "peso_resistencia": g.peso_resistencia}
-            for g in genes_orm
-        ]
-        session.close()
+        # Motor de simulación y ventanas de visualización se cargan en la primera
+        # simulación para no retrasar la aparición de la ventana principal
+        from src.gui.widgets.map_window import MapWindow
+
+        # Genes y antibióticos desde la caché de datos de referencia
+        reference = get_reference_data()
+        genes = reference.gene_dicts()
 
         # Construir la lista de tuplas (tiempo, antibiótico, concentración)
-        sched_objs = []
-        session = get_session()
-        for t, ab_id, conc in schedule:
-            ab_orm = session.query(Antibiotico).get(ab_id)
-            ab = {
-                "id": ab_orm.id,
-                "nombre": ab_orm.nombre,
-                "tipo": ab_orm.tipo,
-                "concentracion_minima": ab_orm.concentracion_minima,
-                "concentracion_maxima": ab_orm.concentracion_maxima,
-            }
-            sched_objs.append((t, ab, conc))
-        session.close()
-
-        # Determinar el primer antibiótico y concentración (para guardar la simulación)
-        if sched_objs:
-            antibiotico_id = sched_objs[0][1]["id"]
-            concentracion = sched_objs[0][2]
-        else:
-            antibiotico_id = None
-            concentracion = None
+        sched_objs = build_schedule(schedule, reference)
 
         # Crear registro de Simulación en la base de datos
-        session = get_session()
-        simulacion = Simulacion(
-            antibiotico_id=antibiotico_id,
-            concentracion=concentracion if concentracion is not None else 0.0,
-            resistencia_predicha=0.0,
-        )
-        session.add(simulacion)
-        session.commit()
-        simulation_id = simulacion.id
-        session.close()
+        simulation_id = create_simulation_record(sched_objs)
 
         # Guardar horarios manuales y despejar cualquier horario optimizado previo
         self._manual_schedule = sched_objs
         self._optimized_schedule = None
         self.sim_start_time = time.time()
 
-        # Instanciar el algoritmo genético con los parámetros
-        self.ga = GeneticAlgorithm(
-            genes=genes,
-            antibiotic_schedule=sched_objs,
-            mutation_rate=self.saved_mut_rate,
-            generations=self.saved_time_horizon,
-            pop_size=200,
-            death_rate=self.saved_death_rate,
-            environmental_factors=self.saved_environmental_factors,
-            simulation_id=simulation_id,
-            reproduction_rate=self.saved_repro_rate,      
-            pressure_factor=0.25,
-        )
+        combination_therapy, interaction_model = self.results_tab.combination_options()
+        self._lattice_mode = self.results_tab.simulation_mode() == "lattice"
+
+        if self._lattice_mode:
+            self.ga = self._build_lattice(genes, sched_objs, simulation_id)
+        else:
+            self.ga = self._build_ga(
+                genes, sched_objs, simulation_id, reference, combination_therapy, interaction_model
+            )
         self.ga.initialize(self.saved_genes)
         self.initial_attributes = self.ga.get_average_attributes()
 
+        # Solo las corridas con semilla son reproducibles y, por tanto, cacheables;
+        # la grilla no tiene población exportable y no usa la caché
+        cached = None
+        self._cache_key = None
+        if self.saved_seed is not None and not self._lattice_mode:
+            self._cache_key = scenario_key(self.ga.scenario_params(self.saved_genes))
+            cached = self.result_cache.get(self._cache_key)
+        self._from_cache = cached is not None
+
         # --- Posicionamiento de ventanas de gráficos ---
         main_window_geom = self.geometry()
         screen = QApplication.primaryScreen().geometry()
@@ -207,7 +189,77 @@ class MainWindow(QMainWindow):
         self.map_window.move(map_x, main_window_geom.y())
         self.map_window.show()
 
-        # Crear/actualizar y posicionar la ventana de expansión a la derecha
+        # La ventana de expansión dibuja individuos: la grilla no los tiene
+        if self._lattice_mode:
+            if self.expand_window is not None:
+                self.expand_window.hide()
+        else:
+            self._show_expand_window(main_window_geom, screen, margin)
+
+        # Limpiar gráfica en la pestaña de resultados
+        self.results_tab.clear_plot()
+        self.tabs.setCurrentWidget(self.results_tab)
+
+        self.alert_shown_extinction = False
+        self.alert_shown_resistance = False
+
+        if cached is not None:
+            # Resultado ya calculado: se dibuja el estado final sin simular
+            self.ga.restore_results(*cached)
+            self._render_progress()
+            self._finish_simulation()
+            self.statusBar().showMessage("Resultado recuperado de la caché", 3000)
+            return
+
+        self.sim_timer.start(100)
+
+    def _build_ga(self, genes, sched_objs, simulation_id, reference, combination_therapy, interaction_model):
+        """Instancia el algoritmo genético con los parámetros guardados."""
+        from src.core.genetic_algorithm import GeneticAlgorithm
+
+        return GeneticAlgorithm(
+            genes=genes,
+            antibiotic_schedule=sched_objs,
+            mutation_rate=self.saved_mut_rate,
+            generations=self.saved_time_horizon,
+            pop_size=200,
+            death_rate=self.saved_death_rate,
+            environmental_factors=self.saved_environmental_factors,
+            simulation_id=simulation_id,
+            reproduction_rate=self.saved_repro_rate,      
+            pressure_factor=0.25,
+            seed=self.saved_seed,
+            combination_therapy=combination_therapy,
+            interaction_model=interaction_model,
+            drug_specificity=reference.drug_specificity(),
+            epistasis=reference.epistasis_terms() if self.results_tab.epistasis_enabled() else None,
+            fitness_model=self.saved_fitness_model,
+            fast_forward=self.results_tab.fast_forward_enabled(),
+            hours_per_generation=self.results_tab.hours_per_generation(),
+        )
+
+    def _build_lattice(self, genes, sched_objs, simulation_id):
+        """Instancia la simulación sobre grilla 2-D con los parámetros guardados."""
+        from src.core.lattice import LatticeSimulation
+
+        return LatticeSimulation(
+            genes=genes,
+            antibiotic_schedule=sched_objs,
+            mutation_rate=self.saved_mut_rate,
+            generations=self.saved_time_horizon,
+            death_rate=self.saved_death_rate,
+            environmental_factors=self.saved_environmental_factors,
+            simulation_id=simulation_id,
+            reproduction_rate=self.saved_repro_rate,
+            pressure_factor=0.25,
+            seed=self.saved_seed,
+            hours_per_generation=self.results_tab.hours_per_generation(),
+        )
+
+    def _show_expand_window(self, main_window_geom, screen, margin):
+        """Crea/actualiza y posiciona la ventana de expansión a la derecha."""
+        from src.gui.widgets.expand_window import ExpandWindow
+
         if self.expand_window is None:
             self.expand_window = ExpandWindow(self.ga)
         else:
@@ -221,85 +273,105 @@ class MainWindow(QMainWindow):
         self.expand_window.move(expand_x, main_window_geom.y())
         self.expand_window.show()
 
-        # Limpiar gráfica en la pestaña de resultados y arrancar el timer
-        self.results_tab.clear_plot()
-        self.sim_timer.start(100)
-        self.tabs.setCurrentWidget(self.results_tab)
-
-        self.alert_shown_extinction = False
-        self.alert_shown_resistance = False
-
     def _on_sim_step(self):
         """Avanza la simulación paso a paso y al final actualiza Resultados Detallados."""
         if not self.ga.step():
-            self.sim_timer.stop()
-            self._show_threshold_alerts()
-
-            self.ga.save_final_gene_attributes(self.saved_genes)
-            
-            # Guardar las métricas de la simulación en la base de datos
-            saved_params = {
-                "genes": self.saved_genes,
-                "mutation_rate": self.saved_mut_rate,
-                "death_rate": self.saved_death_rate,
-                "generations": self.saved_time_horizon,
-                "environmental_factors": self.saved_environmental_factors,
-                "reproduction_rate": self.saved_repro_rate,   
-            }
-            save_simulation_report(self.ga, saved_params)
-            save_generation_metrics(self.ga, self.ga.current_simulation_id)
-
-            schedule = self._optimized_schedule or self._manual_schedule or []
-            for t, ab, conc in schedule:
-                color_line = ANTIBIOTIC_COLORS.get(ab["tipo"], DEFAULT_COLOR)
-                line = pg.InfiniteLine(
-                    pos=t,
-                    angle=90,
-                    pen=pg.mkPen(color_line, width=2, style=Qt.DashLine)
-                )
-                texto = f"{ab['nombre']}\n{conc:.2f}"
-                label = pg.TextItem(texto, color=color_line, anchor=(0, 1))
-                y_min, y_max = self.results_tab.plot_main.viewRange()[1]
-                rango_y = y_max - y_min
-                porcentaje = 0.08
-                y_pos = y_min + rango_y * porcentaje
-                label.setPos(t, y_pos)
-                self.results_tab.plot_main.addItem(line)
-                self.results_tab.plot_main.addItem(label, ignoreBounds=True)
-                self.results_tab._event_items.extend([line, label])
-
-            session = get_session()
-            antibioticos_results = []
-            for t_evt, ab, _ in schedule:
-                idx = np.searchsorted(self.ga.times, t_evt, side="right") - 1
-                valor = self.ga.avg_hist[idx]
-                reco = (
-                    session.query(Recomendacion)
-                    .filter_by(antibiotico_id=ab["id"])
-                    .first()
-                )
-                texto = reco.texto if reco else ""
-                antibioticos_results.append((ab["nombre"], valor, texto))
-            session.close()
-
-            final_attributes = self.ga.get_average_attributes()
-            self.detail_tab.update_results(
-                antibioticos_results=antibioticos_results,
-                best_hist=self.ga.best_hist,
-                avg_hist=self.ga.avg_hist,
-                div_hist=self.ga.div_hist,
-                initial_attributes=self.initial_attributes,
-                final_attributes=final_attributes,
-            )
-            final_res = self.ga.avg_hist[-1]
-            self.results_tab.show_interpretation(final_res)
-            final_pop = self.ga.population_hist[-1] if self.ga.population_hist else 0.0
-            self.results_tab.show_population_interpretation(final_pop)
-            peak_deg = max(self.ga.degradation_hist) if self.ga.degradation_hist else 0.0
-            self.results_tab.show_degradation_interpretation(peak_deg)
-
+            self._finish_simulation()
             return
-
+        self._render_progress()
+
+    def _finish_simulation(self):
+        """Cierra la corrida: alertas, caché, persistencia y Resultados Detallados."""
+        self.sim_timer.stop()
+        self._show_threshold_alerts()
+
+        if self._cache_key is not None and not self._from_cache:
+            try:
+                self.result_cache.put(self._cache_key, *self.ga.export_results())
+            except OSError:
+                logging.warning("Could not store simulation result in cache", exc_info=True)
+
+        # Guardar las métricas de la simulación en segundo plano
+        saved_params = {
+            "genes": self.saved_genes,
+            "mutation_rate": self.saved_mut_rate,
+            "death_rate": self.saved_death_rate,
+            "generations": self.saved_time_horizon,
+            "environmental_factors": self.saved_environmental_factors,
+            "reproduction_rate": self.saved_repro_rate,   
+            "seed": self.saved_seed,
+            "hours_per_generation": self.ga.hours_per_generation,
+        }
+        pending_writes = []
+        if self._lattice_mode:
+            # La grilla no tiene individuos: sin atributos finales por gen
+            saved_params["mode"] = "lattice"
+        else:
+            saved_params.update(
+                combination_therapy=self.ga.combination_therapy,
+                interaction_model=self.ga.interaction_model,
+                epistasis=bool(self.ga.epistasis),
+                fitness_model=self.ga.fitness_model,
+                fast_forward=self.ga.fast_forward,
+            )
+            pending_writes.append(
+                self.persistence.submit(self.ga.save_final_gene_attributes, self.saved_genes)
+            )
+        pending_writes += [
+            self.persistence.submit(save_simulation_report, self.ga, saved_params),
+            self.persistence.submit(
+                save_generation_metrics, self.ga, self.ga.current_simulation_id
+            ),
+        ]
+        for future in pending_writes:
+            future.add_done_callback(self._on_persistence_done)
+        self.statusBar().showMessage("Guardando resultados en segundo plano...", 3000)
+
+        schedule = self._optimized_schedule or self._manual_schedule or []
+        for t, ab, conc in schedule:
+            color_line = ANTIBIOTIC_COLORS.get(ab["tipo"], DEFAULT_COLOR)
+            line = pg.InfiniteLine(
+                pos=t,
+                angle=90,
+                pen=pg.mkPen(color_line, width=2, style=Qt.DashLine)
+            )
+            texto = f"{ab['nombre']}\n{conc:.2f}"
+            label = pg.TextItem(texto, color=color_line, anchor=(0, 1))
+            y_min, y_max = self.results_tab.plot_main.viewRange()[1]
+            rango_y = y_max - y_min
+            porcentaje = 0.08
+            y_pos = y_min + rango_y * porcentaje
+            label.setPos(t, y_pos)
+            self.results_tab.plot_main.addItem(line)
+            self.results_tab.plot_main.addItem(label, ignoreBounds=True)
+            self.results_tab._event_items.extend([line, label])
+
+        reference = get_reference_data()
+        antibioticos_results = []
+        for t_evt, ab, _ in schedule:
+            idx = np.searchsorted(self.ga.times, t_evt, side="right") - 1
+            valor = self.ga.avg_hist[idx]
+            texto = reference.recommendation(ab["id"])
+            antibioticos_results.append((ab["nombre"], valor, texto))
+
+        final_attributes = self.ga.get_average_attributes()
+        self.detail_tab.update_results(
+            antibioticos_results=antibioticos_results,
+            best_hist=self.ga.best_hist,
+            avg_hist=self.ga.avg_hist,
+            div_hist=self.ga.div_hist,
+            initial_attributes=self.initial_attributes,
+            final_attributes=final_attributes,
+        )
+        final_res = self.ga.avg_hist[-1]
+        self.results_tab.show_interpretation(final_res)
+        final_pop = self.ga.population_hist[-1] if self.ga.population_hist else 0.0
+        self.results_tab.show_population_interpretation(final_pop)
+        peak_deg = max(self.ga.degradation_hist) if self.ga.degradation_hist else 0.0
+        self.results_tab.show_degradation_interpretation(peak_deg)
+
+    def _render_progress(self):
+        """Actualiza gráficas, mapa y expansión con el estado actual del GA."""
         t = np.linspace(0, self.ga.generations, len(self.ga.avg_hist))
         y = np.array(self.ga.avg_hist)
         self.results_tab.curve_avg.setData(t, y)
@@ -319,9 +391,17 @@ class MainWindow(QMainWindow):
 
         if getattr(self, "map_window", None) is not None:
             self.map_window.update_map()
-        if getattr(self, "expand_window", None) is not None:
+        if getattr(self, "expand_window", None) is not None and not self._lattice_mode:
             self.expand_window.update_expand()
 
+    def _on_persistence_done(self, future):
+        """Se ejecuta en el hilo de persistencia: solo registra errores."""
+        if future.exception() is not None:
+            logging.error(
+                "Error saving simulation results in background",
+                exc_info=future.exception(),
+            )
+
     def _show_threshold_alerts(self):
         """Mostrar alertas al alcanzar umbrales críticos solo una vez."""
         if (
@@ -346,6 +426,8 @@ class MainWindow(QMainWindow):
             )
 
     def closeEvent(self, event):
+        # Escribir los resultados pendientes antes de salir
+        self.persistence.shutdown()
         if hasattr(self, 'map_window') and self.map_window:
             self.map_window.close()
         if hasattr(self, 'expand_window') and self.expand_window:
@@ -15,11 +15,9 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtGui import QFont
 from PyQt5.QtCore import Qt, QTimer
 import pyqtgraph as pg
-import pyqtgraph.exporters
 import numpy as np
 import tempfile
 import os
-from src.utils.pdf_generator import generate_pdf 
 
 class DetailedResults(QWidget):
     def __init__(self, parent=None):
@@ -220,6 +218,10 @@ class DetailedResults(QWidget):
 
         chart_image_path = None
         try:
+            # Exportadores y reportlab se cargan solo al exportar
+            import pyqtgraph.exporters
+            from src.utils.pdf_generator import generate_pdf
+
             # 2. Recolectar datos
             summary = self.summary_text.text()
             
@@ -82,11 +82,9 @@ class ExpandWindow(QDialog):
         self.plot_item.setLabel("left", "Y", **{"color": (50, 50, 50), "font-size": "9pt"})
         self.plot_item.setLabel("bottom", "X", **{"color": (50, 50, 50), "font-size": "9pt"})
 
-        # 4) Creamos los 2 heatmap items (viejo y nuevo), ambos invisibles inicialmente
-        self.heatmap_old = FadeImageItem(opacity=0.0)
-        self.heatmap_new = FadeImageItem(opacity=0.0)
-        self.plot_item.addItem(self.heatmap_old)
-        self.plot_item.addItem(self.heatmap_new)
+        # 4) Heatmap de densidad radial, invisible inicialmente
+        self.heatmap = FadeImageItem(opacity=0.0)
+        self.plot_item.addItem(self.heatmap)
 
         # 5) Creamos los 2 scatter items (viejo y nuevo)
         self.scatter_old = FadeScatterItem(
@@ -141,6 +139,19 @@ class ExpandWindow(QDialog):
         self.margin = 10
         self._primera = True  # Para la primera actualización sin animación
 
+        # Scatter vectorizado: pincel por valor cuantizado (LUT) y un pen compartido
+        self.max_scatter = 2000
+        self._scatter_pen = pg.mkPen((0, 0, 0, 180), width=0.5)
+        self._scatter_brushes = np.array(
+            [pg.mkBrush(*c) for c in self.scatter_cmap.getLookupTable(0.0, 1.0, 256, alpha=True)],
+            dtype=object,
+        )
+
+        # Capa de densidad radial: la imagen del disco unidad se calcula una vez y
+        # cada generación solo se escala al radio de expansión con setRect
+        self.heatmap.setImage(self._radial_density(), levels=(0, 1))
+        self.heatmap.setLookupTable(self.heatmap_cmap.getLookupTable())
+
         # Mostrar el primer frame sin animación
         self.update_expand(first_time=True)
 
@@ -167,10 +178,29 @@ class ExpandWindow(QDialog):
         anim_out.start(QPropertyAnimation.DeleteWhenStopped)
         anim_in.start(QPropertyAnimation.DeleteWhenStopped)
 
+    def _radial_density(self, bins=50):
+        """
+        Densidad esperada (normalizada a [0, 1]) de individuos repartidos con
+        ángulo y radio uniformes en el disco unidad, en una grilla de bins×bins
+        sobre [-1, 1]². La densidad por área es ∝ 1/r; se promedia dentro de
+        cada bin, como al histogramar una muestra, y el centro queda acotado.
+        Normalizada al máximo no depende del radio del disco.
+        """
+        # Promedio por bin con 4×4 submuestras, como integraría el histograma
+        sub = 4
+        step = 2.0 / (bins * sub)
+        centers = (np.arange(bins * sub) + 0.5) * step - 1.0
+        xx, yy = np.meshgrid(centers, centers)
+        r = np.hypot(xx, yy)
+
+        fine = np.where(r <= 1.0, 1.0 / np.maximum(r, step / 2.0), 0.0)
+        density = fine.reshape(bins, sub, bins, sub).mean(axis=(1, 3))
+        return density / density.max()
+
     def update_expand(self, first_time=False):
         """
         Se llama en cada paso de la simulación para:
-          1) Construir un heatmap radial de recubrimiento (sin cambiar su colormap).
+          1) Mostrar la densidad radial esperada, escalada por el índice de expansión.
           2) Dibujar scatter de letalidad/reproducción usando verde→rojo.
           3) Aplicar cross‐fade entre viejo y nuevo.
           Si first_time=True, pinta el “nuevo” directamente (sin animar).
@@ -181,19 +211,21 @@ class ExpandWindow(QDialog):
 
         poblacion_real = self.ga.population_hist[t_idx]
 
+        # Posiciones de la población (arreglo N×2; el GA no arma individuos para esto)
+        positions = self.ga.positions
+
         # Si no hay individuos, limpiar y salir
-        if len(self.ga.pop) == 0:
+        if len(positions) == 0:
             self.info_label.setText(f"Generación: {self.ga.current_step}    Población: 0")
             self.scatter_old.clear()
             self.scatter_new.clear()
-            self.heatmap_old.clear()
-            self.heatmap_new.clear()
+            self.heatmap.setOpacityProp(0.0)
+            self._primera = True  # Al repoblarse se muestra de nuevo sin animar
             return
 
         # Extraer atributos de la población actual
-        rec_vals = np.array([ind.recubrimiento for ind in self.ga.pop])
-        rep_vals = np.array([ind.reproduccion for ind in self.ga.pop])
-        let_vals = np.array([ind.letalidad for ind in self.ga.pop])
+        rep_vals = self.ga.trait("reproduccion")
+        let_vals = self.ga.trait("letalidad")
 
         # Actualizar etiqueta superior
         self.info_label.setText(
@@ -204,44 +236,26 @@ class ExpandWindow(QDialog):
         # Usamos el índice de expansión como radio máximo para una visualización más representativa
         radio_max = self.ga.expansion_index_hist[-1] * 50.0 if self.ga.expansion_index_hist else 50.0
 
-        n_heat = max(1000, int(poblacion_real))
-        angs_heat = np.random.uniform(0, 2 * np.pi, n_heat)
-        radios_heat = np.random.uniform(0, radio_max, n_heat)
-        xs_heat = radios_heat * np.cos(angs_heat)
-        ys_heat = radios_heat * np.sin(angs_heat)
+        # Densidad radial analítica: la imagen fija se escala al radio actual
+        radio_img = max(radio_max, 1e-6)  # Radio nulo: toda la masa en el centro
+        self.heatmap.setRect(-radio_img, -radio_img, 2.0 * radio_img, 2.0 * radio_img)
+        extent = radio_max + self.margin
+        x_min, x_max, y_min, y_max = -extent, extent, -extent, extent
 
-        x_min, x_max = xs_heat.min() - self.margin, xs_heat.max() + self.margin
-        y_min, y_max = ys_heat.min() - self.margin, ys_heat.max() + self.margin
+        # 2) Construir scatter de individuos (submuestreo hasta max_scatter)
+        poblacion_indiv = len(positions)
+        n_scatter = min(poblacion_indiv, self.max_scatter)
+        # Submuestreo a paso fijo: los mismos individuos se ven de un frame a otro
+        indices = np.linspace(0, poblacion_indiv - 1, n_scatter).astype(int)
 
-        bins = 50
-        H, xedges, yedges = np.histogram2d(
-            xs_heat, ys_heat,
-            bins=bins,
-            range=[[x_min, x_max], [y_min, y_max]]
-        )
-        H = np.flipud(H.T)
-        H_norm = H / np.max(H) if H.max() > 0 else H
-
-        # Cargar el heatmap “nuevo” usando el colormap inferno (fondo)
-        self.heatmap_new.setImage(H_norm, levels=(0, 1))
-        width = x_max - x_min
-        height = y_max - y_min
-        self.heatmap_new.setRect(x_min, y_min, width, height)
-        self.heatmap_new.setLookupTable(self.heatmap_cmap.getLookupTable())
-
-        # 2) Construir scatter de individuos (submuestreo)
-        poblacion_indiv = len(self.ga.pop)
-        n_scatter = min(poblacion_indiv, 300)
-        indices = np.random.choice(poblacion_indiv, n_scatter, replace=False)
-
-        angs_scat = np.random.uniform(0, 2 * np.pi, n_scatter)
-        radios_scat = np.random.uniform(0, radio_max, n_scatter)
-        xs_scat = radios_scat * np.cos(angs_scat)
-        ys_scat = radios_scat * np.sin(angs_scat)
+        # Posiciones reales del GA, escaladas del disco de simulación al radio de expansión
+        escala = radio_max / self.ga.spatial_radius
+        pos_scat = positions[indices] * escala
 
         let_sub = let_vals[indices]
         rep_sub = rep_vals[indices]
-        tamanos = 4 + (let_sub * 8)
+        # Tamaños cuantizados a 0.5 px: pocas combinaciones distintas en el atlas de símbolos
+        tamanos = np.round((4 + let_sub * 8) * 2) / 2
 
         diff = np.ptp(rep_sub)
         if diff < 1e-9:
@@ -251,23 +265,18 @@ class ExpandWindow(QDialog):
 
         # Para el scatter, mapeamos rep_norm [0,1] a la colormap rojo→amarillo→verde
         # Rojo = valor bajo, Amarillo = valor medio, Verde = valor alto
-        brushes = [self.scatter_cmap.map(r, mode='qcolor') for r in rep_norm]
-        spots_new = [
-            {
-                'pos': (xs_scat[i], ys_scat[i]),
-                'brush': brushes[i],
-                'pen': pg.mkPen((0, 0, 0, 180), width=0.5),
-                'size': tamanos[i]
-            }
-            for i in range(n_scatter)
-        ]
-        self.scatter_new.setData(spots_new)
+        brush_idx = np.clip((rep_norm * (len(self._scatter_brushes) - 1)).round().astype(int), 0, len(self._scatter_brushes) - 1)
+        self.scatter_new.setData(
+            pos=pos_scat,
+            size=tamanos,
+            brush=self._scatter_brushes[brush_idx],
+            pen=self._scatter_pen,
+        )
 
         # 3) Primera vez: mostrar “nuevo” sin animar
         if first_time or self._primera:
-            self.heatmap_new.setOpacityProp(0.6)
+            self.heatmap.setOpacityProp(0.6)
             self.scatter_new.setOpacityProp(0.8)
-            self.heatmap_old.setOpacityProp(0.0)
             self.scatter_old.setOpacityProp(0.0)
             self._primera = False
 
@@ -276,16 +285,12 @@ class ExpandWindow(QDialog):
             self.plot_item.setYRange(y_min - extra, y_max + extra, padding=0)
             return
 
-        # 4) Cross‐fade: animar viejo → transparente y nuevo → visible
-        old_heat_op = self.heatmap_old.getOpacity()
-        old_scat_op = self.scatter_old.getOpacity()
+        # 4) Cross‐fade de los puntos: viejo → transparente y nuevo → visible
         duration = 300
-
-        self._crossfade(self.heatmap_old, self.heatmap_new, old_heat_op, 0.6, duration)
+        old_scat_op = self.scatter_old.getOpacity()
         self._crossfade(self.scatter_old, self.scatter_new, old_scat_op, 0.8, duration)
 
         # 5) Intercambiar referencias para el siguiente ciclo
-        self.heatmap_old, self.heatmap_new = self.heatmap_new, self.heatmap_old
         self.scatter_old, self.scatter_new = self.scatter_new, self.scatter_old
 
         # 6) Ajustar rangos de ejes
@@ -295,12 +300,11 @@ class ExpandWindow(QDialog):
 
     def reset(self):
         """
-        Limpia cualquier contenido previo de heatmaps/scatters y
+        Oculta el heatmap, limpia los scatters y
         restaura el estado de “primera actualización”.
         """
         self._primera = True
-        self.heatmap_old.clear()
-        self.heatmap_new.clear()
+        self.heatmap.setOpacityProp(0.0)
         self.scatter_old.clear()
         self.scatter_new.clear()
         self.update_expand(first_time=True)
@@ -13,20 +13,20 @@ from PyQt5.QtWidgets import (
     QDoubleSpinBox,
     QPushButton,
     QToolTip,
+    QComboBox,
 )
 from PyQt5.QtCore import pyqtSignal, Qt
 from PyQt5.QtGui import QFont
 from types import SimpleNamespace
 
-from src.data.database import get_session
-from src.data.models import Gen
+from src.core.fitness_models import DEFAULT_FITNESS_MODEL, model_options
+from src.data.reference_cache import get_reference_data
 
 class InputForm(QWidget):
-    params_submitted = pyqtSignal(list, str, float, float, int, dict, float)  
+    params_submitted = pyqtSignal(list, str, float, float, int, dict, float, int, str)
 
     def __init__(self):
         super().__init__()
-        self.session = get_session()
 
         # Layout principal con márgenes y espaciado
         self.main_layout = QVBoxLayout(self)
@@ -50,10 +50,10 @@ class InputForm(QWidget):
 
 
     def load_data(self):
-        """Carga genes como estructuras planas."""
-        genes_q = self.session.query(Gen.id, Gen.nombre, Gen.descripcion).all()
+        """Carga genes como estructuras planas desde la caché de referencia."""
         self.genes = [
-            SimpleNamespace(id=g[0], nombre=g[1], descripcion=g[2]) for g in genes_q
+            SimpleNamespace(id=g["id"], nombre=g["nombre"], descripcion=g["descripcion"])
+            for g in get_reference_data().genes
         ]
 
     def create_gene_selection(self):
@@ -149,6 +149,34 @@ class InputForm(QWidget):
         if label_repro:
             label_repro.setToolTip(tooltip_repro)
 
+        # Semilla aleatoria
+        self.seed_sb = QSpinBox()
+        self.seed_sb.setRange(0, 2**31 - 1)
+        self.seed_sb.setValue(0)
+        self.seed_sb.setSpecialValueText("Aleatoria")
+        form.addRow("Semilla (0 = aleatoria):", self.seed_sb)
+        tooltip_seed = (
+            "Con una semilla fija la simulación es reproducible y su resultado se "
+            "guarda en caché: repetir el mismo escenario lo muestra al instante."
+        )
+        self.seed_sb.setToolTip(tooltip_seed)
+        self.seed_sb.setToolTipDuration(5000)
+        self.seed_sb.setMouseTracking(True)
+        label_seed = form.labelForField(self.seed_sb)
+        if label_seed:
+            label_seed.setToolTip(tooltip_seed)
+
+        # Modelo de fitness (registro de src.core.fitness_models)
+        self.fitness_model_cb = QComboBox()
+        for name, label in model_options():
+            self.fitness_model_cb.addItem(label, name)
+        self.fitness_model_cb.setCurrentIndex(self.fitness_model_cb.findData(DEFAULT_FITNESS_MODEL))
+        form.addRow("Modelo de fitness:", self.fitness_model_cb)
+        self.fitness_model_cb.setToolTip(
+            "Función que calcula la aptitud de cada bacteria a partir de su resistencia, "
+            "la supervivencia al antibiótico y sus atributos."
+        )
+
         grp.setLayout(form)
         self.main_layout.addWidget(grp)
 
@@ -189,12 +217,14 @@ class InputForm(QWidget):
             "pH": self.ph_sb.value(),
         }
         repro = self.repro_rate_sb.value()  # <-- NUEVO
-        return selected, unit, mut, death, time_horizon, environmental_factors, repro
+        seed = self.seed_sb.value()
+        fitness_model = self.fitness_model_cb.currentData()
+        return selected, unit, mut, death, time_horizon, environmental_factors, repro, seed, fitness_model
 
     def submit(self):
         params = self.collect_params()
         if params:
             logging.debug(
-            f"InputForm.collect_params -> genes={params[0]}, unit={params[1]}, mut_rate={params[2]}, death_rate={params[3]}, time_horizon={params[4]}, environmental_factors={params[5]}, reproduction_rate={params[6]}"
+            f"InputForm.collect_params -> genes={params[0]}, unit={params[1]}, mut_rate={params[2]}, death_rate={params[3]}, time_horizon={params[4]}, environmental_factors={params[5]}, reproduction_rate={params[6]}, seed={params[7]}, fitness_model={params[8]}"
         )
             self.params_submitted.emit(*params)
\ No newline at end of file
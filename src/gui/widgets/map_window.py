@@ -1,12 +1,9 @@
-from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QComboBox
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QCheckBox
 from PyQt5.QtCore import QPropertyAnimation, QEasingCurve, QObject, pyqtProperty, QPointF
 from PyQt5.QtGui import QColor, QBrush, QPen
 from PyQt5.QtCore import Qt
 import pyqtgraph as pg
 import numpy as np
-from scipy.spatial import Voronoi
-from scipy.interpolate import griddata
-from scipy.ndimage import gaussian_filter
 
 
 class FadeImageItem(pg.ImageItem):
@@ -31,27 +28,30 @@ class FadePolygonItem(pg.GraphicsObject):
     """
     Subclase para mostrar polígonos con cross‐fade, exponiendo la opacidad
     como propiedad animable y permitiendo actualizar datos con setData().
+    Con fill=False dibuja solo los contornos (capa de bordes del mapa).
+
+    El QPicture se genera sin opacidad y se guarda en caché: solo se reconstruye
+    (de forma diferida, en el siguiente paint) tras setData, setBorderStyle o
+    setHighlightFactor. La opacidad se aplica al pintar, así que los frames de
+    la animación de cross‐fade no vuelven a dibujar los polígonos.
     """
-    def __init__(self, polygons=None, colors=None, parent=None):
+    def __init__(self, polygons=None, colors=None, parent=None, fill=True):
         super().__init__(parent)
         self._opacity = 1.0
-        self.polygons = polygons or []
-        self.colors = colors or []
-        self._bounding_rect = pg.QtCore.QRectF()
+        self._fill = fill
         self._border_width = 1.0
         self._border_color = QColor(0, 0, 0, 180)
         self._highlight_factor = 0.2
-        self.generatePicture()
+        self.picture = None
+        self._bounding_rect = pg.QtCore.QRectF()
+        self.setData(polygons, colors)
 
     def getOpacity(self):
         return self._opacity
 
     def setOpacityProp(self, val):
-        # 1) Actualizar opacidad interna
+        # Solo cambia la opacidad de pintado; el QPicture en caché se reutiliza
         self._opacity = val
-        # 2) Volver a generar dibujo con la nueva opacidad
-        self.generatePicture()
-        # 3) Forzar repaint
         self.update()
 
     opacityProp = pyqtProperty(float, fget=getOpacity, fset=setOpacityProp)
@@ -61,34 +61,49 @@ class FadePolygonItem(pg.GraphicsObject):
         self._border_width = width
         if color:
             self._border_color = QColor(color)
-        self.generatePicture()
-        self.update()
+        self._invalidatePicture()
 
     def setHighlightFactor(self, factor):
         """Ajustar cuánto se resaltan los colores."""
         self._highlight_factor = factor
-        self.generatePicture()
-        self.update()
+        self._invalidatePicture()
 
     def setData(self, polygons, colors):
         """
-        Actualiza la lista de polígonos y colores, genera el picture y repinta.
+        Actualiza la lista de polígonos y colores y repinta.
         Así es posible llamar desde fuera: setData(polygons, colors).
         """
-        self.polygons = polygons or []
-        self.colors = colors or []
-        self.generatePicture()
+        self.polygons = polygons if polygons is not None else []
+        self.colors = colors if colors is not None else []
+
+        valid = [np.asarray(poly, dtype=float) for poly in self.polygons if len(poly) >= 3]
+        self.prepareGeometryChange()
+        if valid:
+            pts = np.concatenate(valid)
+            (min_x, min_y), (max_x, max_y) = pts.min(axis=0), pts.max(axis=0)
+            self._bounding_rect = pg.QtCore.QRectF(min_x, min_y, max_x - min_x, max_y - min_y)
+        else:
+            self._bounding_rect = pg.QtCore.QRectF()
+        self._invalidatePicture()
+
+    def _invalidatePicture(self):
+        self.picture = None
         self.update()
 
     def generatePicture(self):
-        """Construye internamente el QPicture con polígonos coloreados y opacidad."""
+        """Construye internamente el QPicture con polígonos coloreados (opacidad completa)."""
         self.picture = pg.QtGui.QPicture()
         painter = pg.QtGui.QPainter(self.picture)
 
-        min_x, min_y = float('inf'), float('inf')
-        max_x, max_y = -float('inf'), -float('inf')
+        if not self._fill:
+            pen = QPen(self._border_color, self._border_width)
+            pen.setCosmetic(True)  # Grosor en píxeles, independiente del zoom
+            painter.setBrush(Qt.NoBrush)
+            painter.setPen(pen)
 
-        for polygon, color in zip(self.polygons, self.colors):
+        shadow_brush = QBrush(QColor(0, 0, 0, 50))
+        colors = self.colors if self._fill else [None] * len(self.polygons)
+        for polygon, color in zip(self.polygons, colors):
             if len(polygon) < 3:
                 continue
 
@@ -96,12 +111,9 @@ class FadePolygonItem(pg.GraphicsObject):
             qpoints = [QPointF(x, y) for x, y in polygon]
             qpolygon = pg.QtGui.QPolygonF(qpoints)
 
-            # Actualizar bounding rect
-            for x, y in polygon:
-                min_x = min(min_x, x)
-                min_y = min(min_y, y)
-                max_x = max(max_x, x)
-                max_y = max(max_y, y)
+            if not self._fill:
+                painter.drawPolygon(qpolygon)
+                continue
 
             # Color base mejorado
             base_color = QColor(color)
@@ -111,17 +123,13 @@ class FadePolygonItem(pg.GraphicsObject):
             v = min(1.0, v + self._highlight_factor/2)
             highlighted_color = QColor.fromHsvF(h, s, v, a)
 
-            # Ajustar la opacidad del color resaltado
-            highlighted_color.setAlphaF(self._opacity * a)
-
-            # Borde más oscuro con opacidad
+            # Borde más oscuro
             border_color = QColor(base_color).darker(150)
-            border_color.setAlphaF(self._opacity * 0.8)
+            border_color.setAlphaF(0.8)
 
             # Dibujar sombra
             painter.setPen(Qt.NoPen)
-            shadow_color = QColor(0, 0, 0, int(50 * self._opacity))
-            painter.setBrush(QBrush(shadow_color))
+            painter.setBrush(shadow_brush)
             shadow_polygon = qpolygon.translated(2, 2)
             painter.drawPolygon(shadow_polygon)
 
@@ -132,12 +140,11 @@ class FadePolygonItem(pg.GraphicsObject):
 
         painter.end()
 
-        if min_x != float('inf'):
-            self._bounding_rect = pg.QtCore.QRectF(min_x, min_y, max_x - min_x, max_y - min_y)
-        else:
-            self._bounding_rect = pg.QtCore.QRectF()
-
     def paint(self, p, *args):
+        if self._opacity <= 0.0:
+            return
+        if self.picture is None:
+            self.generatePicture()
         # Pintar todo el QPicture con la opacidad global
         p.setOpacity(self._opacity)
         p.drawPicture(0, 0, self.picture)
@@ -148,8 +155,10 @@ class FadePolygonItem(pg.GraphicsObject):
 class MapWindow(QDialog):
     """
     Muestra un mapa de expansión bacteriana con:
-        1) Dos ImageItems (viejo/nuevo) para heatmap con cross‐fade.
-        2) Dos PolygonItems (viejo/nuevo) para regiones con cross‐fade.
+        1) Dos ImageItems (viejo/nuevo) para la densidad de las posiciones de los
+           individuos; solo se vuelve a subir (con cross‐fade) cuando cambia.
+        2) Dos ImageItems RGBA (viejo/nuevo) para regiones con cross‐fade, con una
+           capa opcional de bordes de celda.
         3) Barra de color a la derecha, vinculada al heatmap "nuevo".
         4) Animaciones suaves de 300 ms en cada actualización.
         5) Etiqueta superior con "Generación" y "Población real".
@@ -187,7 +196,15 @@ class MapWindow(QDialog):
         ])
         self.property_selector.setCurrentIndex(0)
         self.property_selector.currentIndexChanged.connect(self.update_map)
-        main_layout.addWidget(self.property_selector)
+
+        self.borders_checkbox = QCheckBox("Mostrar bordes de celdas", self)
+        self.borders_checkbox.setChecked(False)
+        self.borders_checkbox.toggled.connect(self._toggle_region_borders)
+
+        selector_layout = QHBoxLayout()
+        selector_layout.addWidget(self.property_selector, 1)
+        selector_layout.addWidget(self.borders_checkbox)
+        main_layout.addLayout(selector_layout)
 
         # 2) GraphicsLayoutWidget para PlotItem + ColorBarItem
         self.glw = pg.GraphicsLayoutWidget()
@@ -209,19 +226,17 @@ class MapWindow(QDialog):
         self.plot_item.addItem(self.heatmap_old)
         self.plot_item.addItem(self.heatmap_new)
 
-        self.region_old = FadePolygonItem()
-        self.region_old.setBorderStyle(width=1.5, color="#333333")  # Borde más oscuro
-        self.region_old.setHighlightFactor(0.25)  # Colores más vivos
-        self.region_old.setOpacityProp(0.0)
-
-        self.region_new = FadePolygonItem()
-        self.region_new.setBorderStyle(width=1.5, color="#333333")
-        self.region_new.setHighlightFactor(0.25)
-        self.region_new.setOpacityProp(0.0)
-
+        # 5) Regiones como imagen RGBA (vieja y nueva) y capa opcional de bordes
+        self.region_old = FadeImageItem(opacity=0.0)
+        self.region_new = FadeImageItem(opacity=0.0)
         self.plot_item.addItem(self.region_old)
         self.plot_item.addItem(self.region_new)
 
+        self.region_borders = FadePolygonItem(fill=False)
+        self.region_borders.setBorderStyle(width=1.0, color="#333333")
+        self.region_borders.setVisible(False)
+        self.plot_item.addItem(self.region_borders)
+
         # 6) Barra de color (ColorBarItem) a la derecha, vinculada al heatmap_new
         self.color_map = pg.colormap.get("viridis")
         self.bar = pg.ColorBarItem(
@@ -238,21 +253,50 @@ class MapWindow(QDialog):
         self.bar.axis.setStyle(tickFont=pg.QtGui.QFont("Arial", 8))
         self.glw.addItem(self.bar, row=0, col=1)
 
+        # LUT de 256 colores de las regiones, con el resaltado ya aplicado
+        self.region_lut = self._build_region_lut(highlight=0.25)
+
         self.margin = 10
 
         # Flag para saber si estamos en la primera llamada (no hay nada que fade‐out aún)
         self._primera = True
 
-        self.n_heat = 1000  # Cantidad de puntos para heatmap
-        self.n_regions = 100  # Cantidad de puntos para regiones
+        self.n_regions = 100  # Cantidad de sitios (celdas) de regiones
+        self.heat_bins = 50  # Celdas por lado del histograma de densidad
+        self.region_grid_size = 120  # Resolución (píxeles por lado) de la imagen de regiones
+        self.border_grid_size = 25  # Celdas por lado de la capa de bordes
+        self._last_region_key = None
+        self._borders_key = None
+
+        self._bind_simulation()
 
-        # Generar posiciones polares aleatorias con radio fijo para consistencia
-        self.heat_positions = self._generate_random_positions(self.n_heat, max_radius=50)
-        self.region_positions = self._generate_random_positions(self.n_regions, max_radius=50)
+        # Capa de calor: histograma de las posiciones reales, una vez por generación
+        self._heat_lut = self.color_map.getLookupTable()
+        self.heat_image = None
+        self._heat_key = None  # (generación, tamaño) de la población del histograma
+        self._heat_shown = None  # Imagen que muestra actualmente la capa de calor
+        self._site_of_individual = None  # Sitio más cercano de cada individuo
+        # Sitio más cercano de cada píxel por (límites, resolución)
+        self._pixel_sites_cache = {}
 
         # Mostrar el primer frame sin animación
         self.update_map(first_time=True)
     
+    def _bind_simulation(self):
+        """Deriva del simulador actual (self.ga) el tipo de mapa y sus límites."""
+        # Una LatticeSimulation entrega capas de grilla en lugar de individuos
+        self._lattice = hasattr(self.ga, "map_layers")
+        # Los individuos viven en el disco de radio spatial_radius del GA; los
+        # límites del mapa son fijos para que la vista no salte entre frames
+        radius = self.ga.spatial_radius
+        self.heat_bounds = (
+            -radius - self.margin, radius + self.margin,
+            -radius - self.margin, radius + self.margin,
+        )
+        # Sitios de las regiones repartidos uniformemente en el disco (espiral de Fermat)
+        self.region_positions = self._generate_site_positions(self.n_regions, radius)
+        self._site_tree = None  # cKDTree de los sitios, se crea al primer uso
+
     def _get_selected_attribute(self):
         idx = self.property_selector.currentIndex()
         attrs = ["recubrimiento", "reproduccion", "letalidad", "permeabilidad", "enzimas", "max_afectada"]
@@ -290,7 +334,8 @@ class MapWindow(QDialog):
         """
         if len(points) < 3:
             return [], []
-            
+        from scipy.spatial import Voronoi  # scipy se carga al primer uso
+
         # Calcular diagrama de Voronoi
         vor = Voronoi(points)
         
@@ -320,68 +365,147 @@ class MapWindow(QDialog):
             
         return polygons, colors
 
-    def _create_grid_regions(self, points, values, bounds, grid_size=20):
+    def _build_region_lut(self, highlight=0.25):
         """
-        Crea regiones basadas en interpolación en una grilla.
+        Tabla RGBA de 256 entradas del mapa de color con el resaltado de
+        saturación/brillo aplicado una sola vez (antes se hacía por polígono).
         """
-        if len(points) < 3:
-            return [], []
-            
-        # Crear grilla
-        xi = np.linspace(bounds[0], bounds[1], grid_size)
-        yi = np.linspace(bounds[2], bounds[3], grid_size)
-        xi, yi = np.meshgrid(xi, yi)
-        
-        # Interpolar valores
-        zi = griddata(points, values, (xi, yi), method='cubic')
-        
-        polygons = []
-        colors = []
-        
-        # Mapear valores a colores
-        min_val, max_val = np.nanmin(zi), np.nanmax(zi)
+        base = self.color_map.getLookupTable(0.0, 1.0, 256, alpha=True)
+        lut = np.empty((256, 4), dtype=np.ubyte)
+        for i, (r, g, b, a) in enumerate(base):
+            h, sat, v, alpha = QColor(int(r), int(g), int(b), int(a)).getHsvF()
+            color = QColor.fromHsvF(
+                max(h, 0.0), min(1.0, sat + highlight), min(1.0, v + highlight / 2), alpha
+            )
+            lut[i] = (color.red(), color.green(), color.blue(), color.alpha())
+        return lut
+
+    def _sites(self):
+        """cKDTree de los sitios de región (las posiciones son fijas por ventana)."""
+        if self._site_tree is None:
+            from scipy.spatial import cKDTree  # scipy se carga al primer uso
+
+            self._site_tree = cKDTree(self.region_positions)
+        return self._site_tree
+
+    def _pixel_sites(self, bounds, grid_size):
+        """
+        Sitio más cercano a cada centro de píxel de la imagen de regiones (-1
+        fuera del disco). Se calcula una sola vez por límites y resolución.
+        """
+        key = (tuple(float(b) for b in bounds), grid_size)
+        cached = self._pixel_sites_cache.get(key)
+        if cached is None:
+            xs = np.linspace(bounds[0], bounds[1], 2 * grid_size + 1)[1::2]
+            ys = np.linspace(bounds[2], bounds[3], 2 * grid_size + 1)[1::2]
+            xi, yi = np.meshgrid(xs, ys)
+            _, cached = self._sites().query(np.column_stack((xi.ravel(), yi.ravel())))
+            cached = cached.reshape(xi.shape)
+            cached[np.hypot(xi, yi) > self.ga.spatial_radius] = -1
+            self._pixel_sites_cache[key] = cached
+        return cached
+
+    def _site_means(self, values):
+        """
+        Media de values por sitio: cada individuo cuenta para el sitio más
+        cercano a su posición (_site_of_individual). Sin individuos → NaN.
+        """
+        n_sites = len(self.region_positions)
+        counts = np.bincount(self._site_of_individual, minlength=n_sites)
+        sums = np.bincount(self._site_of_individual, weights=values, minlength=n_sites)
+        means = np.full(n_sites, np.nan)
+        occupied = counts > 0
+        means[occupied] = sums[occupied] / counts[occupied]
+        return means
+
+    def _create_region_image(self, site_values, bounds, grid_size=120):
+        """
+        Pinta cada píxel con el valor de su sitio más cercano y devuelve una
+        imagen RGBA (x, y, 4) para un ImageItem; los píxeles fuera del disco o de
+        sitios sin individuos quedan transparentes. None si no hay datos.
+        """
+        valid_sites = ~np.isnan(site_values)
+        if not valid_sites.any():
+            return None
+
+        # Normalizar al rango del frame y mapear con la LUT precalculada
+        vals = site_values[valid_sites]
+        min_val, max_val = vals.min(), vals.max()
         val_range = max_val - min_val if max_val > min_val else 1.0
-        
-        # Crear polígonos para cada celda
-        for i in range(grid_size-1):
-            for j in range(grid_size-1):
-                if np.isnan(zi[i,j]) or np.isnan(zi[i+1,j]) or np.isnan(zi[i,j+1]) or np.isnan(zi[i+1,j+1]):
-                    continue
-                    
-                # Valor promedio de la celda
-                cell_val = np.mean([zi[i,j], zi[i+1,j], zi[i,j+1], zi[i+1,j+1]])
-                norm_val = (cell_val - min_val) / val_range
-                color = self.color_map.map(norm_val, mode='qcolor')
-                
-                # Crear polígono cuadrangular
-                polygon = [
-                    (xi[i,j], yi[i,j]),
-                    (xi[i+1,j], yi[i+1,j]),
-                    (xi[i+1,j+1], yi[i+1,j+1]),
-                    (xi[i,j+1], yi[i,j+1])
-                ]
-                
-                polygons.append(polygon)
-                colors.append(color)
-                
-        return polygons, colors
-    
-    def _generate_random_positions(self, n, max_radius=50):
-        import numpy as np
-        angs = np.random.uniform(0, 2*np.pi, n)
-        radios = np.random.uniform(0, max_radius, n)
-        xs = radios * np.cos(angs)
-        ys = radios * np.sin(angs)
-        return np.column_stack((xs, ys))
+        site_idx = np.zeros(len(site_values) + 1, dtype=np.intp)
+        site_idx[:-1][valid_sites] = np.clip(
+            (vals - min_val) / val_range * 255.0, 0, 255
+        ).astype(np.intp)
+        # Entrada extra (índice -1) para píxeles fuera del disco
+        site_ok = np.append(valid_sites, False)
+
+        pixel_sites = self._pixel_sites(bounds, grid_size)
+        rgba = self.region_lut[site_idx[pixel_sites]]
+        rgba[~site_ok[pixel_sites]] = 0
+
+        # Filas de la grilla = eje y; ImageItem espera image[x, y]
+        return np.ascontiguousarray(rgba.transpose(1, 0, 2))
+
+    def _region_border_polygons(self, bounds):
+        """Celdas de la grilla de bordes que caen completas dentro del disco."""
+        g = self.border_grid_size
+        xi, yi = np.meshgrid(
+            np.linspace(bounds[0], bounds[1], g + 1),
+            np.linspace(bounds[2], bounds[3], g + 1),
+        )
+        corners = np.stack([xi, yi], axis=-1)
+        inside = np.hypot(xi, yi) <= self.ga.spatial_radius
+        cells = np.stack(
+            [corners[:-1, :-1], corners[1:, :-1], corners[1:, 1:], corners[:-1, 1:]],
+            axis=2,
+        )
+        valid = inside[:-1, :-1] & inside[1:, :-1] & inside[1:, 1:] & inside[:-1, 1:]
+        return list(cells[valid])
+
+    def _update_region_borders(self):
+        """Regenera la capa de bordes solo si cambiaron los límites."""
+        if not self.borders_checkbox.isChecked() or self._last_region_key is None:
+            return
+        if self._borders_key != self._last_region_key:
+            self.region_borders.setData(self._region_border_polygons(self._last_region_key), None)
+            self._borders_key = self._last_region_key
+
+    def _toggle_region_borders(self, checked):
+        self.region_borders.setVisible(checked)
+        self._update_region_borders()
+
+    @staticmethod
+    def _generate_site_positions(n, max_radius=50):
+        """n puntos en espiral de Fermat: cubren el disco con densidad uniforme."""
+        k = np.arange(n) + 0.5
+        radios = max_radius * np.sqrt(k / n)
+        angs = k * np.pi * (3 - np.sqrt(5))
+        return np.column_stack((radios * np.cos(angs), radios * np.sin(angs)))
+
+    def _compute_heat_layer(self, positions):
+        """Histograma normalizado de las posiciones de la población dentro de heat_bounds."""
+        x_min, x_max, y_min, y_max = self.heat_bounds
+        H, _, _ = np.histogram2d(
+            positions[:, 0], positions[:, 1],
+            bins=self.heat_bins,
+            range=[[x_min, x_max], [y_min, y_max]]
+        )
+        # H está indexado [x, y], como espera ImageItem
+        return H / H.max() if H.max() > 0 else H
 
     def update_map(self, first_time=False, *args, **kwargs):
         """
         Actualiza el mapa mostrando regiones según la propiedad seleccionada
         en el dropdown (incluida la opción 'Propiedad más afectada').
 
-        Usa posiciones fijas para heatmap y regiones para evitar que cambien
-        al cambiar la propiedad.
+        La capa de calor es la densidad de las posiciones de los individuos y
+        cada región muestra la media del atributo de los individuos más cercanos
+        a su sitio; ambas se recalculan solo cuando cambia la población.
         """
+        if self._lattice:
+            self._update_lattice_map(first_time)
+            return
+
         # Índice de generación actual, ajustar si es negativo
         t_idx = self.ga.current_step - 1
         if t_idx < 0:
@@ -390,21 +514,26 @@ class MapWindow(QDialog):
         # Obtener población actual
         poblacion_real = self.ga.population_hist[t_idx] if len(self.ga.population_hist) > 0 else 0
 
+        # Posiciones de la población (arreglo N×2; el GA no arma individuos para esto)
+        positions = self.ga.positions
+
         # Si no hay individuos, limpiar y salir
-        if len(self.ga.pop) == 0:
+        if len(positions) == 0:
             self.info_label.setText(f"Generación: {self.ga.current_step}    Población: 0")
-            self.region_old.setData([], [])
-            self.region_new.setData([], [])
+            self.region_old.clear()
+            self.region_new.clear()
             self.heatmap_old.clear()
             self.heatmap_new.clear()
+            self._heat_shown = None
+            self._heat_key = None
             return
 
         # Extraer atributos biológicos de la población actual
-        rec_vals = np.array([ind.recubrimiento for ind in self.ga.pop])
-        rep_vals = np.array([ind.reproduccion  for ind in self.ga.pop])
-        let_vals = np.array([ind.letalidad    for ind in self.ga.pop])
-        per_vals = np.array([ind.permeabilidad for ind in self.ga.pop])
-        enz_vals = np.array([ind.enzimas      for ind in self.ga.pop])
+        rec_vals = self.ga.trait("recubrimiento")
+        rep_vals = self.ga.trait("reproduccion")
+        let_vals = self.ga.trait("letalidad")
+        per_vals = self.ga.trait("permeabilidad")
+        enz_vals = self.ga.trait("enzimas")
 
         # Obtener atributo seleccionado en el dropdown
         attr = self._get_selected_attribute()
@@ -431,45 +560,98 @@ class MapWindow(QDialog):
             f"Generación: {self.ga.current_step}    Población: {int(poblacion_real)}"
         )
 
-        # --- Usar posiciones fijas para heatmap ---
-        xs_heat = self.heat_positions[:, 0]
-        ys_heat = self.heat_positions[:, 1]
-
-        x_min, x_max = xs_heat.min() - self.margin, xs_heat.max() + self.margin
-        y_min, y_max = ys_heat.min() - self.margin, ys_heat.max() + self.margin
-
-        bins = 50
-        H, xedges, yedges = np.histogram2d(
-            xs_heat, ys_heat,
-            bins=bins,
-            range=[[x_min, x_max], [y_min, y_max]]
-        )
-        H = np.flipud(H.T)
-        H_norm = H / np.max(H) if H.max() > 0 else H
+        # --- Capa de calor: se recalcula una vez por generación ---
+        heat_key = (self.ga.current_step, len(positions))
+        if heat_key != self._heat_key:
+            self.heat_image = self._compute_heat_layer(positions)
+            _, self._site_of_individual = self._sites().query(positions)
+            self._heat_key = heat_key
 
-        self.heatmap_new.setImage(H_norm, levels=(0, 1))
+        x_min, x_max, y_min, y_max = self.heat_bounds
         width = x_max - x_min
         height = y_max - y_min
-        self.heatmap_new.setRect(x_min, y_min, width, height)
-        self.heatmap_new.setLookupTable(self.color_map.getLookupTable())
+        heat_changed = self._heat_shown is not self.heat_image
+        if heat_changed:
+            self.heatmap_new.setImage(self.heat_image, levels=(0, 1))
+            self.heatmap_new.setRect(x_min, y_min, width, height)
+            self.heatmap_new.setLookupTable(self._heat_lut)
+            self._heat_shown = self.heat_image
+
+        # --- Regiones: media del atributo por sitio más cercano ---
+        site_vals = self._site_means(attr_vals)
+
+        bounds = (x_min, x_max, y_min, y_max)
+        region_image = self._create_region_image(
+            site_vals,
+            bounds,
+            grid_size=self.region_grid_size
+        )
+        if region_image is None:
+            self.region_new.clear()
+        else:
+            self.region_new.setImage(region_image, autoLevels=False)
+            self.region_new.setRect(x_min, y_min, width, height)
 
-        # --- Usar posiciones fijas para regiones ---
-        n_regions = min(len(self.ga.pop), self.n_regions)
-        region_positions = self.region_positions[:n_regions]
+        self._last_region_key = bounds
+        self._update_region_borders()
 
-        # Atributos para las regiones (solo los primeros n_regions)
-        attr_reg = attr_vals[:n_regions]
+        self._present_frame(heat_changed, bounds, first_time)
 
-        bounds = [x_min, x_max, y_min, y_max]
-        polygons, colors = self._create_grid_regions(
-            region_positions,
-            attr_reg,
-            bounds,
-            grid_size=25
+    def _update_lattice_map(self, first_time=False):
+        """
+        Frame de una LatticeSimulation: la capa de calor es la densidad de cada
+        celda y las regiones, la media local del atributo seleccionado; las
+        celdas vacías quedan transparentes.
+        """
+        layers = self.ga.map_layers()
+        x_min, x_max, y_min, y_max = bounds = self.ga.extent
+        width = x_max - x_min
+        height = y_max - y_min
+        self.info_label.setText(
+            f"Generación: {self.ga.current_step}    Población: {int(self.ga.population_total or 0)}"
         )
 
-        self.region_new.setData(polygons, colors)
+        heat_key = (self.ga.current_step, self.ga.grid_size)
+        heat_changed = heat_key != self._heat_key
+        if heat_changed:
+            # Filas de la grilla = eje y; ImageItem espera image[x, y]
+            self.heat_image = np.ascontiguousarray(np.clip(layers["densidad"], 0.0, 1.0).T)
+            self.heatmap_new.setImage(self.heat_image, levels=(0, 1))
+            self.heatmap_new.setRect(x_min, y_min, width, height)
+            self.heatmap_new.setLookupTable(self._heat_lut)
+            self._heat_shown = self.heat_image
+            self._heat_key = heat_key
 
+        attr = self._get_selected_attribute()
+        if attr == "max_afectada":
+            values = np.min(
+                np.stack([layers[a] for a in ("recubrimiento", "reproduccion", "letalidad",
+                                              "permeabilidad", "enzimas")]),
+                axis=0,
+            )
+        else:
+            values = layers[attr]
+
+        valid = ~np.isnan(values)
+        if not valid.any():
+            self.region_new.clear()
+        else:
+            min_val, max_val = values[valid].min(), values[valid].max()
+            val_range = max_val - min_val if max_val > min_val else 1.0
+            idx = np.zeros(values.shape, dtype=np.intp)
+            idx[valid] = np.clip((values[valid] - min_val) / val_range * 255.0, 0, 255).astype(np.intp)
+            rgba = self.region_lut[idx]
+            rgba[~valid] = 0
+            self.region_new.setImage(np.ascontiguousarray(rgba.transpose(1, 0, 2)), autoLevels=False)
+            self.region_new.setRect(x_min, y_min, width, height)
+
+        self._last_region_key = bounds
+        self._update_region_borders()
+        self._present_frame(heat_changed, bounds, first_time)
+
+    def _present_frame(self, heat_changed, bounds, first_time=False):
+        """Muestra el frame recién cargado: directo la primera vez, con cross‐fade después."""
+        x_min, x_max, y_min, y_max = bounds
         # Mostrar sin animación si es la primera vez
         if first_time or getattr(self, "_primera", False):
             self.heatmap_new.setOpacityProp(0.5)
@@ -482,16 +664,17 @@ class MapWindow(QDialog):
             self.plot_item.setYRange(y_min - extra, y_max + extra, padding=0)
             return
 
-        # Animar transición cross-fade entre mapas y regiones
-        old_heat_op = self.heatmap_old.getOpacity()
-        old_region_op = self.region_old.getOpacity()
+        # Animar transición cross-fade de las regiones (y del calor si cambió)
         duration = 300
+        if heat_changed:
+            old_heat_op = self.heatmap_old.getOpacity()
+            self._crossfade(self.heatmap_old, self.heatmap_new, old_heat_op, 0.6, duration)
+            self.heatmap_old, self.heatmap_new = self.heatmap_new, self.heatmap_old
 
-        self._crossfade(self.heatmap_old, self.heatmap_new, old_heat_op, 0.6, duration)
+        old_region_op = self.region_old.getOpacity()
         self._crossfade(self.region_old, self.region_new, old_region_op, 0.7, duration)
 
         # Intercambiar referencias para próximos updates
-        self.heatmap_old, self.heatmap_new = self.heatmap_new, self.heatmap_old
         self.region_old, self.region_new = self.region_new, self.region_old
 
         extra = self.margin
@@ -499,10 +682,12 @@ class MapWindow(QDialog):
         self.plot_item.setYRange(y_min - extra, y_max + extra, padding=0)
 
 
+
     def reset(self):
         """
-        Limpia cualquier contenido previo de heatmaps/regiones,
-        vuelve a poner _primera=True y redibuja el frame inicial.
+        Limpia cualquier contenido previo de heatmaps/regiones, vuelve a
+        derivar tipo de mapa y límites del simulador actual, pone
+        _primera=True y redibuja el frame inicial.
         """
         # 1) Marcar que vamos a volver a pintar como si fuese la primera vez
         self._primera = True
@@ -510,7 +695,16 @@ class MapWindow(QDialog):
         # 2) Borrar datos antiguos de heatmap y regiones
         self.heatmap_old.clear()
         self.heatmap_new.clear()
-        self.region_old.setData([], [])
-        self.region_new.setData([], [])
+        self.region_old.clear()
+        self.region_new.clear()
+
+        # 3) Invalidar la capa de calor; se recalcula en el próximo frame
+        self.heat_image = None
+        self._heat_key = None
+        self._heat_shown = None
+        self._site_of_individual = None
+
+        # 4) El simulador puede haber cambiado (otro radio, GA ↔ grilla)
+        self._bind_simulation()
 
         self.update_map(first_time=True)
\ No newline at end of file
@@ -17,10 +17,12 @@ from PyQt5.QtWidgets import (
     QDialog,
     QSpinBox,
     QTableWidgetItem,
+    QCheckBox,
 )
 from PyQt5.QtCore import QTimer, Qt, pyqtSignal, QLocale
 import pyqtgraph as pg
 import numpy as np
+from src.data.reference_cache import get_reference_data
 
 def value_to_color_hex(value, thresholds, colors):
     """
@@ -36,19 +38,6 @@ def value_to_color_hex(value, thresholds, colors):
     return f"#{r:02x}{g:02x}{b:02x}"
 
 
-ANTIBIOTICS_LIST = [
-    {"id": 1, "nombre": "Meropenem", "conc_min": 0.03, "conc_max": 64.0},
-    {"id": 2, "nombre": "Ciprofloxacino", "conc_min": 0.25, "conc_max": 256.0},
-    {"id": 3, "nombre": "Colistina", "conc_min": 0.06, "conc_max": 512.0},
-    {"id": 4, "nombre": "Amikacina", "conc_min": 0.5, "conc_max": 512.0},
-    {"id": 5, "nombre": "Piperacilina/Tazobactam", "conc_min": 0.5, "conc_max": 1024.0},
-    {"id": 6, "nombre": "Ceftazidima", "conc_min": 0.25, "conc_max": 1024.0},
-    {"id": 7, "nombre": "Gentamicina", "conc_min": 0.5, "conc_max": 512.0},
-    {"id": 8, "nombre": "Tobramicina", "conc_min": 0.25, "conc_max": 1024.0},
-    {"id": 9, "nombre": "Imipenem", "conc_min": 0.12, "conc_max": 128.0},
-    {"id": 10, "nombre": "Cefepime", "conc_min": 1.0, "conc_max": 32.0},
-]
-
 class ResultsView(QWidget):
     simulate_requested = pyqtSignal(list)
 
@@ -92,7 +81,9 @@ class ResultsView(QWidget):
 
     def __init__(self, antibiotics=None, parent=None):
         super().__init__(parent)
-        self.antibiotics = antibiotics if antibiotics is not None else ANTIBIOTICS_LIST
+        self.antibiotics = (
+            antibiotics if antibiotics is not None else get_reference_data().antibiotic_options()
+        )
         self._event_items = []
         self._schedule_events = []
 
@@ -125,6 +116,59 @@ class ResultsView(QWidget):
         btn_hbox.addWidget(btn_add)
         btn_hbox.addWidget(btn_del)
         btn_hbox.addStretch()
+
+        # Modelo de simulación: individuos del GA o colonia sobre una grilla 2-D
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItem("Algoritmo genético", "ga")
+        self.mode_combo.addItem("Grilla espacial", "lattice")
+        self.mode_combo.setToolTip(
+            "La grilla simula densidades por celda en lugar de individuos"
+        )
+        btn_hbox.addWidget(self.mode_combo)
+
+        # Terapia combinada: los antibióticos se suman en lugar de reemplazarse
+        self.combination_checkbox = QCheckBox("Terapia combinada")
+        self.combination_checkbox.setToolTip(
+            "Mantiene activos todos los antibióticos del cronograma a la vez"
+        )
+        self.interaction_combo = QComboBox()
+        self.interaction_combo.addItem("Independencia de Bliss", "bliss")
+        self.interaction_combo.addItem("Aditividad de Loewe", "loewe")
+        self.interaction_combo.setEnabled(False)
+        self.combination_checkbox.toggled.connect(self.interaction_combo.setEnabled)
+        btn_hbox.addWidget(self.combination_checkbox)
+        btn_hbox.addWidget(self.interaction_combo)
+
+        self.epistasis_checkbox = QCheckBox("Epistasis")
+        self.epistasis_checkbox.setToolTip(
+            "Suma las interacciones entre pares de genes (sinergias y redundancias)"
+        )
+        btn_hbox.addWidget(self.epistasis_checkbox)
+
+        self.fast_forward_checkbox = QCheckBox("Avance rápido")
+        self.fast_forward_checkbox.setToolTip(
+            "En estado estacionario avanza analíticamente hasta el próximo evento del cronograma"
+        )
+        btn_hbox.addWidget(self.fast_forward_checkbox)
+
+        # Farmacocinética opcional: sin ella cada evento fija una concentración constante
+        self.pk_checkbox = QCheckBox("Farmacocinética")
+        self.pk_checkbox.setToolTip(
+            "Cada dosis decae con la vida media del antibiótico y se repite según su intervalo"
+        )
+        self.pk_hours_spin = QDoubleSpinBox()
+        self.pk_hours_spin.setRange(0.1, 24.0)
+        self.pk_hours_spin.setSingleStep(0.5)
+        self.pk_hours_spin.setValue(1.0)
+        self.pk_hours_spin.setSuffix(" h/gen")
+        self.pk_hours_spin.setToolTip("Horas reales que representa cada generación")
+        self.pk_hours_spin.setEnabled(False)
+        self.pk_checkbox.toggled.connect(self.pk_hours_spin.setEnabled)
+        btn_hbox.addWidget(self.pk_checkbox)
+        btn_hbox.addWidget(self.pk_hours_spin)
+
+        # Terapia combinada, epistasis y avance rápido solo existen en el GA
+        self.mode_combo.currentIndexChanged.connect(self._on_mode_changed)
         schedule_layout.addLayout(btn_hbox)
 
         main_layout.addWidget(grp_schedule)
@@ -636,6 +680,31 @@ class ResultsView(QWidget):
             self.schedule_table.removeRow(row)
         # El estado del botón se actualiza automáticamente por la señal rowsRemoved
 
+    def _on_mode_changed(self):
+        is_ga = self.simulation_mode() == "ga"
+        for checkbox in (self.combination_checkbox, self.epistasis_checkbox, self.fast_forward_checkbox):
+            checkbox.setEnabled(is_ga)
+            if not is_ga:
+                checkbox.setChecked(False)
+
+    def simulation_mode(self):
+        """"ga" (algoritmo genético) o "lattice" (grilla espacial)."""
+        return self.mode_combo.currentData()
+
+    def combination_options(self):
+        """(terapia combinada activa, modelo de interacción) elegidos en la vista."""
+        return self.combination_checkbox.isChecked(), self.interaction_combo.currentData()
+
+    def epistasis_enabled(self):
+        return self.epistasis_checkbox.isChecked()
+
+    def fast_forward_enabled(self):
+        return self.fast_forward_checkbox.isChecked()
+
+    def hours_per_generation(self):
+        """Horas por generación si la farmacocinética está activa; None si no."""
+        return self.pk_hours_spin.value() if self.pk_checkbox.isChecked() else None
+
     def _emit_simulation(self):
         sched = []
         for r in range(self.schedule_table.rowCount()):
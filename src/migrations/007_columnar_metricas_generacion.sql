@@ -0,0 +1,63 @@
+BEGIN TRANSACTION;
+
+-- Serie temporal por simulación: una fila por generación con columnas tipadas
+CREATE TABLE IF NOT EXISTS metricas_generacion_serie (
+    simulacion_id INTEGER NOT NULL REFERENCES simulaciones(id),
+    generacion INTEGER NOT NULL,
+    avg_fitness REAL,
+    best_fitness REAL,
+    diversidad_genetica REAL,
+    tasa_mutacion REAL,
+    tasa_convergencia REAL,
+    cpu_time_sec REAL,
+    ram_mb REAL,
+    PRIMARY KEY (simulacion_id, generacion)
+) WITHOUT ROWID;
+
+-- Migrar las métricas existentes del formato largo (una fila por indicador)
+INSERT OR REPLACE INTO metricas_generacion_serie (
+    simulacion_id, generacion, avg_fitness, best_fitness, diversidad_genetica,
+    tasa_mutacion, tasa_convergencia, cpu_time_sec, ram_mb
+)
+SELECT
+    simulacion_id,
+    generacion,
+    MAX(CASE WHEN nombre_indicador = 'avg_fitness' THEN valor END),
+    MAX(CASE WHEN nombre_indicador = 'best_fitness' THEN valor END),
+    MAX(CASE WHEN nombre_indicador = 'diversidad_genetica' THEN valor END),
+    MAX(CASE WHEN nombre_indicador = 'tasa_mutacion' THEN valor END),
+    MAX(CASE WHEN nombre_indicador = 'tasa_convergencia' THEN valor END),
+    MAX(CASE WHEN nombre_indicador = 'cpu_time_sec' THEN valor END),
+    MAX(CASE WHEN nombre_indicador = 'ram_mb' THEN valor END)
+FROM metricas_generacion
+GROUP BY simulacion_id, generacion;
+
+DROP INDEX IF EXISTS idx_metricas_generacion_sim;
+DROP INDEX IF EXISTS idx_metricas_generacion_gen;
+DROP INDEX IF EXISTS idx_metricas_generacion_indicador;
+DROP TABLE IF EXISTS metricas_generacion;
+
+-- Vista de compatibilidad con el formato largo anterior
+CREATE VIEW IF NOT EXISTS metricas_generacion AS
+SELECT simulacion_id, generacion, 'avg_fitness' AS nombre_indicador, avg_fitness AS valor
+FROM metricas_generacion_serie WHERE avg_fitness IS NOT NULL
+UNION ALL
+SELECT simulacion_id, generacion, 'best_fitness', best_fitness
+FROM metricas_generacion_serie WHERE best_fitness IS NOT NULL
+UNION ALL
+SELECT simulacion_id, generacion, 'diversidad_genetica', diversidad_genetica
+FROM metricas_generacion_serie WHERE diversidad_genetica IS NOT NULL
+UNION ALL
+SELECT simulacion_id, generacion, 'tasa_mutacion', tasa_mutacion
+FROM metricas_generacion_serie WHERE tasa_mutacion IS NOT NULL
+UNION ALL
+SELECT simulacion_id, generacion, 'tasa_convergencia', tasa_convergencia
+FROM metricas_generacion_serie WHERE tasa_convergencia IS NOT NULL
+UNION ALL
+SELECT simulacion_id, generacion, 'cpu_time_sec', cpu_time_sec
+FROM metricas_generacion_serie WHERE cpu_time_sec IS NOT NULL
+UNION ALL
+SELECT simulacion_id, generacion, 'ram_mb', ram_mb
+FROM metricas_generacion_serie WHERE ram_mb IS NOT NULL;
+
+COMMIT;
@@ -0,0 +1,33 @@
+BEGIN TRANSACTION;
+
+-- Tiempo real (wall clock) por generación, medido durante la simulación
+ALTER TABLE metricas_generacion_serie ADD COLUMN wall_time_sec REAL;
+
+-- Recrear la vista de compatibilidad incluyendo el nuevo indicador
+DROP VIEW IF EXISTS metricas_generacion;
+CREATE VIEW metricas_generacion AS
+SELECT simulacion_id, generacion, 'avg_fitness' AS nombre_indicador, avg_fitness AS valor
+FROM metricas_generacion_serie WHERE avg_fitness IS NOT NULL
+UNION ALL
+SELECT simulacion_id, generacion, 'best_fitness', best_fitness
+FROM metricas_generacion_serie WHERE best_fitness IS NOT NULL
+UNION ALL
+SELECT simulacion_id, generacion, 'diversidad_genetica', diversidad_genetica
+FROM metricas_generacion_serie WHERE diversidad_genetica IS NOT NULL
+UNION ALL
+SELECT simulacion_id, generacion, 'tasa_mutacion', tasa_mutacion
+FROM metricas_generacion_serie WHERE tasa_mutacion IS NOT NULL
+UNION ALL
+SELECT simulacion_id, generacion, 'tasa_convergencia', tasa_convergencia
+FROM metricas_generacion_serie WHERE tasa_convergencia IS NOT NULL
+UNION ALL
+SELECT simulacion_id, generacion, 'cpu_time_sec', cpu_time_sec
+FROM metricas_generacion_serie WHERE cpu_time_sec IS NOT NULL
+UNION ALL
+SELECT simulacion_id, generacion, 'ram_mb', ram_mb
+FROM metricas_generacion_serie WHERE ram_mb IS NOT NULL
+UNION ALL
+SELECT simulacion_id, generacion, 'wall_time_sec', wall_time_sec
+FROM metricas_generacion_serie WHERE wall_time_sec IS NOT NULL;
+
+COMMIT;
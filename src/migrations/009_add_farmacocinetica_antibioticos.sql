@@ -0,0 +1,18 @@
+BEGIN TRANSACTION;
+
+-- Parámetros farmacocinéticos por antibiótico (régimen estándar en adultos)
+ALTER TABLE antibioticos ADD COLUMN vida_media_horas REAL;
+ALTER TABLE antibioticos ADD COLUMN intervalo_dosis_horas REAL;
+
+UPDATE antibioticos SET vida_media_horas = 1.0, intervalo_dosis_horas = 8.0 WHERE nombre = 'Meropenem';
+UPDATE antibioticos SET vida_media_horas = 4.0, intervalo_dosis_horas = 12.0 WHERE nombre = 'Ciprofloxacino';
+UPDATE antibioticos SET vida_media_horas = 5.0, intervalo_dosis_horas = 12.0 WHERE nombre = 'Colistina';
+UPDATE antibioticos SET vida_media_horas = 2.5, intervalo_dosis_horas = 24.0 WHERE nombre = 'Amikacina';
+UPDATE antibioticos SET vida_media_horas = 1.0, intervalo_dosis_horas = 6.0 WHERE nombre = 'Piperacilina/Tazobactam';
+UPDATE antibioticos SET vida_media_horas = 2.0, intervalo_dosis_horas = 8.0 WHERE nombre = 'Ceftazidima';
+UPDATE antibioticos SET vida_media_horas = 2.5, intervalo_dosis_horas = 24.0 WHERE nombre = 'Gentamicina';
+UPDATE antibioticos SET vida_media_horas = 2.5, intervalo_dosis_horas = 24.0 WHERE nombre = 'Tobramicina';
+UPDATE antibioticos SET vida_media_horas = 1.0, intervalo_dosis_horas = 6.0 WHERE nombre = 'Imipenem';
+UPDATE antibioticos SET vida_media_horas = 2.0, intervalo_dosis_horas = 8.0 WHERE nombre = 'Cefepime';
+
+COMMIT;
@@ -0,0 +1,36 @@
+BEGIN TRANSACTION;
+
+-- Especificidad de cada gen frente a cada antibiótico (terapia combinada).
+-- Multiplica peso_resistencia del gen al calcular la resistencia a ese fármaco;
+-- los pares sin fila se consideran con especificidad 1.0.
+CREATE TABLE IF NOT EXISTS gen_antibiotico (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    gen_id INTEGER NOT NULL REFERENCES genes(id),
+    antibiotico_id INTEGER NOT NULL REFERENCES antibioticos(id),
+    peso_especificidad REAL NOT NULL DEFAULT 1.0,
+    UNIQUE (gen_id, antibiotico_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_gen_antibiotico_ab ON gen_antibiotico(antibiotico_id);
+
+-- Valores iniciales según el mecanismo de cada gen y la familia del antibiótico
+INSERT OR IGNORE INTO gen_antibiotico (gen_id, antibiotico_id, peso_especificidad)
+SELECT g.id, a.id,
+    CASE
+        WHEN g.nombre IN ('blaVIM', 'ndm1', 'kpc')
+             AND a.tipo IN ('Carbapenémico', 'Cefalosporina', 'Penicilina') THEN 1.0
+        WHEN g.nombre = 'oxa48' AND a.tipo IN ('Carbapenémico', 'Penicilina') THEN 1.0
+        WHEN g.nombre = 'oxa48' AND a.tipo = 'Cefalosporina' THEN 0.5
+        WHEN g.nombre = 'mexAB-oprM'
+             AND a.tipo IN ('Carbapenémico', 'Cefalosporina', 'Penicilina', 'Fluoroquinolona') THEN 0.6
+        WHEN g.nombre IN ('armA', 'aac6') AND a.tipo = 'Aminoglucósido' THEN 1.0
+        WHEN g.nombre = 'aac6' AND a.tipo = 'Fluoroquinolona' THEN 0.5
+        WHEN g.nombre = 'mcr1' AND a.tipo = 'Polimixina' THEN 1.0
+        ELSE 0.0
+    END
+FROM genes g CROSS JOIN antibioticos a
+WHERE g.nombre IN (
+    'blaVIM', 'mexAB-oprM', 'ndm1', 'oxa48', 'armA', 'kpc', 'mcr1', 'aac6', 'vanA', 'ermB'
+);
+
+COMMIT;
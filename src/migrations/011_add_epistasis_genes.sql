@@ -0,0 +1,33 @@
+BEGIN TRANSACTION;
+
+-- Interacciones epistáticas entre pares de genes. Cada fila suma
+-- peso_epistasis a la resistencia bruta de los individuos que portan ambos
+-- genes (positivo: sinergia, negativo: redundancia). Se guarda cada par una
+-- sola vez, con gen_a_id < gen_b_id.
+CREATE TABLE IF NOT EXISTS epistasis_genes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    gen_a_id INTEGER NOT NULL REFERENCES genes(id),
+    gen_b_id INTEGER NOT NULL REFERENCES genes(id),
+    peso_epistasis REAL NOT NULL DEFAULT 0.0,
+    CHECK (gen_a_id < gen_b_id),
+    UNIQUE (gen_a_id, gen_b_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_epistasis_gen_b ON epistasis_genes(gen_b_id);
+
+-- Valores iniciales: bomba de eflujo + carbapenemasa débil (sinergia) y
+-- enzimas redundantes sobre el mismo blanco (rendimiento decreciente)
+INSERT OR IGNORE INTO epistasis_genes (gen_a_id, gen_b_id, peso_epistasis)
+SELECT MIN(a.id, b.id), MAX(a.id, b.id), p.peso
+FROM (
+    SELECT 'mexAB-oprM' AS gen_a, 'oxa48' AS gen_b, 0.15 AS peso
+    UNION ALL SELECT 'mexAB-oprM', 'kpc', 0.10
+    UNION ALL SELECT 'mexAB-oprM', 'blaVIM', 0.05
+    UNION ALL SELECT 'blaVIM', 'ndm1', -0.10
+    UNION ALL SELECT 'kpc', 'ndm1', -0.08
+    UNION ALL SELECT 'armA', 'aac6', -0.05
+) AS p
+JOIN genes a ON a.nombre = p.gen_a
+JOIN genes b ON b.nombre = p.gen_b;
+
+COMMIT;
@@ -0,0 +1,10 @@
+BEGIN TRANSACTION;
+
+-- Avance rápido en estado estacionario: generaciones calculadas en forma
+-- analítica en lugar de simularse. El reporte guarda el total y los
+-- intervalos [inicio, fin) de pasos como JSON; la serie marca cada generación.
+ALTER TABLE reportes_simulacion ADD COLUMN generaciones_avanzadas INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE reportes_simulacion ADD COLUMN intervalos_avanzados TEXT;
+ALTER TABLE metricas_generacion_serie ADD COLUMN avance_rapido INTEGER NOT NULL DEFAULT 0;
+
+COMMIT;
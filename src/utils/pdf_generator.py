@@ -1,17 +1,5 @@
 import re
 from datetime import datetime
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import (
-    SimpleDocTemplate,
-    Paragraph,
-    Spacer,
-    Table,
-    TableStyle,
-    Image,
-)
-from reportlab.lib.units import inch
 
 def clean_html(html_text):
     """
@@ -33,6 +21,20 @@ def generate_pdf(path, summary_html, table_data, chart_image_path):
         table_data (list of lists): Datos para la tabla de resultados.
         chart_image_path (str): Ruta a la imagen del gráfico.
     """
+    # reportlab se importa al exportar, no al abrir la aplicación
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import (
+        SimpleDocTemplate,
+        Paragraph,
+        Spacer,
+        Table,
+        TableStyle,
+        Image,
+    )
+    from reportlab.lib.units import inch
+
     doc = SimpleDocTemplate(path, pagesize=A4, topMargin=1*inch, bottomMargin=1*inch, leftMargin=0.75*inch, rightMargin=0.75*inch)
     styles = getSampleStyleSheet()
     elements = []
@@ -3,6 +3,7 @@ import pytest
 from src.data.database import get_session
 from src.data.database import engine, Base
 from src.data.models import Gen, Antibiotico
+from src.data.reference_cache import invalidate_reference_data
 
 @pytest.fixture(scope="session", autouse=True)
 def set_sqlite_memory():
@@ -39,4 +40,27 @@ def populate_basic_data():
     )
     session.add_all(genes + [ab])
     session.commit()
-    session.close()
\ No newline at end of file
+    session.close()
+    # Los datos de referencia cambiaron: descartar la caché en memoria
+    invalidate_reference_data()
+
+@pytest.fixture
+def gene_panel():
+    """Fábrica de paneles de genes para el GA: un peso por gen, ids desde 1."""
+    def build(*weights):
+        return [
+            {"id": i, "nombre": str(i), "peso_resistencia": w}
+            for i, w in enumerate(weights, start=1)
+        ]
+    return build
+
+@pytest.fixture
+def individual():
+    """Fábrica de individuos sin posición; los atributos valen 0.5 salvo que se indiquen."""
+    from src.core.genetic_algorithm import creator
+    from src.core.population import TRAITS
+
+    def build(bits, **traits):
+        values = {name: traits.get(name, 0.5) for name in TRAITS}
+        return creator.Individual(list(bits), *(values[name] for name in TRAITS))
+    return build
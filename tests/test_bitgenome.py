@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from src.core import bitgenome
+from src.core.genetic_algorithm import GeneticAlgorithm
+
+@pytest.mark.parametrize("n_genes", [3, 64, 65, 300])
+def test_packed_operations_match_the_unpacked_matrix(n_genes):
+    rng = np.random.default_rng(n_genes)
+    genomes = rng.integers(0, 2, (200, n_genes)).astype(np.uint8)
+    words = bitgenome.pack(genomes)
+
+    assert words.shape == (200, bitgenome.n_words(n_genes))
+    np.testing.assert_array_equal(bitgenome.unpack(words, n_genes), genomes)
+    np.testing.assert_array_equal(bitgenome.gene_counts(words), genomes.sum(axis=1))
+    np.testing.assert_array_equal(bitgenome.allele_counts(words, n_genes), genomes.sum(axis=0))
+
+    weights = rng.random(n_genes)
+    np.testing.assert_allclose(
+        bitgenome.score(words, bitgenome.byte_tables(weights)), genomes @ weights
+    )
+
+def test_crossover_swaps_one_contiguous_segment():
+    rng = np.random.default_rng(1)
+    n_genes = 150
+    a = bitgenome.pack(np.zeros((500, n_genes), dtype=np.uint8))
+    b = bitgenome.pack(np.ones((500, n_genes), dtype=np.uint8))
+    c1, c2 = bitgenome.cx_two_point(a, b, n_genes, rng)
+    bits1, bits2 = bitgenome.unpack(c1, n_genes), bitgenome.unpack(c2, n_genes)
+
+    np.testing.assert_array_equal(bits1 ^ bits2, 1)  # complementarios
+    # Cada hijo de a tiene un único tramo de unos que no toca el primer gen
+    steps = np.abs(np.diff(bits1.astype(int), axis=1)).sum(axis=1)
+    assert (steps <= 2).all() and (bits1[:, 0] == 0).all()
+
+def test_mutation_flips_the_reported_number_of_bits():
+    rng = np.random.default_rng(2)
+    genomes = rng.integers(0, 2, (1000, 200)).astype(np.uint8)
+    words = bitgenome.pack(genomes)
+    flipped = bitgenome.mutate(words, 0.01, 200, rng)
+
+    assert (bitgenome.unpack(words, 200) != genomes).sum() == flipped
+    assert flipped == pytest.approx(1000 * 200 * 0.01, rel=0.1)
+
+def test_large_gene_panels_are_scored_on_packed_genomes():
+    genes = [{"id": i, "nombre": str(i), "peso_resistencia": 1.0 / (1 + i % 7)} for i in range(200)]
+    ga = GeneticAlgorithm(genes=genes, pop_size=40, seed=4)
+    ga.initialize([])
+    assert ga._gene_tables is not None
+
+    fitness = ga.evaluate_population(ga.pop)
+    genomes = np.array([list(ind) for ind in ga.pop], dtype=float)
+    rec = np.array([ind.recubrimiento for ind in ga.pop])
+    enz = np.array([ind.enzimas for ind in ga.pop])
+    expected = (genomes @ ga._gene_weights) / ga.total_weight * (1 - (rec + enz) / 2)
+    expected *= 1 - ga.death_rate * ga.death_modifier()
+    np.testing.assert_allclose(fitness, np.maximum(expected, 0.0))
+
+def test_large_panels_cross_and_mutate_packed_words(mocker):
+    genes = [{"id": i, "nombre": str(i), "peso_resistencia": 0.5} for i in range(150)]
+    ga = GeneticAlgorithm(genes=genes, pop_size=60, mutation_rate=0.01, seed=5)
+    ga.initialize([])
+    mate = mocker.patch.object(ga.toolbox, "mate")
+    clone = mocker.patch.object(ga.toolbox, "clone")
+    cx = mocker.spy(bitgenome, "cx_two_point")
+    flips = mocker.spy(bitgenome, "mutate")
+
+    for _ in range(3):
+        ga.step()
+
+    assert not mate.called and not clone.called  # ni cxTwoPoint de DEAP ni deepcopy
+    assert cx.call_count == flips.call_count == 3
+    assert sum(r for r in flips.spy_return_list) > 0
+    np.testing.assert_array_equal(bitgenome.unpack(ga._words, 150), [list(ind) for ind in ga.pop])
+    np.testing.assert_allclose(ga.evaluate_population(ga.pop), [ind.fitness.values[0] for ind in ga.pop])
+
+def test_large_panels_keep_the_population_packed_until_an_edge_asks(mocker):
+    """Los pasos trabajan sobre los arreglos; los individuos se arman solo al pedir pop."""
+    genes = [{"id": i, "nombre": str(i), "peso_resistencia": 0.5} for i in range(150)]
+    ga = GeneticAlgorithm(genes=genes, pop_size=60, hgt_rate=0.3, evo_rescue_threshold=10.0,
+                          evo_rescue_prob=0.5, seed=2)
+    ga.initialize([])
+    select = mocker.patch.object(ga.toolbox, "select")
+    materialize = mocker.spy(ga, "_materialize")
+
+    for _ in range(4):
+        ga.step()
+
+    assert not select.called and not materialize.called
+    assert ga._words.shape == (60, bitgenome.n_words(150))
+    assert len(ga.positions) == len(ga.trait("enzimas")) == 60
+
+    pop = ga.pop
+    assert ga.pop is pop and materialize.call_count == 1  # una vez por generación
+    np.testing.assert_allclose(ga.evaluate_population(pop), ga._fitness)
+    ga.step()
+    assert ga.pop is not pop
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from src.core.drug_interactions import combined_survival, sigmoid_params, survival_matrix
+from src.core.genetic_algorithm import GeneticAlgorithm
+
+AB_X = {"id": 10, "nombre": "X", "concentracion_minima": 1.0, "concentracion_maxima": 3.0}
+AB_Y = {"id": 20, "nombre": "Y", "concentracion_minima": 2.0, "concentracion_maxima": 10.0}
+
+@pytest.fixture
+def genes(gene_panel):
+    return gene_panel(0.6, 0.4, 0.2)
+
+def test_interaction_models():
+    conc = np.array([[2.0, 1.0, 0.0], [0.0, 3.0, 6.0]])
+    lo, hi = [1.0, 2.0], [3.0, 10.0]
+    single = survival_matrix(conc, *sigmoid_params(lo, hi))
+
+    np.testing.assert_allclose(combined_survival("bliss", conc, lo, hi), single.prod(axis=0))
+    loewe = combined_survival("loewe", conc, lo, hi)
+    # Con un solo fármaco presente, Loewe es su propia curva
+    assert loewe[0] == pytest.approx(single[0, 0])
+    assert loewe[2] == pytest.approx(single[1, 2])
+    # Mitad de c50 de cada fármaco equivale a un c50 completo
+    assert loewe[1] == pytest.approx(0.5)
+    # Un fármaco combinado consigo mismo equivale a sumar las dosis
+    sham = combined_survival("loewe", np.array([[0.7], [1.3]]), [1.0, 1.0], [3.0, 3.0])
+    assert sham[0] == pytest.approx(combined_survival("loewe", np.array([[2.0]]), [1.0], [3.0])[0])
+
+    with pytest.raises(ValueError):
+        combined_survival("desconocido", conc, lo, hi)
+
+def test_vectorized_evaluation_matches_single_individual(genes):
+    ga = GeneticAlgorithm(genes=genes, antibiotic_schedule=[(0, AB_X, 2.0)], pop_size=20, seed=3)
+    ga.initialize([])
+    ga._update_antibiotic(0)
+    fits = ga.evaluate_population(ga.pop)
+    np.testing.assert_allclose(fits, [ga.evaluate(ind)[0] for ind in ga.pop])
+
+def test_simultaneous_drugs_use_gene_specificity(genes, individual):
+    schedule = [(0, AB_X, 2.0), (0, AB_Y, 6.0)]
+    # El gen A solo protege frente a X; B y C no protegen frente a nada
+    specificity = {(1, 10): 1.0, (1, 20): 0.0, (2, 10): 0.0, (2, 20): 0.0, (3, 10): 0.0, (3, 20): 0.0}
+    ga = GeneticAlgorithm(
+        genes=genes, antibiotic_schedule=schedule, generations=5, pop_size=10,
+        combination_therapy=True, drug_specificity=specificity, seed=1,
+    )
+    ga.initialize([])
+    ga.step()
+
+    assert [ab["id"] for ab, _ in ga.active_drugs] == [10, 20]
+    with_a, with_b = individual([1, 0, 0]), individual([0, 1, 0])
+    fit_a, fit_b = ga.evaluate_population([with_a, with_b])
+    # Igual resistencia bruta por peso no explica la diferencia: A reduce la exposición a X
+    assert fit_a / 0.6 > fit_b / 0.4
+
+    ga_loewe = GeneticAlgorithm(
+        genes=genes, antibiotic_schedule=schedule, generations=5, pop_size=10,
+        combination_therapy=True, interaction_model="loewe", seed=1,
+    )
+    ga_loewe.initialize([])
+    ga_loewe.step()
+    sin_farmacos = GeneticAlgorithm(genes=genes).evaluate(with_b)[0]
+    assert 0.0 <= ga_loewe.evaluate(with_b)[0] < sin_farmacos
@@ -0,0 +1,64 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from src.data import database
+from src.data.database import create_sqlite_engine, init_worker
+
+def _insert_rows(worker_id, n_rows=50):
+    """Escribe filas desde un proceso de trabajo usando su propia sesión."""
+    session = database.get_session()
+    for i in range(n_rows):
+        session.execute(
+            text("INSERT INTO registros (worker, valor) VALUES (:w, :v)"),
+            {"w": worker_id, "v": i},
+        )
+        session.commit()
+    session.close()
+    return worker_id
+
+@pytest.fixture
+def sqlite_url(tmp_path):
+    url = f"sqlite:///{tmp_path / 'perfiles.db'}"
+    eng = create_sqlite_engine(url, "batch")
+    with eng.begin() as conn:
+        conn.execute(text("CREATE TABLE registros (worker INTEGER, valor INTEGER)"))
+    eng.dispose()
+    return url
+
+def test_interactive_profile_applies_pragmas(sqlite_url):
+    """El perfil interactivo activa WAL y un busy_timeout en cada conexión."""
+    eng = create_sqlite_engine(sqlite_url, "interactive")
+    with eng.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+    eng.dispose()
+
+def test_analytics_profile_is_read_only(sqlite_url):
+    """El perfil analítico permite leer pero rechaza cualquier escritura."""
+    eng = create_sqlite_engine(sqlite_url, "analytics")
+    with eng.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM registros")).scalar() == 0
+        with pytest.raises(OperationalError):
+            conn.execute(text("INSERT INTO registros (worker, valor) VALUES (0, 0)"))
+    eng.dispose()
+
+def test_unknown_profile_raises(sqlite_url):
+    with pytest.raises(ValueError):
+        create_sqlite_engine(sqlite_url, "inexistente")
+
+def test_worker_processes_write_concurrently(sqlite_url):
+    """Varios procesos con motores propios escriben sin errores de bloqueo."""
+    with ProcessPoolExecutor(
+        max_workers=3, initializer=init_worker, initargs=("batch", sqlite_url)
+    ) as executor:
+        resultados = list(executor.map(_insert_rows, range(3)))
+    assert resultados == [0, 1, 2]
+
+    eng = create_sqlite_engine(sqlite_url, "analytics")
+    with eng.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM registros")).scalar() == 150
+    eng.dispose()
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from src.core.genetic_algorithm import GeneticAlgorithm
+
+EPISTASIS = {(1, 2): 0.3, (2, 4): -0.2, (3, 4): 0.1}
+
+@pytest.fixture
+def genes(gene_panel):
+    return gene_panel(0.25, 0.25, 0.25, 0.25)
+
+@pytest.fixture
+def sin_costo(individual):
+    """Individuos sin costo adaptativo (recubrimiento y enzimas en 0)."""
+    return lambda bits: individual(bits, recubrimiento=0.0, enzimas=0.0)
+
+def test_quadratic_form_matches_pairwise_sum(genes, sin_costo):
+    ga = GeneticAlgorithm(genes=genes, epistasis=EPISTASIS, death_rate=0.0)
+    assert ga.total_weight == pytest.approx(1.0 + 0.3 + 0.1)  # peso lineal + sinergias
+
+    rng = np.random.default_rng(0)
+    pop = [sin_costo(b) for b in rng.integers(0, 2, (300, 4)).tolist()]
+    fitness = ga.evaluate_population(pop)
+
+    for ind, fit in zip(pop, fitness):
+        raw = 0.25 * sum(ind) + sum(w for (a, b), w in EPISTASIS.items() if ind[a - 1] and ind[b - 1])
+        assert fit == pytest.approx(max(raw / ga.total_weight, 0.0))
+
+def test_without_terms_fitness_is_unchanged(genes, sin_costo):
+    plain = GeneticAlgorithm(genes=genes, death_rate=0.0)
+    empty = GeneticAlgorithm(genes=genes, epistasis={(1, 2): 0.0, (9, 1): 0.5}, death_rate=0.0)
+    pop = [sin_costo([1, 1, 0, 1]), sin_costo([0, 1, 1, 0])]
+
+    assert empty._epistasis_matrix is None
+    np.testing.assert_array_equal(plain.evaluate_population(pop), empty.evaluate_population(pop))
+    assert plain.scenario_params([]) != GeneticAlgorithm(
+        genes=genes, epistasis=EPISTASIS
+    ).scenario_params([])
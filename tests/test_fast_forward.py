@@ -0,0 +1,124 @@
+import json
+
+import numpy as np
+import pytest
+
+from src.core.genetic_algorithm import GeneticAlgorithm, logistic_advance, periodic_logistic_advance
+from src.core.reporting import save_generation_metrics, save_simulation_report
+from src.data.database import get_session
+from src.data.models import MetricaGeneracionSerie, ReporteSimulacion, Simulacion
+
+GENES = [{"id": i, "nombre": str(i), "peso_resistencia": 0.3} for i in range(1, 4)]
+AB = {"id": 1, "nombre": "X", "concentracion_minima": 0.5, "concentracion_maxima": 4.0}
+# Una dosis que decae (sin intervalo) y un régimen de dosis cada 6 h como los de la migración 009
+AB_DECAY = dict(AB, vida_media_horas=2.0)
+AB_DOSES = dict(AB, vida_media_horas=1.0, intervalo_dosis_horas=6.0)
+
+def _run(fast_forward, generations=900, schedule=((0, AB, 1.0), (500, AB, 3.0)), **kwargs):
+    # Sin mutación de bits y con todos los genes forzados la diversidad es 0
+    ga = GeneticAlgorithm(
+        genes=GENES, antibiotic_schedule=list(schedule), generations=generations,
+        pop_size=60, mutation_rate=0.0, seed=7, fast_forward=fast_forward, **kwargs,
+    )
+    ga.initialize([1, 2, 3])
+    steps = 0
+    while ga.step():
+        steps += 1
+    return ga, steps
+
+def test_closed_form_follows_the_discrete_logistic_map():
+    a, b, N0 = 1.15, 0.15 / 7.5e5, 2e5
+    N, iterated = N0, []
+    for _ in range(200):
+        N = a * N - b * N**2
+        iterated.append(N)
+    closed = logistic_advance(N0, a, b, np.arange(1, 201))
+
+    assert closed[-1] == pytest.approx(iterated[-1], rel=1e-6)  # mismo equilibrio
+    np.testing.assert_allclose(closed, iterated, rtol=0.05)
+    assert logistic_advance(1e4, 0.9, 1e-7, [50])[0] < 1e4 * 0.9**40  # declive
+    assert logistic_advance(100.0, 1.0, 0.01, [1])[0] == pytest.approx(50.0)
+    # Sin crecimiento (b = 0) la población es geométrica, sin equilibrio finito
+    np.testing.assert_allclose(logistic_advance(1e4, 0.9, 0.0, [1, 10]), 1e4 * 0.9 ** np.array([1, 10]))
+
+def test_periodic_closed_form_composes_one_generation_per_phase():
+    a = np.array([0.8, 1.2, 1.15, 1.1])
+    b = np.array([0.0, 0.2, 0.15, 0.1]) / 7.5e5
+    N, stepped = 3e5, []
+    for _ in range(50):
+        for ap, bp in zip(a, b):
+            N = logistic_advance(N, ap, bp, [1])[0]
+            stepped.append(N)
+
+    np.testing.assert_allclose(periodic_logistic_advance(3e5, a, b, 50).ravel(), stepped, rtol=1e-9)
+    # Un ciclo de una sola fase es logistic_advance
+    np.testing.assert_allclose(
+        periodic_logistic_advance(2e5, [1.15], [2e-7], 30).ravel(),
+        logistic_advance(2e5, 1.15, 2e-7, np.arange(1, 31)),
+    )
+
+def test_fast_forward_without_growth_at_low_temperature():
+    # A 26 °C growth_modifier() es 0: el mapa queda N' = a·N con b = 0
+    ga, _ = _run(
+        True, generations=300, schedule=((0, AB, 1.0),), ff_population_tol=0.2,
+        environmental_factors={"temperature": 26.0, "pH": 7.4},
+    )
+    assert ga.fast_forward_intervals
+    assert len(ga.population_hist) == 301 and min(ga.population_hist) >= 1.0
+
+# Con dosis repetidas los tiempos de las generaciones derivan respecto del
+# intervalo de dosis y cada salto cubre solo los ciclos que siguen a la referencia
+@pytest.mark.parametrize(
+    "drug, period, max_steps", [(AB, 1, 450), (AB_DECAY, 1, 450), (AB_DOSES, 6, 700)]
+)
+def test_fast_forward_skips_steady_state_until_the_next_event(drug, period, max_steps):
+    schedule = ((0, drug, 1.0), (500, drug, 3.0))
+    full, full_steps = _run(False, schedule=schedule, hours_per_generation=1.0)
+    fast, fast_steps = _run(True, schedule=schedule, hours_per_generation=1.0)
+
+    assert full_steps == 900 and fast_steps < max_steps
+    assert fast.fast_forward_intervals
+    for start, end in fast.fast_forward_intervals:
+        # Ciclos de dosis completos que nunca cruzan el evento
+        assert (end - start) % period == 0 and not start < 500 < end
+        if period == 1:
+            assert end in (500, 900)  # condiciones constantes: hasta el evento o el final
+        assert not 500 <= start < 500 + fast.ff_window  # no salta justo tras el evento
+        assert fast.fast_forward_mask[start:end].all()
+    assert fast.fast_forward_mask.sum() == sum(e - s for s, e in fast.fast_forward_intervals)
+
+    # Historiales completos y cercanos a la simulación generación por generación
+    assert len(fast.avg_hist) == len(full.avg_hist) == 900
+    assert len(fast.population_hist) == len(full.population_hist)
+    rel = np.abs(np.array(fast.population_hist) - full.population_hist) / np.maximum(full.population_hist, 1)
+    assert rel.max() < 0.01
+    np.testing.assert_allclose(fast.avg_hist, full.avg_hist, atol=0.01)
+
+def test_fast_forward_is_off_by_default_and_skipped_generations_are_reported():
+    ga, _ = _run(False, generations=60, schedule=((0, AB, 1.0),))
+    assert not ga.fast_forward_intervals and not ga.fast_forward_mask.any()
+
+    ga, _ = _run(True, generations=400, schedule=((0, AB, 1.0),))
+    session = get_session()
+    sim = Simulacion(antibiotico_id=1, concentracion=1.0, resistencia_predicha=0.0)
+    session.add(sim)
+    session.commit()
+    ga.current_simulation_id = sim.id
+    session.close()
+
+    save_simulation_report(ga, {"generations": 400, "fast_forward": True})
+    save_generation_metrics(ga, ga.current_simulation_id)
+
+    session = get_session()
+    try:
+        reporte = session.query(ReporteSimulacion).filter_by(simulacion_id=ga.current_simulation_id).one()
+        flags = [
+            m.avance_rapido for m in session.query(MetricaGeneracionSerie)
+            .filter_by(simulacion_id=ga.current_simulation_id)
+            .order_by(MetricaGeneracionSerie.generacion)
+        ]
+    finally:
+        session.close()
+    assert reporte.generaciones_avanzadas == int(ga.fast_forward_mask.sum()) > 0
+    assert json.loads(reporte.intervalos_avanzados) == [list(iv) for iv in ga.fast_forward_intervals]
+    assert flags == ga.fast_forward_mask.astype(int).tolist()
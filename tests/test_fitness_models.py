@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from src.core import fitness_models
+from src.core.fitness_models import FITNESS_MODELS, benchmark, fitness_model
+from src.core.genetic_algorithm import GeneticAlgorithm
+
+GENES = [{"id": i, "nombre": str(i), "peso_resistencia": 0.3} for i in range(1, 4)]
+AB = {"id": 1, "nombre": "X", "concentracion_minima": 0.5, "concentracion_maxima": 4.0}
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Registro aislado: los modelos de prueba no quedan registrados."""
+    monkeypatch.setattr(fitness_models, "FITNESS_MODELS", dict(FITNESS_MODELS))
+    return fitness_models.FITNESS_MODELS
+
+def test_ga_only_builds_the_inputs_the_model_requires(registry):
+    seen = []
+
+    @fitness_model("solo_resistencia", requires=("resistance",))
+    def solo_resistencia(inputs):
+        seen.append(set(inputs))
+        return inputs["resistance"]
+
+    ga = GeneticAlgorithm(genes=GENES, pop_size=20, fitness_model="solo_resistencia", seed=1)
+    ga.initialize([])
+    fitness = ga.evaluate_population(ga.pop)
+
+    assert seen == [{"resistance"}]
+    genomes = np.array([list(ind) for ind in ga.pop])
+    np.testing.assert_allclose(fitness, genomes.sum(axis=1) / 3)
+
+def test_clasico_is_the_default_and_alternatives_change_fitness():
+    kwargs = dict(genes=GENES, antibiotic_schedule=[(0, AB, 2.0)], pop_size=30, seed=2)
+    ga = GeneticAlgorithm(**kwargs)
+    sin_costo = GeneticAlgorithm(fitness_model="sin_costo", **kwargs)
+    ga.initialize([])
+    sin_costo.initialize([])
+
+    assert ga.fitness_model == "clasico"
+    assert ga.scenario_params([]) != sin_costo.scenario_params([])
+    # Sin costo adaptativo la aptitud nunca es menor
+    assert (sin_costo.evaluate_population(ga.pop) >= ga.evaluate_population(ga.pop)).all()
+
+def test_unknown_models_and_inputs_are_rejected(registry):
+    with pytest.raises(ValueError):
+        GeneticAlgorithm(genes=GENES, fitness_model="no_existe")
+    with pytest.raises(ValueError):
+        fitness_model("malo", requires=("temperatura_del_laboratorio",))
+
+def test_every_registered_model_runs_on_synthetic_inputs():
+    for name, fn in FITNESS_MODELS.items():
+        inputs = fitness_models.synthetic_inputs(fn.requires, 1000)
+        fitness = fn(inputs)
+        assert fitness.shape == (1000,) and (fitness >= 0).all()
+        assert benchmark(name, n=1000, repeat=1) > 0
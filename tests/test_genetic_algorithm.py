@@ -239,3 +239,39 @@ def test_step_evolutionary_rescue(ga_instance, mocker):
     # Se asegura que el resto de la población no fue afectado por la mutación de rescate.
     for i in range(1, ga_instance.pop_size):
         assert ga_instance.pop[i][0] == 0
+
+def test_step_records_generation_telemetry(ga_instance, mocker):
+    """Verifica que cada paso registra CPU, RAM y tiempo real de su propia generación."""
+    mocker.patch('src.core.genetic_algorithm.random.random', return_value=1.0)
+    ga_instance.initialize(selected_gene_ids=[])
+
+    # Los arreglos se preasignan con una posición por generación.
+    assert ga_instance.wall_time_hist.shape == (ga_instance.generations,)
+
+    for _ in range(3):
+        ga_instance.step()
+
+    assert np.all(ga_instance.wall_time_hist[:3] > 0)
+    assert np.all(ga_instance.cpu_time_hist[:3] >= 0)
+    assert np.all(ga_instance.ram_mb_hist[:3] > 0)
+    # Las generaciones aún no ejecutadas permanecen en cero.
+    assert np.all(ga_instance.wall_time_hist[3:] == 0)
+
+def test_offspring_inherit_jittered_positions(ga_instance, mocker):
+    """Cada descendiente parte de la posición de su progenitor y no sale del disco."""
+    ga_instance.initialize(selected_gene_ids=[])
+    ga_instance.pop[0].pos = np.array([ga_instance.spatial_radius, 0.0], dtype=np.float32)
+    before = ga_instance.positions.copy()
+
+    # Selección identidad: el descendiente i proviene del individuo i
+    mocker.patch.object(ga_instance.toolbox, 'select', side_effect=lambda pop, k: list(pop))
+    mocker.patch.object(ga_instance.toolbox, 'mate')
+    mocker.patch.object(ga_instance.toolbox, 'mutate')
+    mocker.patch('src.core.genetic_algorithm.random.random', return_value=1.0)
+    ga_instance.step()
+
+    after = ga_instance.positions
+    assert after.dtype == np.float32 and after.shape == before.shape
+    assert np.all(np.linalg.norm(after - before, axis=1) < 6 * ga_instance.spatial_jitter)
+    assert np.all(np.hypot(after[:, 0], after[:, 1]) <= ga_instance.spatial_radius + 1e-4)
+    assert not np.array_equal(after, before)
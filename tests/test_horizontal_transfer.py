@@ -0,0 +1,73 @@
+import numpy as np
+
+from src.core.genetic_algorithm import GeneticAlgorithm, creator
+
+GENES = [
+    {"id": 1, "nombre": "plasmido", "peso_resistencia": 0.6},
+    {"id": 2, "nombre": "cromosoma", "peso_resistencia": 0.4},
+    {"id": 3, "nombre": "otro", "peso_resistencia": 0.2},
+]
+
+def _population(bits, centers, n_each=200):
+    """n_each individuos con los bits dados alrededor de cada centro."""
+    pop = []
+    for b, (cx, cy) in zip(bits, centers):
+        for _ in range(n_each):
+            ind = creator.Individual(list(b), 0.5, 0.5, 0.5, 0.5, 0.5, pos=(cx, cy))
+            ind.fitness.values = (0.0,)
+            pop.append(ind)
+    return pop
+
+def test_transfer_copies_only_plasmid_genes_within_neighbourhood():
+    ga = GeneticAlgorithm(genes=GENES, hgt_rate=1.0, hgt_genes=[1], hgt_radius=5.0, seed=1)
+    # Grupo A (portador) y grupo B (sin genes) alejados: nunca son vecinos
+    pop = _population([(1, 1, 0), (0, 0, 0)], [(-30.0, -30.0), (30.0, 30.0)])
+    # Un receptor sin genes dentro del grupo A
+    pop[0][:] = [0, 0, 0]
+
+    ganados = ga._horizontal_transfer(pop)
+
+    assert ganados == 1
+    assert list(pop[0]) == [1, 0, 0]  # recibe el plásmido, no el gen cromosómico
+    assert not pop[0].fitness.valid
+    assert all(list(ind) == [0, 0, 0] for ind in pop[200:])
+
+def test_without_positions_donors_come_from_the_whole_population():
+    ga = GeneticAlgorithm(genes=GENES, hgt_rate=1.0, seed=2)
+    pop = _population([(1, 0, 1), (0, 0, 0)], [(0.0, 0.0), (0.0, 0.0)], n_each=100)
+    for ind in pop:
+        ind.pos = None
+
+    ganados = ga._horizontal_transfer(pop)
+    genomes = np.array([list(ind) for ind in pop])
+
+    assert 0 < ganados <= 100
+    assert genomes[:, 1].sum() == 0
+    assert genomes[:, 0].sum() == 100 + ganados
+
+def test_donor_is_never_the_recipient_itself():
+    ga = GeneticAlgorithm(genes=GENES, hgt_rate=1.0, hgt_genes=[1], hgt_radius=5.0, seed=4)
+    # Celdas de dos miembros (portador + receptor), lejos unas de otras
+    centers = [(-40.0 + 10.0 * k, 0.0) for k in range(9)]
+    pop = []
+    for center in centers:
+        pop += _population([(1, 0, 0), (0, 0, 0)], [center, center], n_each=1)
+
+    assert ga._horizontal_transfer(pop) == len(centers)  # todos reciben de su único vecino
+
+    # Sin posiciones, una población de dos: el donante siempre es el otro
+    pair = _population([(1, 0, 0), (0, 0, 0)], [(0.0, 0.0), (0.0, 0.0)], n_each=1)
+    for ind in pair:
+        ind.pos = None
+    assert ga._horizontal_transfer(pair) == 1
+
+def test_step_records_transfers_and_is_off_by_default():
+    ga = GeneticAlgorithm(genes=GENES, generations=3, pop_size=30, seed=3)
+    ga.initialize([])
+    ga.step()
+    assert ga.hgt_hist == [0]
+
+    ga = GeneticAlgorithm(genes=GENES, generations=3, pop_size=30, hgt_rate=0.5, seed=3)
+    ga.initialize([])
+    ga.step()
+    assert len(ga.hgt_hist) == 1 and ga.hgt_hist[0] >= 0
@@ -7,7 +7,11 @@ from src.data.models import (
     MetricaGeneracion,
 )
 from src.core.genetic_algorithm import GeneticAlgorithm
-from src.core.reporting import save_simulation_report, save_generation_metrics
+from src.core.reporting import (
+    save_simulation_report,
+    save_generation_metrics,
+    load_generation_metrics,
+)
 import math
 
 def get_basic_genes():
@@ -91,6 +95,14 @@ def test_full_simulation_and_reporting():
     assert "tasa_convergencia" in nombres_metricas
     session.close()
 
+    # La serie completa se carga como arreglo NumPy en una sola consulta
+    serie = load_generation_metrics(sim_id)
+    assert len(serie) == 5
+    assert list(serie["generacion"]) == [1, 2, 3, 4, 5]
+    assert math.isclose(serie["avg_fitness"][-1], ga.avg_hist[-1])
+    assert all(t > 0 for t in serie["wall_time_sec"])
+    assert len(metricas) == 5 * len(serie.dtype.names[1:])
+
 def test_flujo_completo_simulacion_usuario():
     session = get_session()
     genes = session.query(Gen).all()
@@ -0,0 +1,69 @@
+import time
+
+import numpy as np
+import pytest
+
+from src.core.lattice import LatticeSimulation, laplacian
+from src.core.reporting import load_generation_metrics
+from src.core.runner import run_simulation
+from src.data.reference_cache import get_reference_data
+
+GENES = [
+    {"id": 1, "nombre": "A", "peso_resistencia": 0.7},
+    {"id": 2, "nombre": "B", "peso_resistencia": 0.3},
+]
+AB = {"id": 1, "nombre": "Antib1", "concentracion_minima": 0.2, "concentracion_maxima": 1.0}
+
+def test_migration_and_mutation_conserve_biomass():
+    """Sin crecimiento, muerte ni antibiótico, la biomasa total no cambia."""
+    sim = LatticeSimulation(
+        GENES, generations=20, grid_size=64, r_growth=0.0, death_rate=0.0,
+        migration_rate=0.25, mutation_rate=0.1, seed=1,
+    )
+    sim.initialize([1])
+    inicial = sim.population_total
+    while sim.step():
+        pass
+
+    assert sim.population_total == pytest.approx(inicial, rel=1e-4)
+    # La colonia se expandió y la mutación pobló otras clases
+    assert sim.expansion_index_hist[-1] > 1.0
+    assert np.count_nonzero(sim.counts.sum(axis=(1, 2))) > 1
+    assert laplacian(sim.counts).sum() == pytest.approx(0.0, abs=1e-2)
+
+def test_antibiotic_kills_more_at_the_colony_edge():
+    """El antibiótico entra desde el medio: el borde de la colonia recibe más que el centro."""
+    sim = LatticeSimulation(GENES, [(0, AB, 1.0)], generations=10, grid_size=64, seed=2)
+    control = LatticeSimulation(GENES, [], generations=10, grid_size=64, seed=2)
+    for s in (sim, control):
+        s.initialize([])
+        while s.step():
+            pass
+
+    layers = sim.map_layers()
+    centro = sim.grid_size // 2
+    borde = np.nonzero(layers["densidad"][centro] > 0)[0][0]
+    assert layers["antibiotico"][centro, borde] > layers["antibiotico"][centro, centro]
+    assert sim.population_total < control.population_total
+
+def test_large_grid_steps_quickly():
+    sim = LatticeSimulation(GENES, [(0, AB, 0.5)], generations=3, grid_size=512, seed=3)
+    sim.initialize([1])
+    sim.step()  # calentamiento
+
+    start = time.perf_counter()
+    sim.step()
+    assert time.perf_counter() - start < 1.0
+
+def test_runner_lattice_mode_persists_metrics():
+    ref = get_reference_data()
+    ab_id = next(iter(ref.antibiotics))
+    sim = run_simulation(
+        [ref.genes[0]["id"]], [(0, ab_id, 0.5)], generations=4, seed=1,
+        mode="lattice", grid_size=32,
+    )
+
+    assert isinstance(sim, LatticeSimulation)
+    metricas = load_generation_metrics(sim.current_simulation_id)
+    assert list(metricas.generacion) == [1, 2, 3, 4]
+    np.testing.assert_allclose(metricas.avg_fitness, sim.avg_hist)
@@ -0,0 +1,60 @@
+import numpy as np
+
+from src.core.genetic_algorithm import GeneticAlgorithm
+from src.core.lineage import LineageRecorder
+
+GENES = [{"id": i, "nombre": str(i), "peso_resistencia": 0.3 + 0.1 * i} for i in range(1, 4)]
+
+def _brute_tmrca(history):
+    anc = np.arange(len(history[-1]))
+    for k in range(len(history) - 1, -1, -1):
+        anc = history[k][anc]
+        if len(np.unique(anc)) == 1:
+            return len(history) - k
+    return None
+
+def test_recorder_queries_on_a_hand_built_genealogy():
+    rec = LineageRecorder(n_genes=2, capacity=8, prune_interval=1)
+    rec.start([[0, 0], [0, 0], [0, 0], [1, 0]])
+    # Gen 1: la ranura 0 adquiere el gen 1; las ranuras 1 y 2 dejan descendencia
+    rec.record(1, [0, 0, 1, 2], [[0, 1], [0, 1], [0, 0], [0, 0]])
+    # Gen 2: todos descienden de los individuos 0 y 1 de la generación 1
+    rec.record(2, [0, 1, 1, 0], [[0, 1], [0, 1], [0, 1], [0, 1]])
+
+    assert rec.tmrca() == 2  # ambos descienden del individuo 0 de la generación 0
+    assert rec.first_appearance(0) == 0 and rec.first_appearance(1) == 1
+    assert rec.fixation_generation(1) == 2 and rec.fixation_generation(0) == -1
+    assert rec.allele_origins(1) == [(1, 2), (1, 2)]
+
+def test_ga_tmrca_matches_the_full_genealogy_and_memory_is_pruned():
+    ga = GeneticAlgorithm(
+        genes=GENES, generations=120, pop_size=120, seed=5, lineage_tracking=True, lineage_capacity=200,
+    )
+    ga.initialize([])
+    history = []
+    record = ga.lineage.record
+
+    def spy(generation, parents, genomes):
+        history.append(np.array(parents))
+        record(generation, parents, genomes)
+
+    ga.lineage.record = spy
+    while ga.step():
+        pass
+
+    assert ga.lineage.tmrca() == _brute_tmrca(history)
+    unpruned = sum(p.nbytes for p in history)
+    assert ga.lineage.nbytes < unpruned / 2
+
+def test_ring_buffer_bounds_the_stored_generations():
+    ga = GeneticAlgorithm(
+        genes=GENES, generations=60, pop_size=40, seed=6, lineage_tracking=True, lineage_capacity=10,
+    )
+    ga.initialize([])
+    while ga.step():
+        pass
+
+    assert ga.lineage.generations_stored == 10
+    # parents (int32) + a lo sumo un evento de 2×int32 por bit, por generación
+    assert ga.lineage.nbytes <= 10 * 40 * 4 * (1 + 2 * len(GENES))
+    assert GeneticAlgorithm(genes=GENES).lineage is None
@@ -0,0 +1,216 @@
+import os
+import re
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from src.data import database, models
+from src.data.database import (
+    LATEST_SCHEMA_VERSION,
+    _apply_migration,
+    create_sqlite_engine,
+    init_db,
+)
+
+MIGRATIONS = os.path.join(database.base_path, "migrations")
+
+@pytest.fixture
+def file_engine(tmp_path):
+    eng = create_sqlite_engine(f"sqlite:///{tmp_path / 'migraciones.db'}", "batch")
+    yield eng
+    eng.dispose()
+
+@pytest.fixture(scope="module")
+def seeded_engine(tmp_path_factory):
+    """Base en archivo con todas las migraciones aplicadas, compartida por el módulo."""
+    eng = create_sqlite_engine(
+        f"sqlite:///{tmp_path_factory.mktemp('semilla') / 'semilla.db'}", "batch"
+    )
+    init_db(bind=eng)
+    yield eng
+    eng.dispose()
+
+def _query(eng, sql):
+    with eng.connect() as conn:
+        return conn.execute(text(sql)).all()
+
+def _version(eng):
+    with eng.connect() as conn:
+        return conn.execute(text("SELECT version_num FROM db_version WHERE id = 1")).scalar()
+
+def test_latest_version_matches_migration_files():
+    """La constante precalculada debe seguir a la última migración."""
+    versions = [
+        int(m.group(1))
+        for m in (re.match(r"(\d+)_.*\.sql$", f) for f in os.listdir(MIGRATIONS))
+        if m
+    ]
+    assert LATEST_SCHEMA_VERSION == max(versions)
+
+def test_fresh_database_is_migrated_then_fast_path(file_engine, mocker):
+    init_db(bind=file_engine)
+    assert _version(file_engine) == LATEST_SCHEMA_VERSION
+    with file_engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM genes")).scalar() > 0
+
+    # Con el esquema al día no se toca el sistema de archivos
+    listdir = mocker.patch("src.data.database.os.listdir", side_effect=AssertionError)
+    init_db(bind=file_engine)
+    listdir.assert_not_called()
+
+def test_failed_migration_leaves_no_partial_changes(file_engine, tmp_path):
+    init_db(bind=file_engine)
+    broken = tmp_path / "999_broken.sql"
+    broken.write_text(
+        "BEGIN TRANSACTION;\n"
+        "CREATE TABLE parcial (id INTEGER);\n"
+        "INSERT INTO tabla_inexistente VALUES (1);\n"
+        "COMMIT;\n",
+        encoding="utf-8",
+    )
+
+    raw_conn = file_engine.raw_connection()
+    try:
+        with pytest.raises(Exception):
+            _apply_migration(raw_conn, str(broken), 999)
+    finally:
+        raw_conn.close()
+
+    assert _version(file_engine) == LATEST_SCHEMA_VERSION
+    with file_engine.connect() as conn:
+        tablas = conn.execute(
+            text("SELECT name FROM sqlite_master WHERE name = 'parcial'")
+        ).fetchall()
+    assert tablas == []
+
+def test_seed_adds_pk_parameters(seeded_engine):
+    fila = _query(
+        seeded_engine,
+        "SELECT vida_media_horas, intervalo_dosis_horas FROM antibioticos "
+        "WHERE nombre = 'Meropenem'",
+    )
+    assert [tuple(f) for f in fila] == [(1.0, 8.0)]
+
+def test_seed_adds_gene_drug_specificity(seeded_engine):
+    assert _query(seeded_engine, "SELECT COUNT(*) FROM gen_antibiotico")[0][0] == 100
+    peso = _query(
+        seeded_engine,
+        "SELECT ga.peso_especificidad FROM gen_antibiotico ga "
+        "JOIN genes g ON g.id = ga.gen_id JOIN antibioticos a ON a.id = ga.antibiotico_id "
+        "WHERE g.nombre = 'mcr1' AND a.nombre = 'Colistina'",
+    )
+    assert peso[0][0] == 1.0
+
+def test_seed_adds_epistasis_pairs(seeded_engine):
+    rows = _query(
+        seeded_engine,
+        "SELECT ga.nombre, gb.nombre, e.peso_epistasis FROM epistasis_genes e "
+        "JOIN genes ga ON ga.id = e.gen_a_id JOIN genes gb ON gb.id = e.gen_b_id",
+    )
+    ordered = _query(
+        seeded_engine, "SELECT COUNT(*) FROM epistasis_genes WHERE gen_a_id >= gen_b_id"
+    )[0][0]
+    pesos = {frozenset((a, b)): w for a, b, w in rows}
+    assert len(rows) == 6 and ordered == 0
+    assert pesos[frozenset(("mexAB-oprM", "oxa48"))] == pytest.approx(0.15)
+    assert pesos[frozenset(("blaVIM", "ndm1"))] < 0
+
+def test_migrated_view_is_the_model_definition(seeded_engine):
+    """La vista de compatibilidad se genera desde INDICADORES_GENERACION, no a mano."""
+    (sql,), = _query(
+        seeded_engine, "SELECT sql FROM sqlite_master WHERE type = 'view' AND name = 'metricas_generacion'"
+    )
+    assert sql == models._sql_vista_metricas_generacion()
+    assert re.findall(r"'(\w+)' AS nombre_indicador", sql) == list(models.INDICADORES_GENERACION)
+
+def test_model_ddl_leaves_a_leftover_table_named_like_the_view(file_engine):
+    """create_all no falla ni pisa una tabla metricas_generacion anterior a 007."""
+    with file_engine.begin() as conn:
+        conn.execute(text("CREATE TABLE metricas_generacion (valor REAL)"))
+    models.Base.metadata.create_all(file_engine)
+    tipo = _query(file_engine, "SELECT type FROM sqlite_master WHERE name = 'metricas_generacion'")
+    assert tipo[0][0] == "table"
+
+def test_view_is_created_with_the_last_version_bump(file_engine, mocker):
+    """Si falla la vista, la última migración no queda marcada y se reintenta."""
+    mocker.patch(
+        "src.data.database.sql_recrear_vistas", return_value="INSERT INTO vista_inexistente VALUES (1);"
+    )
+    with pytest.raises(Exception):
+        init_db(bind=file_engine)
+    assert _version(file_engine) == LATEST_SCHEMA_VERSION - 1
+
+    mocker.stopall()
+    init_db(bind=file_engine)
+    assert _version(file_engine) == LATEST_SCHEMA_VERSION
+    vista = _query(file_engine, "SELECT type FROM sqlite_master WHERE name = 'metricas_generacion'")
+    assert vista[0][0] == "view"
+
+def test_model_ddl_rejects_duplicate_gene_drug_pairs(file_engine):
+    """create_all impone la misma unicidad que la migración 010."""
+    models.Base.metadata.create_all(file_engine)
+    insert = text(
+        "INSERT INTO gen_antibiotico (gen_id, antibiotico_id, peso_especificidad) "
+        "VALUES (1, 1, 0.5)"
+    )
+    with file_engine.begin() as conn:
+        conn.execute(insert)
+    with pytest.raises(IntegrityError):
+        with file_engine.begin() as conn:
+            conn.execute(insert)
+
+@pytest.mark.parametrize("pares", [[(2, 1)], [(1, 2), (1, 2)]])
+def test_model_ddl_rejects_unordered_or_repeated_epistasis(file_engine, pares):
+    """create_all impone el orden canónico y la unicidad de la migración 011."""
+    models.Base.metadata.create_all(file_engine)
+    with pytest.raises(IntegrityError):
+        with file_engine.begin() as conn:
+            for a, b in pares:
+                conn.execute(
+                    text(
+                        "INSERT INTO epistasis_genes (gen_a_id, gen_b_id, peso_epistasis) "
+                        "VALUES (:a, :b, 0.1)"
+                    ),
+                    {"a": a, "b": b},
+                )
+
+def test_leading_pragma_runs_outside_the_transaction(file_engine, tmp_path):
+    """Un PRAGMA al inicio del archivo se aplica antes de BEGIN y surte efecto."""
+    init_db(bind=file_engine)
+    script = tmp_path / "998_pragma.sql"
+    script.write_text(
+        "PRAGMA foreign_keys = ON;\n"
+        "BEGIN TRANSACTION;\n"
+        "CREATE TABLE con_pragma (id INTEGER);\n"
+        "COMMIT;\n",
+        encoding="utf-8",
+    )
+    raw_conn = file_engine.raw_connection()
+    try:
+        _apply_migration(raw_conn, str(script), 998)
+        cursor = raw_conn.cursor()
+        cursor.execute("PRAGMA foreign_keys")
+        assert cursor.fetchone()[0] == 1
+        cursor.close()
+    finally:
+        raw_conn.close()
+
+def test_pragma_between_statements_is_rejected(file_engine, tmp_path):
+    init_db(bind=file_engine)
+    script = tmp_path / "998_pragma.sql"
+    script.write_text(
+        "BEGIN TRANSACTION;\n"
+        "CREATE TABLE antes (id INTEGER);\n"
+        "PRAGMA foreign_keys = OFF;\n"
+        "CREATE TABLE despues (id INTEGER);\n"
+        "COMMIT;\n",
+        encoding="utf-8",
+    )
+    raw_conn = file_engine.raw_connection()
+    try:
+        with pytest.raises(ValueError, match="PRAGMA"):
+            _apply_migration(raw_conn, str(script), 998)
+    finally:
+        raw_conn.close()
+    assert _version(file_engine) == LATEST_SCHEMA_VERSION
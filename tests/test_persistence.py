@@ -0,0 +1,83 @@
+import threading
+
+import pytest
+
+from src.data.database import get_session
+from src.data.models import Gen
+from src.data.persistence import WriteBehindQueue
+
+def add_gene(nombre, session):
+    session.add(Gen(nombre=nombre, peso_resistencia=0.1, descripcion=nombre))
+    return nombre
+
+def failing_task(session):
+    raise ValueError("fallo intencional")
+
+def test_submit_resolves_futures_after_commit():
+    """Las tareas encoladas se escriben y sus futures devuelven el resultado."""
+    writer = WriteBehindQueue(batch_size=8)
+    futures = [writer.submit(add_gene, f"WB{i}") for i in range(20)]
+    writer.flush()
+
+    assert [f.result(timeout=5) for f in futures] == [f"WB{i}" for i in range(20)]
+    session = get_session()
+    assert session.query(Gen).filter(Gen.nombre.like("WB%")).count() == 20
+    session.close()
+    writer.shutdown()
+
+def test_failing_task_does_not_lose_the_rest_of_the_batch():
+    """Un error se asigna solo al future de la tarea que falló."""
+    writer = WriteBehindQueue(batch_size=16)
+    ok_before = writer.submit(add_gene, "WB_ok1")
+    bad = writer.submit(failing_task)
+    ok_after = writer.submit(add_gene, "WB_ok2")
+    writer.shutdown()
+
+    assert ok_before.result(timeout=5) == "WB_ok1"
+    assert ok_after.result(timeout=5) == "WB_ok2"
+    with pytest.raises(ValueError):
+        bad.result(timeout=5)
+
+def test_shutdown_flushes_and_rejects_new_tasks():
+    """Al cerrar se escriben las tareas pendientes y no se aceptan nuevas."""
+    writer = WriteBehindQueue()
+    future = writer.submit(add_gene, "WB_last")
+    writer.shutdown()
+
+    assert future.done()
+    with pytest.raises(RuntimeError):
+        writer.submit(add_gene, "WB_late")
+
+def test_session_failure_resolves_every_future(mocker):
+    """Si no se puede abrir la sesión, todas las tareas del lote reciben el error."""
+    mocker.patch(
+        "src.data.persistence.get_session", side_effect=RuntimeError("sin base")
+    )
+    writer = WriteBehindQueue(batch_size=8)
+    futures = [writer.submit(add_gene, f"WB_nodb{i}") for i in range(5)]
+    writer.shutdown()
+
+    for future in futures:
+        with pytest.raises(RuntimeError, match="sin base"):
+            future.result(timeout=5)
+
+def test_full_queue_does_not_block_shutdown_of_other_producers():
+    """Un productor bloqueado en una cola llena no retiene el cerrojo de submit()."""
+    gate = threading.Event()
+
+    def slow_task(session):
+        gate.wait(5)
+
+    writer = WriteBehindQueue(maxsize=1, batch_size=1)
+    first = writer.submit(slow_task)
+    writer.submit(add_gene, "WB_fill")
+    blocked = threading.Thread(target=writer.submit, args=(add_gene, "WB_wait"))
+    blocked.start()
+
+    # Con el cerrojo libre, otro hilo puede comprobar el estado sin esperar
+    assert writer._lock.acquire(timeout=1)
+    writer._lock.release()
+    gate.set()
+    blocked.join(timeout=5)
+    writer.shutdown()
+    assert first.done() and not blocked.is_alive()
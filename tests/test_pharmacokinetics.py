@@ -0,0 +1,81 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from src.core.genetic_algorithm import GeneticAlgorithm
+from src.core.pharmacokinetics import concentration_curve, superpose
+
+AB_PK = {
+    "id": 1, "nombre": "X", "concentracion_minima": 0.5, "concentracion_maxima": 4.0,
+    "vida_media_horas": 2.0, "intervalo_dosis_horas": 4.0,
+}
+
+def test_repeated_doses_accumulate_to_steady_state():
+    """Los picos tienden a c / (1 - 2^(-τ/t½)) y el valle decae con la vida media."""
+    times = np.arange(0, 200, 1.0)
+    curve = concentration_curve([(0, AB_PK, 1.0)], times)
+
+    assert curve[0] == pytest.approx(1.0)
+    assert curve[2] == pytest.approx(0.5)  # una vida media después de la primera dosis
+    assert curve[4] == pytest.approx(1.25)  # segunda dosis + residuo de la primera
+    assert curve[196] == pytest.approx(1.0 / (1.0 - 0.25))
+
+def test_superpose_matches_the_sum_over_doses_without_a_times_by_doses_matrix():
+    rng = np.random.default_rng(0)
+    times = np.sort(rng.uniform(0, 100, 300))
+    doses = rng.uniform(0, 100, 40)
+    dt = times[:, None] - doses[None, :]
+    expected = 2.0 * np.where(dt >= 0, 0.5 ** (np.maximum(dt, 0) / 3.0), 0.0).sum(axis=1)
+    np.testing.assert_allclose(superpose(times, doses, 2.0, 3.0), expected, rtol=1e-9)
+
+    # Un régimen cada 6 h durante 10 000 generaciones (máximo de la GUI)
+    ab = dict(AB_PK, vida_media_horas=1.0, intervalo_dosis_horas=6.0)
+    tracemalloc.start()
+    concentration_curve([(0, ab, 1.0)], np.arange(10_000, dtype=float))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert peak < 5 * 1024**2
+
+def test_without_half_life_the_schedule_stays_a_step_function(gene_panel):
+    ab_a, ab_b = {"id": 1}, {"id": 2}
+    schedule = [(5, ab_a, 3.0), (10, ab_b, 1.0)]
+    ga = GeneticAlgorithm(genes=gene_panel(0.5, 0.5, 0.5), antibiotic_schedule=schedule, generations=20)
+    times = np.arange(20, dtype=float)
+    curve = concentration_curve(schedule, times)
+
+    for t, c in zip(times, curve):
+        ga._update_antibiotic(t)
+        assert c == ga.current_conc
+
+def test_ga_steps_follow_the_precomputed_curve(gene_panel, mocker):
+    ga = GeneticAlgorithm(
+        genes=gene_panel(0.5, 0.5, 0.5), antibiotic_schedule=[(0, AB_PK, 2.0)], generations=12, pop_size=10, seed=1,
+        hours_per_generation=1.0,
+    )
+    ga.initialize([1])
+    sigmoid = mocker.spy(ga, "_sigmoid_survival")
+
+    concs = []
+    while ga.step():
+        concs.append(ga.current_conc)
+
+    np.testing.assert_allclose(concs, ga.conc_curve)
+    assert len(set(concs)) > 2  # la concentración sube y baja entre dosis
+    # La supervivencia se calcula una vez por concentración, no por individuo
+    assert sigmoid.call_count <= 2 * len(set(concs))
+
+def test_pharmacokinetics_is_opt_in(gene_panel):
+    """Sin hours_per_generation los fármacos con vida media también son escalonados."""
+    schedule = [(0, AB_PK, 2.0), (6, dict(AB_PK, id=2), 1.0)]
+    ga = GeneticAlgorithm(genes=gene_panel(0.5, 0.5, 0.5), antibiotic_schedule=schedule, generations=12)
+    ga.initialize([1])
+
+    np.testing.assert_array_equal(ga.conc_curve, np.where(ga.times < 6, 2.0, 1.0))
+    assert not np.array_equal(concentration_curve(schedule, ga.times, 1.0), ga.conc_curve)
+
+def test_superpose_accepts_one_amount_per_dose():
+    times = np.linspace(0, 50, 80)
+    doses, amounts = np.array([30.0, 0.0, 12.0]), np.array([0.5, 2.0, 1.0])
+    expected = sum(superpose(times, [d], c, 4.0) for d, c in zip(doses, amounts))
+    np.testing.assert_allclose(superpose(times, doses, amounts, 4.0), expected, rtol=1e-12)
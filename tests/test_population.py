@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from src.core.genetic_algorithm import GeneticAlgorithm, creator
+from src.core.population import CompressedPopulation
+
+GENES = [{"id": i, "nombre": str(i), "peso_resistencia": 0.2 * i} for i in range(1, 5)]
+
+@pytest.mark.parametrize("n_genes", [6, 80])
+def test_compression_round_trips_and_weights_frequencies(n_genes):
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 2, (5, n_genes))
+    genomes = base[rng.integers(0, 5, 1000)]
+    comp = CompressedPopulation.from_genomes(genomes)
+
+    assert comp.n_unique == len(np.unique(base, axis=0))
+    assert comp.counts.sum() == len(comp) == 1000
+    np.testing.assert_array_equal(comp.individual_genomes(), genomes)
+    np.testing.assert_allclose(comp.allele_frequencies(), genomes.mean(axis=0))
+
+    p = genomes.mean(axis=0)
+    p = p[(p > 0) & (p < 1)]
+    assert comp.diversity() == pytest.approx(np.sum(-p * np.log2(p) - (1 - p) * np.log2(1 - p)))
+
+def test_from_individuals_keeps_per_individual_traits_and_positions():
+    pop = [
+        creator.Individual([1, 0, 1, 0], 0.1 * k, 0.5, 0.5, 0.5, 0.9, pos=(k, -k))
+        for k in range(4)
+    ]
+    comp = CompressedPopulation.from_individuals(pop, 4)
+
+    assert comp.n_unique == 1 and comp.counts.tolist() == [4]
+    np.testing.assert_allclose(comp.trait("recubrimiento"), [0.0, 0.1, 0.2, 0.3])
+    np.testing.assert_allclose(comp.positions[:, 1], [0, -1, -2, -3])
+
+def test_population_evaluation_matches_one_by_one():
+    ab = {"id": 1, "nombre": "X", "concentracion_minima": 0.5, "concentracion_maxima": 4.0}
+    ga = GeneticAlgorithm(genes=GENES, antibiotic_schedule=[(0, ab, 2.0)], pop_size=60, seed=3)
+    ga.initialize([])
+    ga.step()
+
+    together = ga.evaluate_population(ga.pop)
+    one_by_one = [ga.evaluate(ind)[0] for ind in ga.pop]
+    np.testing.assert_allclose(together, one_by_one)
+
+def test_step_builds_the_genome_matrix_once_and_keeps_it_aligned(mocker):
+    ga = GeneticAlgorithm(genes=GENES, pop_size=80, hgt_rate=0.3, evo_rescue_threshold=10.0,
+                          evo_rescue_prob=0.5)  # sin semilla: el recorte solo aplica así
+    ga.initialize([])
+    ga.target_time_per_generation = 0.0  # fuerza el recorte adaptativo de la población
+    build = mocker.spy(ga, "_genome_matrix")
+
+    for _ in range(5):
+        ga.step()
+
+    assert build.call_count == 5
+    assert len(ga.pop) < 80
+    np.testing.assert_array_equal(ga._genomes, [list(ind) for ind in ga.pop])
+    np.testing.assert_allclose(ga.evaluate_population(ga.pop), [ind.fitness.values[0] for ind in ga.pop])
+
+def test_step_compresses_the_population_once_per_generation(mocker):
+    """Evaluación y diversidad comparten la misma compresión de la generación."""
+    ga = GeneticAlgorithm(genes=GENES, pop_size=60, seed=3, evo_rescue_prob=0.0)
+    ga.initialize([])
+    compress = mocker.spy(CompressedPopulation, "from_genomes")
+    diversity = mocker.spy(CompressedPopulation, "diversity")
+
+    for _ in range(4):
+        ga.step()
+
+    assert compress.call_count == diversity.call_count == 4
+    np.testing.assert_allclose(ga.evaluate_population(ga.pop), [ind.fitness.values[0] for ind in ga.pop])
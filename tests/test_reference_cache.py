@@ -0,0 +1,60 @@
+from src.core.runner import run_simulation
+from src.data.database import get_session
+from src.data.models import Gen, Antibiotico, Recomendacion, MetricaGeneracionSerie
+from src.data.reference_cache import get_reference_data, invalidate_reference_data
+
+def test_reference_data_is_loaded_once_and_shared():
+    """La caché devuelve la misma instantánea hasta que se invalida."""
+    ref = get_reference_data()
+    assert {g["nombre"] for g in ref.genes} == {"A", "B"}
+    assert get_reference_data() is ref
+
+    session = get_session()
+    session.add(Gen(nombre="C", peso_resistencia=0.2, descripcion="Gen C"))
+    session.commit()
+    session.close()
+
+    # Sin invalidar, la instantánea no consulta de nuevo la BD.
+    assert len(get_reference_data().genes) == 2
+    invalidate_reference_data()
+    assert len(get_reference_data().genes) == 3
+
+def test_antibiotics_and_recommendations_formats():
+    """Los antibióticos se exponen en el formato del GA y de la vista de resultados."""
+    session = get_session()
+    ab = session.query(Antibiotico).first()
+    session.add(Recomendacion(antibiotico_id=ab.id, texto="Usar con precaución"))
+    session.commit()
+    ab_id = ab.id
+    session.close()
+    invalidate_reference_data()
+
+    ref = get_reference_data()
+    assert ref.antibiotic(ab_id)["concentracion_maxima"] == 1.0
+    assert ref.antibiotic_options()[0]["conc_min"] == 0.2
+    assert ref.recommendation(ab_id) == "Usar con precaución"
+    assert ref.recommendation(9999) == ""
+
+    session = get_session()
+    session.query(Recomendacion).delete()
+    session.commit()
+    session.close()
+
+def test_headless_runner_uses_reference_data():
+    """El runner resuelve genes y antibióticos desde la caché y guarda resultados."""
+    ref = get_reference_data()
+    ab_id = next(iter(ref.antibiotics))
+    gene_ids = [g["id"] for g in ref.genes]
+
+    ga = run_simulation(gene_ids, [(0, ab_id, 0.5)], generations=4, pop_size=10)
+
+    assert len(ga.avg_hist) == 4
+    assert ga.schedule[0][1]["nombre"] == "Antib1"
+    session = get_session()
+    filas = (
+        session.query(MetricaGeneracionSerie)
+        .filter_by(simulacion_id=ga.current_simulation_id)
+        .count()
+    )
+    session.close()
+    assert filas == 4
@@ -0,0 +1,130 @@
+import os
+
+import numpy as np
+import pytest
+
+from src.core.genetic_algorithm import GeneticAlgorithm
+from src.core.runner import run_simulation
+from src.data.reference_cache import get_reference_data
+from src.data.result_cache import ResultCache, scenario_key
+
+GENES = [
+    {"id": 1, "nombre": "A", "peso_resistencia": 0.7},
+    {"id": 2, "nombre": "B", "peso_resistencia": 0.3},
+]
+
+def _run_ga(seed, generations=6, target_time=None, **kwargs):
+    ga = GeneticAlgorithm(genes=GENES, generations=generations, pop_size=12, seed=seed, **kwargs)
+    ga.initialize([1])
+    if target_time is not None:
+        ga.target_time_per_generation = target_time
+        ga.min_pop_size = 4
+    while ga.step():
+        pass
+    return ga
+
+def test_scenario_key_is_canonical_and_sensitive_to_inputs():
+    """La clave no depende del orden de las claves y cambia con cualquier entrada."""
+    ga = GeneticAlgorithm(genes=GENES, seed=7)
+    params = ga.scenario_params([2, 1])
+    reordered = dict(reversed(list(params.items())))
+
+    assert scenario_key(params) == scenario_key(reordered)
+    assert params["selected_gene_ids"] == [1, 2]
+    assert scenario_key(params) != scenario_key({**params, "seed": 8})
+    assert scenario_key(params) != scenario_key({**params, "death_rate": 0.06})
+
+def test_same_seed_reproduces_the_run():
+    a, b = _run_ga(seed=3), _run_ga(seed=3)
+    assert a.avg_hist == b.avg_hist
+    assert [list(ind) for ind in a.pop] == [list(ind) for ind in b.pop]
+
+def test_seeded_runs_skip_the_wall_time_population_cut():
+    # Con un presupuesto de tiempo imposible el recorte dependería de la máquina
+    a, b = _run_ga(seed=3, target_time=0.0), _run_ga(seed=3)
+    assert len(a.pop) == 12
+    assert a.avg_hist == b.avg_hist
+    assert len(_run_ga(seed=None, target_time=0.0).pop) < 12
+
+def test_restore_brings_back_combination_drugs_and_lineage(tmp_path):
+    ab_a = {"id": 1, "nombre": "A", "concentracion_minima": 0.5, "concentracion_maxima": 4.0}
+    ab_b = {"id": 2, "nombre": "B", "concentracion_minima": 0.2, "concentracion_maxima": 2.0}
+    kwargs = dict(
+        antibiotic_schedule=[(0, ab_a, 1.0), (3, ab_b, 0.5)], combination_therapy=True,
+        lineage_tracking=True, lineage_capacity=4,
+    )
+    ga = _run_ga(seed=9, generations=10, **kwargs)
+    cache = ResultCache(str(tmp_path))
+    key = scenario_key(ga.scenario_params([1]))
+    cache.put(key, *ga.export_results())
+
+    restored = GeneticAlgorithm(genes=GENES, generations=10, pop_size=12, seed=9, **kwargs)
+    assert scenario_key(restored.scenario_params([1])) == key
+    restored.restore_results(*cache.get(key))
+
+    assert restored.active_drugs == ga.active_drugs and len(ga.active_drugs) == 2
+    assert restored.lineage.tmrca() == ga.lineage.tmrca()
+    assert restored.lineage.generations_stored == ga.lineage.generations_stored
+    assert restored.lineage.allele_origins(0) == ga.lineage.allele_origins(0)
+    # Sin genealogía la clave es otra: el resultado guardado no la tendría
+    plain = GeneticAlgorithm(genes=GENES, generations=10, pop_size=12, seed=9, **{
+        **kwargs, "lineage_tracking": False,
+    })
+    assert scenario_key(plain.scenario_params([1])) != key
+
+def test_export_restore_roundtrip(tmp_path):
+    """Lo guardado en disco reconstruye historiales y población final."""
+    ga = _run_ga(seed=11)
+    cache = ResultCache(str(tmp_path))
+    key = scenario_key(ga.scenario_params([1]))
+    cache.put(key, *ga.export_results())
+
+    restored = GeneticAlgorithm(genes=GENES, generations=6, pop_size=12, seed=11)
+    restored.restore_results(*ResultCache(str(tmp_path)).get(key))
+
+    assert restored.avg_hist == ga.avg_hist
+    assert restored.population_hist == ga.population_hist
+    np.testing.assert_array_equal(restored.wall_time_hist, ga.wall_time_hist)
+    assert [list(ind) for ind in restored.pop] == [list(ind) for ind in ga.pop]
+    assert restored.get_average_attributes() == pytest.approx(ga.get_average_attributes())
+    assert restored.pop[0].fitness.values == ga.pop[0].fitness.values
+    assert restored.current_step == ga.current_step
+
+def test_size_limit_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=1)
+    arrays = {"x": np.arange(1000.0)}
+    cache.put("a", arrays, {})
+    cache.put("b", arrays, {})
+    assert "a" not in cache
+    assert "b" in cache
+
+    size = os.path.getsize(os.path.join(cache.directory, "b.npz"))
+    cache.max_bytes = 2 * size + 1  # caben dos entradas
+    cache.put("c", arrays, {})
+    os.utime(os.path.join(cache.directory, "b.npz"), (0, 0))
+    os.utime(os.path.join(cache.directory, "c.npz"), (1, 1))
+    cache.get("b")  # el acceso la vuelve la más reciente
+    cache.put("d", arrays, {})
+    assert "b" in cache and "d" in cache
+    assert "c" not in cache
+    assert cache.get("missing") is None
+
+def test_runner_returns_cached_result_without_simulating(tmp_path, mocker):
+    ref = get_reference_data()
+    ab_id = next(iter(ref.antibiotics))
+    gene_ids = [g["id"] for g in ref.genes]
+    cache = ResultCache(str(tmp_path))
+
+    first = run_simulation(
+        gene_ids, [(0, ab_id, 0.5)], generations=5, pop_size=10, seed=5,
+        persist=False, cache=cache,
+    )
+    step = mocker.patch.object(GeneticAlgorithm, "step", side_effect=AssertionError)
+    second = run_simulation(
+        gene_ids, [(0, ab_id, 0.5)], generations=5, pop_size=10, seed=5,
+        persist=False, cache=cache,
+    )
+
+    step.assert_not_called()
+    assert second.avg_hist == first.avg_hist
+    assert second.current_ab["id"] == ab_id
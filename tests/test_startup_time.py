@@ -0,0 +1,46 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Módulos que solo deben cargarse al usarse (mapa, exportación, validación, simulación)
+HEAVY_GUI = {"scipy", "pandas", "reportlab", "pyqtgraph.exporters", "deap", "psutil"}
+HEAVY_CLI = {"scipy", "pandas", "reportlab", "PyQt5", "pyqtgraph", "deap", "psutil"}
+
+def _import_profile(module):
+    """
+    Importa el módulo en un intérprete limpio con -X importtime y devuelve
+    ({módulo: tiempo acumulado en µs}, tiempo acumulado del módulo pedido).
+    """
+    env = dict(os.environ, DATABASE_URL="sqlite:///:memory:", PYTHONPATH=ROOT)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imported = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        imported[name.strip()] = int(cumulative)
+    return imported, imported[module]
+
+def test_gui_startup_does_not_import_heavy_modules():
+    pytest.importorskip("PyQt5")
+    imported, total_us = _import_profile("src.gui.main_window")
+
+    assert not HEAVY_GUI & set(imported)
+    assert total_us < 3_000_000  # presupuesto holgado hasta la primera ventana
+
+def test_headless_runner_startup_is_light():
+    imported, total_us = _import_profile("src.core.runner")
+
+    assert not HEAVY_CLI & set(imported)
+    assert total_us < 2_000_000